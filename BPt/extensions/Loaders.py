@@ -1,4 +1,4 @@
-from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.base import BaseEstimator, TransformerMixin, clone
 import numpy as np
 import warnings
 import networkx as nx
@@ -6,6 +6,8 @@ import networkx as nx
 
 class Identity(BaseEstimator, TransformerMixin):
 
+    _stateless = True
+
     def __init__(self):
         '''This loader simply flatten the input array and passed it along'''
         pass
@@ -21,6 +23,9 @@ class Identity(BaseEstimator, TransformerMixin):
 
         return X.flatten()
 
+    def transform_batch(self, Xs):
+        return [X.flatten() for X in Xs]
+
 
 def load_surf(surf):
     '''Helper function to load a surface within BPt, w/ appropriate
@@ -60,6 +65,8 @@ def load_surf(surf):
 
 class SurfLabels(BaseEstimator, TransformerMixin):
 
+    _stateless = True
+
     def __init__(self, labels,
                  background_label=0,
                  mask=None,
@@ -189,8 +196,24 @@ class SurfLabels(BaseEstimator, TransformerMixin):
             self.background_label_ = np.array(self.background_label)
 
         # Set the _non_bkg_unique as the valid labels to get ROIs for
-        self.non_bkg_unique_ = np.setdiff1d(np.unique(self.labels_),
-                                            self.background_label_)
+        unique, inverse = np.unique(self.labels_, return_inverse=True)
+        self.non_bkg_unique_ = np.setdiff1d(unique, self.background_label_)
+
+        # Precompute the label index, where roi_inds_ is the ROI
+        # of each vertex, or -1 for background
+        unique_roi = np.searchsorted(self.non_bkg_unique_, unique)
+        is_roi = np.isin(unique, self.non_bkg_unique_)
+        self.roi_inds_ = np.where(is_roi, unique_roi, -1)[inverse]
+        self.roi_mask_ = self.roi_inds_ != -1
+
+        # The vertices in ROI order, and where each ROI starts
+        self.order_ = np.argsort(self.roi_inds_, kind='stable')
+        self.order_ = self.order_[len(self.order_) -
+                                  np.count_nonzero(self.roi_mask_):]
+        self.counts_ = np.bincount(self.roi_inds_[self.roi_mask_],
+                                   minlength=len(self.non_bkg_unique_))
+        self.starts_ = np.cumsum(self.counts_) - self.counts_
+        self.parc_matrix_ = None
 
         # Proc strategy if need be
         strats = {'mean': np.mean,
@@ -220,6 +243,112 @@ class SurfLabels(BaseEstimator, TransformerMixin):
             raise ValueError('It seems that SurfLabels has not been fitted. '
                              'You must call fit() before calling transform()')
 
+    def _iter_blocks(self, X, block_nbytes=6.4e7):
+
+        n_other = X.shape[1 - self.data_dim_]
+        block_size = max(1, int(block_nbytes //
+                                (len(self.labels_) * X.itemsize)))
+
+        for start in range(0, n_other, block_size):
+            if self.data_dim_ == 1:
+                yield X[start:start + block_size]
+            else:
+                yield X[:, start:start + block_size]
+
+    def _reduce(self, X):
+        '''Returns the ROI values w/ the ROIs as the first axis,
+        computed from the vertices sorted by ROI.'''
+
+        # Vertices as the first axis, sorted by ROI
+        if self.data_dim_ == 1:
+            X = X.T
+        X_sorted = X[self.order_]
+
+        counts = self.counts_.reshape((-1,) + (1,) * (X.ndim - 1))
+
+        if self.strategy_ is np.sum:
+            return np.add.reduceat(X_sorted, self.starts_, axis=0)
+
+        if self.strategy_ is np.min:
+            return np.minimum.reduceat(X_sorted, self.starts_, axis=0)
+
+        if self.strategy_ is np.max:
+            return np.maximum.reduceat(X_sorted, self.starts_, axis=0)
+
+        if self.strategy_ in (np.mean, np.var, np.std):
+            mean = np.add.reduceat(X_sorted, self.starts_, axis=0) / counts
+
+            if self.strategy_ is np.mean:
+                return mean
+
+            # Two pass var, for stability
+            dif = X_sorted - np.repeat(mean, self.counts_, axis=0)
+            var = np.add.reduceat(dif ** 2, self.starts_, axis=0) / counts
+
+            if self.strategy_ is np.var:
+                return var
+            return np.sqrt(var)
+
+        # Otherwise, apply to each ROI, still w/o masking
+        # the full surface per ROI
+        X_rois = np.split(X_sorted, self.starts_[1:], axis=0)
+        if self.data_dim_ == 1:
+            return np.array([self.strategy_(X_i.T, axis=1)
+                             for X_i in X_rois])
+
+        return np.array([self.strategy_(X_i, axis=0) for X_i in X_rois])
+
+    def get_parcellation_matrix(self):
+        '''Returns a sparse (n_rois, n_vertices) matrix, with 1 / the
+        size of each ROI for its vertices, s.t., the matrix product with
+        a stack of subjects' vertex values gives their ROI means, or
+        with 1's instead if the strategy is 'sum'.'''
+
+        self._check_fitted()
+
+        from scipy.sparse import csr_matrix
+
+        roi_inds = self.roi_inds_[self.order_]
+        if self.strategy_ is np.sum:
+            vals = np.ones(len(self.order_))
+        else:
+            vals = 1 / self.counts_[roi_inds]
+
+        return csr_matrix((vals, (roi_inds, self.order_)),
+                          shape=(len(self.non_bkg_unique_),
+                                 len(self.labels_)))
+
+    def transform_batch(self, Xs):
+        '''Transform a list of subjects' data, or a stacked array with
+        subjects as the first axis. In the case of 1D data and the mean
+        or sum strategy, this is computed as one sparse matrix product
+        for all subjects.'''
+
+        self._check_fitted()
+
+        if len(Xs) == 0:
+            return []
+
+        Xs = [np.asarray(X) for X in Xs]
+        shapes = set(X.shape for X in Xs)
+
+        if (len(shapes) == 1 and Xs[0].ndim == 1 and
+                self.strategy_ in (np.mean, np.sum) and
+                len(Xs[0]) == len(self.labels_)):
+
+            # Set the same fitted attributes as transform would
+            self.data_dim_, self.X_shape_ = 0, Xs[0].shape
+
+            if getattr(self, 'parc_matrix_', None) is None:
+                self.parc_matrix_ = self.get_parcellation_matrix()
+
+            X_trans = self.parc_matrix_.dot(np.stack(Xs).T).T
+            self.o_shape_ = X_trans.shape[1:]
+
+            return list(X_trans)
+
+        return [self.transform(X) for X in Xs]
+
     def transform(self, X):
         ''' If X has the both the same dimensions, raise warning'''
 
@@ -234,21 +363,18 @@ class SurfLabels(BaseEstimator, TransformerMixin):
         self.data_dim_ = X.shape.index(len(self.labels_))
         self.X_shape_ = X.shape
 
-        # Get the ROI value for each label
-        X_trans = []
-        for i in self.non_bkg_unique_:
-
-            if self.data_dim_ == 0:
-                X_i = X[self.labels_ == i]
-            else:
-                X_i = X[:, self.labels_ == i]
-
-            X_trans.append(self.strategy_(X_i, axis=self.data_dim_))
+        # Get the ROI value for each label, in one pass, or if memory-mapped
+        # in blocks along the non-data axis, s.t., only one
+        # block at a time is read into memory
+        if isinstance(X, np.memmap) and X.ndim == 2:
+            X_trans = np.concatenate([self._reduce(X_b) for X_b
+                                      in self._iter_blocks(X)], axis=1)
+        else:
+            X_trans = self._reduce(X)
 
+        # Put back in the orientation of X
         if self.data_dim_ == 1:
-            X_trans = np.stack(X_trans, axis=1)
-        else:
-            X_trans = np.array(X_trans)
+            X_trans = X_trans.T
 
         # Return based on vectorizes
         if not self.vectorize:
@@ -269,8 +395,7 @@ class SurfLabels(BaseEstimator, TransformerMixin):
             X_trans = np.rollaxis(X_trans, -1)
             X = np.rollaxis(X, -1)
 
-        for i, label in enumerate(self.non_bkg_unique_):
-            X_trans[self.labels_ == label] = X[i]
+        X_trans[self.roi_mask_] = X[self.roi_inds_[self.roi_mask_]]
 
         if self.data_dim_ == 1:
             X_trans = np.rollaxis(X_trans, -1)
@@ -285,6 +410,8 @@ try:
 
     class Connectivity(ConnectivityMeasure):
 
+        _stateless = True
+
         def proc_X(self, X):
 
             if not isinstance(X, list):
@@ -302,11 +429,23 @@ try:
         def transform(self, X):
             return super().transform(self.proc_X(X))
 
+        def transform_batch(self, Xs):
+            '''Computes connectivity for a list of subjects at once, which
+            for any kind besides 'tangent', is the same as per subject.'''
+
+            if self.kind == 'tangent':
+                return [clone(self).fit_transform(X) for X in Xs]
+
+            return list(super().fit_transform(list(Xs)))
+
 except ImportError:
     pass
 
 
 class Networks(BaseEstimator, TransformerMixin):
+
+    _stateless = True
+
     def __init__(self, threshold=.2, threshold_method='abs',
                  to_compute='avg_degree'):
 
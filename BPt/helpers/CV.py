@@ -5,16 +5,33 @@ Class for performing train test splits and other cross validation for BPt
 """
 import sklearn.model_selection as MS
 import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from joblib import hash as joblib_hash
 from sklearn.base import BaseEstimator
 
+# Max number of computed splits to keep in _split_cache
+SPLIT_CACHE_SIZE = 32
+
+# Splits computed w/ an int random_state, keyed by get_split_key
+_split_cache = OrderedDict()
+
 
 def inds_from_names(original_subjects, subject_splits):
 
-    subject_inds = [[[original_subjects.get_loc(name) for name in s]
-                    for s in split] for split in subject_splits]
+    original_subjects = pd.Index(original_subjects)
+
+    subject_inds = [[original_subjects.get_indexer(s) for s in split]
+                    for split in subject_splits]
     return subject_inds
 
 
+def clear_split_cache():
+    '''Remove any cached splits.'''
+
+    _split_cache.clear()
+
+
 class CV(BaseEstimator):
     '''Class for performing various cross validation functions'''
 
@@ -146,8 +163,8 @@ class CV(BaseEstimator):
         train_subjects = np.concatenate([train_subjects, train_only])
 
         if return_index:
-            return ([original_subjects.get_loc(name) for name in train_subjects],
-                    [original_subjects.get_loc(name) for name in test_subjects])
+            return inds_from_names(original_subjects,
+                                   [(train_subjects, test_subjects)])[0]
 
         return train_subjects, test_subjects
 
@@ -356,47 +373,77 @@ class CV(BaseEstimator):
 
         return len(np.unique(groups))
 
+    def get_split_key(self, train_data_index, splits, n_repeats,
+                      splits_vals, random_state):
+        '''Key a set of splits on the subjects, split parameters
+        and this object's groups, stratify and train only.'''
+
+        return joblib_hash((np.asarray(train_data_index), splits, n_repeats,
+                            splits_vals, random_state, self.groups,
+                            self.stratify, self.train_only))
+
     def get_cv(self, train_data_index, splits, n_repeats,
                splits_vals=None, random_state=None, return_index=False):
-        '''Always return as list of tuples'''
+        '''Always return as list of tuples. If return_index is 'both',
+        return the subject splits and the index splits, which are
+        computed together in one pass.
+
+        If random_state is an int, the splits are deterministic, so
+        are cached and re-used for any later call with the same
+        subjects and parameters, e.g., across outer folds, nested
+        searches and repeated calls to Evaluate.
+        '''
 
-        if return_index == 'both':
-            no_index = self.get_cv(train_data_index, splits, n_repeats,
-                                   splits_vals=splits_vals,
-                                   random_state=random_state,
-                                   return_index=False)
+        key = None
+        if isinstance(random_state, (int, np.integer)):
+            key = self.get_split_key(train_data_index, splits, n_repeats,
+                                     splits_vals, random_state)
 
-            index = self.get_cv(train_data_index, splits, n_repeats,
-                                splits_vals=splits_vals,
-                                random_state=random_state,
-                                return_index=True)
+        if key is not None and key in _split_cache:
+            _split_cache.move_to_end(key)
+            subject_splits, index_splits = _split_cache[key]
 
-            return no_index, index
+        else:
+            subject_splits = self._get_subject_splits(train_data_index,
+                                                      splits, n_repeats,
+                                                      splits_vals,
+                                                      random_state)
+
+            if key is not None or return_index:
+                index_splits = inds_from_names(train_data_index,
+                                               subject_splits)
+
+            if key is not None:
+                _split_cache[key] = (subject_splits, index_splits)
+                while len(_split_cache) > SPLIT_CACHE_SIZE:
+                    _split_cache.popitem(last=False)
+
+        if return_index == 'both':
+            return list(subject_splits), list(index_splits)
+        elif return_index:
+            return list(index_splits)
+        return list(subject_splits)
+
+    def _get_subject_splits(self, train_data_index, splits, n_repeats,
+                            splits_vals, random_state):
 
         # If split_vals passed, then by group
         if splits_vals is not None:
 
             return self.repeated_leave_one_group_out(train_data_index,
                                                      n_repeats=n_repeats,
-                                                     groups_series=splits_vals,
-                                                     return_index=return_index)
+                                                     groups_series=splits_vals)
 
         # K-fold is splits is an int
         elif isinstance(splits, int):
 
             return self.repeated_k_fold(train_data_index, n_repeats,
                                         n_splits=splits,
-                                        random_state=random_state,
-                                        return_index=return_index)
+                                        random_state=random_state)
 
         # Otherwise, as train test splits
         else:
 
             return self.repeated_train_test_split(train_data_index, n_repeats,
                                                   test_size=splits,
-                                                  random_state=random_state,
-                                                  return_index=return_index)
-
-
-                                
-
+                                                  random_state=random_state)
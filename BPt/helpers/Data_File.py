@@ -1,16 +1,62 @@
 from joblib import Parallel, delayed
 from copy import deepcopy
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from inspect import signature
+import os
+import json
 import numpy as np
+from .Loader_Cache import get_load_func_name
+
+# Default number of files to read ahead in the background
+N_PREFETCH = 4
+
+
+def accepts_mmap_mode(load_func):
+    '''If the passed load_func can be passed mmap_mode, e.g., np.load'''
+
+    if load_func is np.load:
+        return True
+
+    try:
+        params = signature(load_func).parameters
+    except (TypeError, ValueError):
+        return False
+
+    return 'mmap_mode' in params or any(
+        p.kind == p.VAR_KEYWORD for p in params.values())
+
+
+def check_mmap_mode(mmap_mode, load_func=None):
+    '''Raise an error if mmap_mode could write to the saved data
+    files, or if passed a load_func which wouldn't accept it.'''
+
+    if mmap_mode not in (None, 'r', 'c'):
+        raise ValueError('mmap_mode must be None, \'r\' or \'c\', as '
+                         'other modes can change the saved data files, '
+                         'passed: ' + repr(mmap_mode))
+
+    if mmap_mode is not None and load_func is not None and \
+       not accepts_mmap_mode(load_func):
+        raise ValueError('Passed load_func does not accept a mmap_mode '
+                         'argument, so mmap_mode must be None.')
 
 
 class Data_File():
 
-    def __init__(self, loc, load_func):
+    def __init__(self, loc, load_func, mmap_mode=None):
 
         self.loc = loc
         self.load_func = load_func
+        self.mmap_mode = mmap_mode
 
     def _load(self):
+
+        # Load as memory mapped, if requested and supported
+        mmap_mode = getattr(self, 'mmap_mode', None)
+        if mmap_mode is not None and accepts_mmap_mode(self.load_func):
+            return self.load_func(self.loc, mmap_mode=mmap_mode)
+
         return self.load_func(self.loc)
 
     def load(self):
@@ -26,14 +72,44 @@ class Data_File():
         return hash(self.loc)
 
     def __deepcopy__(self, memo):
-        return Data_File(deepcopy(self.loc, memo), self.load_func)
+        return Data_File(deepcopy(self.loc, memo), self.load_func,
+                         mmap_mode=getattr(self, 'mmap_mode', None))
+
+
+def iter_loaded(data_files, n_prefetch=N_PREFETCH):
+    '''Yield the loaded data of each Data_File, in order, while the
+    next files are read in background threads. At most n_prefetch
+    files are loaded at once, including the one being yielded.'''
+
+    if n_prefetch is None or n_prefetch < 1:
+        for data_file in data_files:
+            yield data_file.load()
+        return
+
+    data_files = iter(data_files)
+    with ThreadPoolExecutor(max_workers=n_prefetch) as executor:
+
+        queue = deque()
+        for data_file in data_files:
+            queue.append(executor.submit(data_file.load))
+            if len(queue) == n_prefetch:
+                break
+
+        while len(queue) > 0:
+            data = queue.popleft().result()
+            yield data
+
+            # Refill, only once done with the current file
+            del data
+            data_file = next(data_files, None)
+            if data_file is not None:
+                queue.append(executor.submit(data_file.load))
 
 
 def mp_load(files, reduce_funcs):
 
     proxy = np.zeros((len(files), len(reduce_funcs)))
-    for f in range(len(files)):
-        data = files[f].load()
+    for f, data in enumerate(iter_loaded(files)):
         for r in range(len(reduce_funcs)):
             proxy[f, r] = reduce_funcs[r](data)
 
@@ -51,11 +127,11 @@ def load_data_file_proxies(data, reduce_funcs,
     if n_jobs == 1:
 
         for col in data_files:
-            for subject in data_files.index:
 
-                file_key = data_files.at[subject, col]
-                data = file_mapping[file_key].load()
+            files = [file_mapping[data_files.at[subject, col]]
+                     for subject in data_files.index]
 
+            for subject, data in zip(data_files.index, iter_loaded(files)):
                 for r in range(len(reduce_funcs)):
                     data_file_proxies[r].at[subject, col] =\
                         reduce_funcs[r](data)
@@ -81,3 +157,119 @@ def load_data_file_proxies(data, reduce_funcs,
                 data_file_proxies[i][col_names[col]] = output[:, i]
 
     return data_file_proxies
+
+
+class Packed_Data_File(Data_File):
+    '''A Data_File stored as one slice of a single packed file,
+    as created by :func:`pack_data_files`, which is loaded by
+    seeking directly to its offset.'''
+
+    def __init__(self, loc, offset, shape, dtype, load_func=None,
+                 mmap_mode=None, orig_loc=None):
+
+        super().__init__(loc, load_func, mmap_mode=mmap_mode)
+
+        self.offset = offset
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.orig_loc = orig_loc
+
+    def _load(self):
+
+        # Never let a write mode truncate the packed file
+        if self.mmap_mode is not None and len(self.shape) > 0:
+            mode = 'r+' if self.mmap_mode == 'w+' else self.mmap_mode
+            return np.memmap(self.loc, dtype=self.dtype, mode=mode,
+                             offset=self.offset, shape=self.shape)
+
+        with open(self.loc, 'rb') as f:
+            f.seek(self.offset)
+            data = np.fromfile(f, dtype=self.dtype,
+                               count=int(np.prod(self.shape)))
+
+        return data.reshape(self.shape)
+
+    def __lt__(self, other):
+        return (self.loc, self.offset) <\
+            (other.loc, getattr(other, 'offset', -1))
+
+    def __eq__(self, other):
+        return (self.loc, self.offset) ==\
+            (other.loc, getattr(other, 'offset', None))
+
+    def __hash__(self):
+        return hash((self.loc, self.offset))
+
+    def __deepcopy__(self, memo):
+        return Packed_Data_File(deepcopy(self.loc, memo), self.offset,
+                                self.shape, self.dtype,
+                                load_func=self.load_func,
+                                mmap_mode=self.mmap_mode,
+                                orig_loc=self.orig_loc)
+
+
+def _get_file_info(data_file):
+
+    # A pack is only valid for the same files and load_func
+    stat = os.stat(data_file.loc)
+    return [os.path.abspath(data_file.loc), stat.st_mtime_ns, stat.st_size,
+            get_load_func_name(data_file.load_func)]
+
+
+def pack_data_files(file_mapping, loc, mmap_mode=None,
+                    n_prefetch=N_PREFETCH):
+    '''Write the loaded contents of every Data_File in file_mapping
+    to one packed binary file at loc, along with an index saved
+    at loc + '.json', and return a new file_mapping of
+    :class:`Packed_Data_File`. If the same files have already been
+    packed at loc with the same load_func, then the existing packed
+    file is re-used.'''
+
+    keys = sorted(file_mapping)
+    index_loc = str(loc) + '.json'
+
+    # Data_Files which are already packed are indexed by
+    # their original location
+    data_files = [file_mapping[key] for key in keys]
+    orig_files = [Data_File(getattr(df, 'orig_loc', None) or df.loc,
+                            df.load_func) for df in data_files]
+    infos = [_get_file_info(df) for df in orig_files]
+
+    index = None
+    if os.path.exists(loc) and os.path.exists(index_loc):
+        with open(index_loc, 'r') as f:
+            index = json.load(f)
+
+        if [entry['info'] for entry in index] != infos:
+            index = None
+
+    # Build if needed, writing to a temp file first
+    if index is None:
+
+        index, offset = [], 0
+        temp_loc = str(loc) + '.tmp'
+        with open(temp_loc, 'wb') as f:
+            for data, info in zip(iter_loaded(data_files, n_prefetch),
+                                  infos):
+
+                data = np.ascontiguousarray(data)
+                if data.dtype == object:
+                    raise RuntimeError('Only Data_Files which load as '
+                                       'numeric arrays can be packed, '
+                                       'found: ' + repr(info[0]))
+
+                f.write(data.tobytes())
+                index.append({'offset': offset, 'shape': list(data.shape),
+                              'dtype': data.dtype.str, 'info': info})
+                offset += data.nbytes
+
+        os.replace(temp_loc, loc)
+        with open(index_loc, 'w') as f:
+            json.dump(index, f)
+
+    return {key: Packed_Data_File(str(loc), entry['offset'],
+                                  entry['shape'], entry['dtype'],
+                                  load_func=orig.load_func,
+                                  mmap_mode=mmap_mode,
+                                  orig_loc=orig.loc)
+            for key, entry, orig in zip(keys, index, orig_files)}
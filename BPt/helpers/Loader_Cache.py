@@ -0,0 +1,225 @@
+"""
+Loader_Cache.py
+====================================
+A persistent cache for the per-subject outputs of Loaders, keyed on
+each file's path, modification time and size, along with the loader's
+parameters. Outputs computed together are stored as stacked blocks,
+one row per file, and indexed in a small sqlite database, s.t., the
+cache can be shared across folds, repeats and calls to Evaluate,
+and between processes.
+"""
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+import numpy as np
+from joblib import hash as joblib_hash
+
+DEFAULT_MAX_SIZE = 1e10
+
+
+def get_load_func_name(load_func):
+
+    return getattr(load_func, '__module__', '') + '.' +\
+        getattr(load_func, '__qualname__', repr(load_func))
+
+
+def get_file_key(data_file):
+    '''Key a Data_File on its location, modification time and size,
+    as well as the function it is loaded with, and its offset
+    if stored within a packed file.'''
+
+    loc = os.path.abspath(data_file.loc)
+    stat = os.stat(loc)
+
+    return '|'.join([loc, str(stat.st_mtime_ns), str(stat.st_size),
+                     get_load_func_name(data_file.load_func),
+                     str(getattr(data_file, 'offset', ''))])
+
+
+class Loader_Cache():
+    '''
+    Parameters
+    ----------
+    cache_loc : str or Path
+        The directory in which to store the cache, created if needed.
+
+    max_size : int, float or None, optional
+        The maximum size in bytes of the stored loader outputs. Once
+        exceeded, the least recently used blocks are removed.
+        If None, no limit.
+
+        (default = DEFAULT_MAX_SIZE)
+    '''
+
+    def __init__(self, cache_loc, max_size=DEFAULT_MAX_SIZE):
+
+        self.cache_loc = str(cache_loc)
+        self.max_size = max_size
+
+        os.makedirs(self.cache_loc, exist_ok=True)
+        self.db_loc = os.path.join(self.cache_loc, 'index.db')
+
+        with self._connect() as con:
+            con.execute('CREATE TABLE IF NOT EXISTS rows ('
+                        'loader_key TEXT, file_key TEXT, block TEXT, '
+                        'row INTEGER, PRIMARY KEY (loader_key, file_key))')
+            con.execute('CREATE TABLE IF NOT EXISTS blocks ('
+                        'block TEXT PRIMARY KEY, loc TEXT, '
+                        'nbytes INTEGER, last_used REAL)')
+
+    @contextmanager
+    def _connect(self):
+
+        con = sqlite3.connect(self.db_loc, timeout=60)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def get_loader_key(self, transformer):
+        '''Hash the loader, once per call rather than once per file.'''
+
+        return joblib_hash(transformer)
+
+    def get(self, loader_key, file_keys):
+        '''Returns a list with the cached output for each file key,
+        or None if not cached.'''
+
+        out = [None for _ in file_keys]
+
+        with self._connect() as con:
+            found = {}
+            for i, file_key in enumerate(file_keys):
+                res = con.execute('SELECT rows.block, rows.row, blocks.loc '
+                                  'FROM rows JOIN blocks ON '
+                                  'rows.block = blocks.block WHERE '
+                                  'rows.loader_key = ? AND '
+                                  'rows.file_key = ?',
+                                  (loader_key, file_key)).fetchone()
+                if res is not None:
+                    block, row, loc = res
+                    found.setdefault((block, loc), []).append((i, row))
+
+            # Read each block once
+            for (block, loc), inds in found.items():
+
+                try:
+                    data = np.load(loc, mmap_mode='r')
+                except (FileNotFoundError, ValueError):
+                    continue
+
+                for i, row in inds:
+                    out[i] = np.array(data[row])
+
+            if len(found) > 0:
+                con.execute('UPDATE blocks SET last_used = ? '
+                            'WHERE block IN (%s)' %
+                            ','.join('?' * len(found)),
+                            [time.time()] + [b for b, _ in found])
+
+        return out
+
+    def put(self, loader_key, file_keys, rows):
+        '''Store the outputs for the passed file keys, grouping
+        outputs of the same shape and dtype into blocks.'''
+
+        groups = {}
+        for file_key, row in zip(file_keys, rows):
+            row = np.asarray(row)
+            groups.setdefault((row.shape, row.dtype.str), []).append(
+                (file_key, row))
+
+        block_dr = os.path.join(self.cache_loc, loader_key)
+        os.makedirs(block_dr, exist_ok=True)
+
+        with self._connect() as con:
+            for group in groups.values():
+
+                block = uuid.uuid4().hex
+                loc = os.path.join(block_dr, block + '.npy')
+                data = np.stack([row for _, row in group])
+
+                # Write under a temp name, s.t., readers never see a
+                # partial block
+                temp_loc = loc + '.tmp.npy'
+                np.save(temp_loc, data)
+                os.replace(temp_loc, loc)
+
+                # Any blocks holding the outputs being replaced
+                old_blocks = set()
+                for file_key, _ in group:
+                    res = con.execute('SELECT block FROM rows WHERE '
+                                      'loader_key = ? AND file_key = ?',
+                                      (loader_key, file_key)).fetchone()
+                    if res is not None:
+                        old_blocks.add(res[0])
+
+                con.execute('INSERT INTO blocks VALUES (?, ?, ?, ?)',
+                            (block, loc, data.nbytes, time.time()))
+                con.executemany('INSERT OR REPLACE INTO rows '
+                                 'VALUES (?, ?, ?, ?)',
+                                 [(loader_key, file_key, block, r)
+                                  for r, (file_key, _) in enumerate(group)])
+
+                # Remove old blocks which no longer hold any outputs
+                for old_block in old_blocks:
+                    self._remove_if_unused(con, old_block)
+
+            self._evict(con)
+
+    def _remove_block(self, con, block):
+
+        res = con.execute('SELECT loc FROM blocks WHERE block = ?',
+                          (block,)).fetchone()
+
+        con.execute('DELETE FROM rows WHERE block = ?', (block,))
+        con.execute('DELETE FROM blocks WHERE block = ?', (block,))
+
+        if res is not None:
+            try:
+                os.remove(res[0])
+            except FileNotFoundError:
+                pass
+
+    def _remove_if_unused(self, con, block):
+
+        n_rows = con.execute('SELECT COUNT(*) FROM rows WHERE block = ?',
+                             (block,)).fetchone()[0]
+        if n_rows == 0:
+            self._remove_block(con, block)
+
+    def _evict(self, con):
+
+        if self.max_size is None:
+            return
+
+        total = con.execute('SELECT SUM(nbytes) FROM blocks').fetchone()[0]
+        if total is None or total <= self.max_size:
+            return
+
+        # Remove least recently used blocks until under the limit
+        for block, nbytes in con.execute(
+             'SELECT block, nbytes FROM blocks '
+             'ORDER BY last_used ASC').fetchall():
+
+            self._remove_block(con, block)
+
+            total -= nbytes
+            if total <= self.max_size:
+                break
+
+    def clear(self):
+        '''Remove all cached loader outputs.'''
+
+        with self._connect() as con:
+            for loc, in con.execute('SELECT loc FROM blocks').fetchall():
+                try:
+                    os.remove(loc)
+                except FileNotFoundError:
+                    pass
+
+            con.execute('DELETE FROM rows')
+            con.execute('DELETE FROM blocks')
@@ -0,0 +1,78 @@
+"""
+Resources.py
+====================================
+Helpers for splitting a single n_jobs budget between the nested
+levels of parallelism, i.e., folds, search candidates, models or
+ensemble members and BLAS threads, and for enforcing the per worker
+BLAS / OpenMP thread limit inside worker processes.
+"""
+from contextlib import contextmanager
+from joblib import effective_n_jobs
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    pass
+
+
+def split_n_jobs(n_jobs, n_outer):
+    '''Split n_jobs between an outer level running up to n_outer
+    tasks in parallel, and the inner level within each task.
+    Returns the outer and inner n_jobs.'''
+
+    if n_jobs is None:
+        return 1, 1
+
+    # Resolve e.g., -1 to the number of cpus
+    n_jobs = effective_n_jobs(n_jobs)
+
+    outer = max(1, min(n_jobs, n_outer))
+    return outer, max(1, n_jobs // outer)
+
+
+def get_layout(n_jobs, fold_n_jobs=1, has_search=False):
+    '''Returns a dict with the number of cores given to each level of
+    nested parallelism, for a total budget of n_jobs, where each
+    level gets the budget left over from the levels above it. BLAS
+    threads share the budget of the model they are used within.'''
+
+    fold, per_fold = split_n_jobs(n_jobs, fold_n_jobs)
+
+    if has_search:
+        search, model = per_fold, 1
+    else:
+        search, model = 1, per_fold
+
+    return {'folds': fold, 'search': search, 'models': model,
+            'blas_threads': model}
+
+
+@contextmanager
+def limit_threads(n_threads):
+    '''Limit the BLAS and OpenMP thread pools within this process to
+    n_threads. If n_threads is None, or threadpoolctl is not
+    installed, then do nothing.'''
+
+    if n_threads is None:
+        yield
+        return
+
+    try:
+        limiter = threadpool_limits(limits=n_threads)
+    except NameError:
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        limiter.restore_original_limits()
+
+
+def call_with_threads(n_threads, func, *args, **kwargs):
+    '''Call func within :func:`limit_threads`, meant to be
+    used, e.g., as partial(call_with_threads, 1, func), to limit
+    the threads of jobs run within worker processes.'''
+
+    with limit_threads(n_threads):
+        return func(*args, **kwargs)
@@ -0,0 +1,171 @@
+"""
+Shared_Data.py
+====================================
+Helpers for publishing large read-only arrays (e.g., X, y and
+CV indices) once to disk backed memory maps, s.t., worker processes
+can attach to them without each receiving their own pickled copy.
+"""
+import os
+import shutil
+import tempfile
+import numpy as np
+
+
+def get_default_temp_dr():
+    '''Prefer a RAM backed location, if avaliable, as
+    joblib does for its memmapping.'''
+
+    shm = '/dev/shm'
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return shm
+
+    return tempfile.gettempdir()
+
+
+class Shared_Array():
+    '''A cheap to pickle reference to an array saved by
+    :class:`Shared_Data`. Call load to get the read-only memmap.'''
+
+    def __init__(self, loc, shape, dtype, mmap_mode='r'):
+
+        self.loc = loc
+        self.shape = shape
+        self.dtype = dtype
+        self.mmap_mode = mmap_mode
+
+    def load(self, mmap_mode=None):
+
+        if mmap_mode is None:
+            mmap_mode = self.mmap_mode
+
+        return np.load(self.loc, mmap_mode=mmap_mode)
+
+    def __len__(self):
+        return self.shape[0]
+
+
+class Shared_Splits():
+    '''A cheap to pickle reference to a list of (train, test)
+    index arrays, stored as a single flat shared array.'''
+
+    def __init__(self, flat, bounds):
+
+        self.flat = flat
+        self.bounds = bounds
+
+    def load(self, mmap_mode=None):
+
+        flat = load_shared(self.flat, mmap_mode=mmap_mode)
+
+        return [(flat[tr_start:tr_end], flat[tr_end:te_end])
+                for tr_start, tr_end, te_end in self.bounds]
+
+    def __len__(self):
+        return len(self.bounds)
+
+
+def load_shared(obj, mmap_mode=None):
+    '''Return the array or splits behind a shared reference,
+    or if not a shared reference, return obj as is.'''
+
+    if isinstance(obj, (Shared_Array, Shared_Splits)):
+        return obj.load(mmap_mode=mmap_mode)
+
+    return obj
+
+
+class Shared_Data():
+    '''Owns a temporary directory of memory mapped arrays,
+    meant to be used as a context manager, e.g.,
+
+    ::
+
+        with Shared_Data() as shared:
+            X_s = shared.share(X)
+            ...
+
+    where X_s can then be passed to worker processes, and loaded
+    with :func:`load_shared`. Everything is removed on exit.
+
+    Parameters
+    ----------
+    temp_dr : str, Path or None, optional
+        The directory in which to create the temporary folder.
+        If None, use /dev/shm if avaliable, otherwise
+        the system default temp directory.
+
+        (default = None)
+
+    min_nbytes : int, optional
+        Arrays smaller than this are not worth sharing,
+        and are passed along as is.
+
+        (default = 1e6)
+    '''
+
+    def __init__(self, temp_dr=None, min_nbytes=1e6):
+
+        if temp_dr is None or temp_dr == '':
+            temp_dr = get_default_temp_dr()
+
+        self.temp_dr = temp_dr
+        self.min_nbytes = min_nbytes
+        self.dr = None
+        self.cnt = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _get_dr(self):
+
+        if self.dr is None:
+            self.dr = tempfile.mkdtemp(prefix='BPt_shared_',
+                                       dir=self.temp_dr)
+
+        return self.dr
+
+    def share(self, array, force=False):
+        '''Publish an array, returning a :class:`Shared_Array`
+        reference, or the array itself if smaller than min_nbytes
+        (and not force).'''
+
+        if not isinstance(array, np.ndarray) or array.dtype == object:
+            return array
+
+        if not force and array.nbytes < self.min_nbytes:
+            return array
+
+        loc = os.path.join(self._get_dr(), str(self.cnt) + '.npy')
+        self.cnt += 1
+
+        np.save(loc, array)
+        return Shared_Array(loc, array.shape, array.dtype)
+
+    def share_splits(self, splits):
+        '''Publish a list of (train, test) index arrays as
+        one flat array, returning a :class:`Shared_Splits`.'''
+
+        flat, bounds, start = [], [], 0
+        for tr_inds, te_inds in splits:
+
+            tr_end = start + len(tr_inds)
+            te_end = tr_end + len(te_inds)
+            bounds.append((start, tr_end, te_end))
+
+            flat += [np.asarray(tr_inds, dtype=np.int64),
+                     np.asarray(te_inds, dtype=np.int64)]
+            start = te_end
+
+        flat = np.concatenate(flat)
+
+        # Always share, s.t. load will return a list of splits
+        return Shared_Splits(self.share(flat, force=True), bounds)
+
+    def close(self):
+
+        if self.dr is not None:
+            shutil.rmtree(self.dr, ignore_errors=True)
+            self.dr = None
@@ -0,0 +1,113 @@
+"""
+Trial_Store.py
+====================================
+A persistent store for the evaluated candidates of a hyper-parameter
+search, keyed on a fingerprint of the search (the pipeline, parameter
+distributions, scorer, data and inner CV splits), along with each
+candidate's parameters. Candidates are stored in a small sqlite database,
+s.t., they can be shared between processes, used to warm start a new
+search, and let an interrupted search resume without redoing any fits.
+"""
+import os
+import json
+import pickle
+import sqlite3
+import time
+from contextlib import contextmanager
+from joblib import hash as joblib_hash
+
+
+def get_params_key(params):
+    '''Key a candidate's parameters, independent of their order.'''
+
+    return joblib_hash(sorted(params.items(), key=lambda item: item[0]))
+
+
+class Trial_Store():
+    '''
+    Parameters
+    ----------
+    trial_loc : str or Path
+        The directory in which to store the trial database,
+        created if needed.
+
+    search_key : str
+        The fingerprint of the search which trials are
+        stored for and read from, see :func:`get_search_key`.
+    '''
+
+    def __init__(self, trial_loc, search_key):
+
+        self.trial_loc = str(trial_loc)
+        self.search_key = search_key
+
+        os.makedirs(self.trial_loc, exist_ok=True)
+        self.db_loc = os.path.join(self.trial_loc, 'trials.db')
+
+        with self._connect() as con:
+            con.execute('CREATE TABLE IF NOT EXISTS trials ('
+                        'search_key TEXT, params_key TEXT, params BLOB, '
+                        'fold_scores TEXT, fold_times TEXT, value REAL, '
+                        'created REAL, '
+                        'PRIMARY KEY (search_key, params_key))')
+
+    @staticmethod
+    def get_search_key(*args):
+        '''Fingerprint a search from everything which can change
+        the score of a candidate.'''
+
+        return joblib_hash(args)
+
+    @contextmanager
+    def _connect(self):
+
+        con = sqlite3.connect(self.db_loc, timeout=60)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def get(self, params):
+        '''Returns the stored value for these parameters,
+        or None if not yet evaluated.'''
+
+        with self._connect() as con:
+            res = con.execute('SELECT value FROM trials WHERE '
+                              'search_key = ? AND params_key = ?',
+                              (self.search_key,
+                               get_params_key(params))).fetchone()
+
+        if res is None:
+            return None
+        return res[0]
+
+    def put(self, params, fold_scores, fold_times, value):
+        '''Store an evaluated candidate.'''
+
+        with self._connect() as con:
+            con.execute('INSERT OR REPLACE INTO trials '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (self.search_key, get_params_key(params),
+                         pickle.dumps(params),
+                         json.dumps([float(s) for s in fold_scores]),
+                         json.dumps([float(t) for t in fold_times]),
+                         float(value), time.time()))
+
+    def load(self):
+        '''Returns a list of (params, value) for all of the
+        stored candidates of this search, oldest first.'''
+
+        with self._connect() as con:
+            rows = con.execute('SELECT params, value FROM trials '
+                               'WHERE search_key = ? ORDER BY created ASC',
+                               (self.search_key,)).fetchall()
+
+        return [(pickle.loads(params), value) for params, value in rows]
+
+    def clear(self):
+        '''Remove all stored candidates of this search.'''
+
+        with self._connect() as con:
+            con.execute('DELETE FROM trials WHERE search_key = ?',
+                        (self.search_key,))
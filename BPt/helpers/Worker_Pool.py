@@ -0,0 +1,91 @@
+"""
+Worker_Pool.py
+====================================
+A single, session wide pool of worker processes, s.t., hyper-parameter
+searches in every outer fold (and any later searches) re-use the same
+already started workers, rather than each paying the cost of spawning
+new processes and re-importing modules.
+"""
+import atexit
+import multiprocessing as mp
+from concurrent import futures
+
+try:
+    from loky import get_reusable_executor
+except ImportError:
+    pass
+
+# Seconds idle before loky workers are shut down
+DEFAULT_TIMEOUT = 600
+
+_config = {'n_jobs': 1, 'mp_context': 'loky', 'timeout': DEFAULT_TIMEOUT}
+
+# Persistent non-loky executors, keyed by n_jobs and mp_context
+_executors = {}
+
+
+def set_worker_pool(n_jobs=1, mp_context='loky', timeout=DEFAULT_TIMEOUT):
+    '''Set the default number of workers, multiprocessing context and
+    idle timeout of the worker pool, e.g., once per BPt_ML session.'''
+
+    _config['n_jobs'] = n_jobs
+    _config['mp_context'] = mp_context
+    _config['timeout'] = timeout
+
+
+def get_executor(n_jobs=None, mp_context=None):
+    '''Returns the pool's executor for this number of workers and
+    multiprocessing context, starting it only if not already running.
+
+    Parameters
+    ----------
+    n_jobs : int or None, optional
+        The number of workers, if None, use the
+        value set with :func:`set_worker_pool`.
+
+        (default = None)
+
+    mp_context : str or None, optional
+        Either 'loky', or the name of a python multiprocessing context,
+        e.g., 'fork', 'forkserver' or 'spawn'. If None or 'default', use
+        the value set with :func:`set_worker_pool`.
+
+        (default = None)
+    '''
+
+    if n_jobs is None:
+        n_jobs = _config['n_jobs']
+    if mp_context is None or mp_context == 'default':
+        mp_context = _config['mp_context']
+
+    # Loky keeps a single reusable executor, resized as needed
+    if mp_context == 'loky':
+        try:
+            return get_reusable_executor(max_workers=n_jobs,
+                                         timeout=_config['timeout'])
+        except NameError:
+            raise ImportError('Make sure loky is installed')
+
+    key = (n_jobs, mp_context)
+    executor = _executors.get(key)
+
+    # Start a new executor if none, or if a worker died
+    if executor is None or getattr(executor, '_broken', False):
+        executor = futures.ProcessPoolExecutor(
+            max_workers=n_jobs, mp_context=mp.get_context(mp_context))
+        _executors[key] = executor
+
+    return executor
+
+
+def shutdown_worker_pool():
+    '''Shut down any non-loky executors, loky workers
+    shut themselves down once idle.'''
+
+    for executor in _executors.values():
+        executor.shutdown(wait=False)
+
+    _executors.clear()
+
+
+atexit.register(shutdown_worker_pool)
@@ -11,6 +11,7 @@ import pickle as pkl
 from ..helpers.Docstring_Helpers import get_new_docstring
 # from ..helpers.Params_Classes import ML_Params
 from ..helpers.CV import CV
+from ..helpers.Worker_Pool import set_worker_pool
 
 
 def Load(loc, exp_name='default', log_dr='default', existing_log='default',
@@ -223,7 +224,8 @@ class BPt_ML():
             When a hyper-parameter search is launched, there are different
             ways through python that the multi-processing can be launched
             (assuming n_jobs > 1). Occassionally some choices can lead to
-            unexpected errors.
+            unexpected errors. The worker processes are started
+            once, and then re-used by every later search.
 
             Choices are:
 
@@ -275,6 +277,9 @@ class BPt_ML():
         self._print('dpi =', self.dpi)
         self._print('mp_context =', self.mp_context)
 
+        # Any parallel searches share one persistent pool of workers
+        set_worker_pool(n_jobs=self.n_jobs, mp_context=self.mp_context)
+
         # Initialze various variables
         self.name_map, self.exclusions, self.inclusions = {}, set(), set()
         self.data, self.covars = pd.DataFrame(), pd.DataFrame()
@@ -431,6 +436,7 @@ class BPt_ML():
                         _drop_data_cols,
                         Filter_Data_Cols,
                         Filter_Data_Files_Cols,
+                        Pack_Data_Files,
                         Proc_Data_Unique_Cols,
                         _proc_data_unique_cols,
                         Drop_Data_Duplicates,
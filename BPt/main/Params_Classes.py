@@ -178,7 +178,8 @@ class Piece(Params, Check):
 class Loader(Piece):
 
     def __init__(self, obj, params=0, scope='data files',
-                 cache_loc=None, extra_params=None):
+                 cache_loc=None, cache_max_size=1e10, stateless='auto',
+                 extra_params=None):
         ''' Loader refers to transformations which operate on loaded Data_Files.
         (See :func:`Load_Data_Files`).
         They in essence take in saved file locations, and after some series
@@ -197,7 +198,12 @@ class Loader(Piece):
             (they just need to have a defined fit_transform function
             which when passed the already loaded file, will return
             a 1D representation of that subjects
-            features.
+            features. Custom objects may also optionally define
+            a transform_batch method, which when passed a list of
+            already loaded files, returns a list of each
+            subject's features. If defined, this will be used instead to
+            load and transform many files per call, where the object is
+            fit just once on the first file.
 
             `obj` can also be passed as a :class:`Pipe`.
             See :class:`Pipe`'s documentation to
@@ -244,6 +250,42 @@ class Loader(Piece):
 
         cache_loc : str, Path or None, optional
             Optional location in which to cache loader transformations.
+            The transformed output of each Data_File is cached
+            based on the file's location, modification time and size,
+            as well as the loader's parameters, s.t., the same cache_loc
+            can be safely re-used across calls to Evaluate, and even
+            shared between different loaders.
+
+            ::
+
+                default = None
+
+        cache_max_size : int, float or None, optional
+            If a cache_loc is passed, this is the maximum size in bytes
+            that the cached outputs can grow to, after which the
+            least recently used outputs are removed.
+            If None, then the cache is never trimmed.
+
+            ::
+
+                default = 1e10
+
+        stateless : 'auto' or bool, optional
+            If a loader is stateless, i.e., its output for a Data_File
+            depends only on that file and the loader's params,
+            then within a call to Evaluate every Data_File is loaded
+            and transformed just once, and the results are re-used
+            across all folds and repeats, rather than re-loaded in each.
+
+            If 'auto', then this is inferred from the loader, where the
+            built in loaders, e.g., 'identity' and 'surface rois',
+            are marked as stateless. Custom loaders can either be
+            marked by setting a class attribute `_stateless = True`,
+            or just by passing True here.
+
+            ::
+
+                default = 'auto'
 
         extra_params : :ref`extra params dict<Extra Params>`, optional
 
@@ -258,6 +300,8 @@ class Loader(Piece):
         self.params = params
         self.scope = scope
         self.cache_loc = cache_loc
+        self.cache_max_size = cache_max_size
+        self.stateless = stateless
         self.extra_params = extra_params
 
         self.check_args()
@@ -731,6 +775,8 @@ class Ensemble(Piece):
                  single_estimator=False,
                  des_split=.2,
                  n_jobs_type='ensemble',
+                 cross_fit=False,
+                 cache_fits=False,
                  extra_params=None):
         ''' The Ensemble object is valid base
         :class:`Model_Pipeline` piece, designed
@@ -926,6 +972,38 @@ class Ensemble(Piece):
 
                 default = 'ensemble'
 
+        cross_fit : bool, optional
+            Used only with stacking ensembles. The base models
+            are always fit on each of the `cv_splits` folds in order to
+            make the out of fold predictions the final estimator
+            is trained on. If False, the base models are then also
+            re-fit on all of the training data, and these refit
+            models are used to make predictions. If True, these
+            fold models are instead kept and their predictions averaged,
+            skipping the re-fit.
+
+            ::
+
+                default = False
+
+        cache_fits : bool, optional
+            Used only with stacking and DES ensembles. If True, then
+            the fitted base models (and with stacking, their out of
+            fold predictions) are cached in memory, s.t., changing
+            only the `base_model` (final estimator) of a stacking
+            ensemble, or only the DES method, does not re-fit them.
+
+            Base models with any random_state left as None are never
+            cached, as re-fitting them could give different results.
+            The cache holds onto a limited number of fitted models
+            for the rest of the session, and can be cleared with
+            `clear_stacking_cache` and `clear_des_cache` from
+            BPt.pipeline.Ensembles.
+
+            ::
+
+                default = False
+
         extra_params : :ref`extra params dict<Extra Params>`, optional
 
             See :ref:`Extra Params`
@@ -952,6 +1030,8 @@ class Ensemble(Piece):
         self.des_split = des_split
         self.single_estimator = single_estimator
         self.n_jobs_type = n_jobs_type
+        self.cross_fit = cross_fit
+        self.cache_fits = cache_fits
         self.extra_params = extra_params
 
         self.check_args()
@@ -981,6 +1061,12 @@ class Param_Search(Params):
                  mp_context='default',
                  n_jobs='default',
                  dask_ip=None,
+                 prune=False,
+                 prune_warmup=5,
+                 cache_prefix=False,
+                 trial_loc=None,
+                 fold_tasks=False,
+                 memoize=False,
                  CV='depreciated',
                  _random_state=None,
                  _splits_vals=None,
@@ -1219,6 +1305,101 @@ class Param_Search(Params):
 
                 default = None
 
+        prune : bool, optional
+            If True, then each candidate set of hyper-parameters is
+            evaluated on the internal CV folds one at a time,
+            and abandoned early if after any fold its mean score so far
+            is worse than the median of the mean scores of the already
+            evaluated candidates on the same folds (median stopping).
+            The score used by the search for a pruned candidate is
+            just the mean over the folds which were evaluated.
+
+            This can greatly reduce the cost of a search with a large
+            `n_iter` and many internal folds. Note that when
+            used with `dask_ip`, candidates are only pruned based on
+            the other candidates evaluated within the same worker.
+
+            ::
+
+                default = False
+
+        prune_warmup : int, optional
+            If `prune` is True, the number of candidates which must
+            first be evaluated on a fold before any candidate
+            can be pruned on that fold.
+
+            ::
+
+                default = 5
+
+        cache_prefix : bool, optional
+            If True, then any leading steps of the pipeline which
+            none of the searched hyper-parameters touch, e.g., a
+            :class:`Loader` or :class:`Imputer` when just searching over
+            the parameters of the final :class:`Model`, are fit only once
+            per internal CV fold, rather than once per fold for every
+            candidate. The transformed train and validation data
+            from these steps are kept in memory for the duration
+            of the search, and shared by all candidates.
+
+            ::
+
+                default = False
+
+        trial_loc : str, Path or None, optional
+            If not None, then this should be the location of a directory
+            in which a small database of every evaluated candidate set of
+            hyper-parameters is kept, along with its per fold scores and
+            timings. Candidates are stored by a fingerprint of the search,
+            i.e., the pipeline, parameter distributions, scorer,
+            data and internal CV splits.
+
+            Any later search with the same fingerprint, e.g., an
+            interrupted search which is re-run, or a new search with a
+            larger `n_iter`, will then be warm started from the
+            stored candidates, and will skip re-fitting any candidate
+            which has already been evaluated. Note that the internal
+            CV splits are only the same between runs if a random
+            state is set.
+
+            ::
+
+                default = None
+
+        fold_tasks : bool, optional
+            By default, when n_jobs > 1, each candidate set of
+            hyper-parameters is evaluated as a single job, with its
+            internal CV folds run one after another. If True, instead
+            each fold of each candidate is run as its own task, and new
+            candidates are only asked for when a worker would otherwise be
+            idle. This keeps all workers busy when `n_iter` is close
+            to or smaller than n_jobs, and stops a slow fold from holding
+            up the rest of its candidate's folds.
+
+            This option is only used when running locally, i.e.,
+            not with `dask_ip`, and `prune` is ignored when it is set.
+
+            ::
+
+                default = False
+
+        memoize : bool, optional
+            Candidates with the same hyper-parameters, e.g., as are
+            often asked for when searching over only choices, are always
+            only evaluated once within a search. If True, then these
+            scores are also kept in memory after the search, and re-used
+            by any later search with the same fingerprint (see
+            `trial_loc`), e.g., from another outer fold with the same
+            data and internal CV splits.
+
+            Computing the fingerprint requires hashing
+            the pipeline and data, so it is skipped unless either
+            this is True or `trial_loc` is set.
+
+            ::
+
+                default = False
+
         CV : 'depreciated'
             Switching to passing cv parameter as cv instead of CV.
             Will raise error if anything is passed here.
@@ -1239,6 +1420,12 @@ class Param_Search(Params):
         self.mp_context = mp_context
         self.n_jobs = n_jobs
         self.dask_ip = dask_ip
+        self.prune = prune
+        self.prune_warmup = prune_warmup
+        self.cache_prefix = cache_prefix
+        self.trial_loc = trial_loc
+        self.fold_tasks = fold_tasks
+        self.memoize = memoize
 
         self._random_state = _random_state
         self._splits_vals = _splits_vals
@@ -1477,8 +1664,9 @@ class Shap_Params(Params):
 class Feat_Importance(Params):
 
     def __init__(self, obj, scorer='default',
-                 shap_params='default', n_perm=10,
-                 inverse_global=False, inverse_local=False):
+                 shap_params='default', n_perm=10, perm_groups=None,
+                 inverse_global=False, inverse_local=False,
+                 spill_dir=None):
         '''
         There are a number of options for creating Feature Importances in BPt.
         See :ref:`Feat Importances` to learn more about
@@ -1535,6 +1723,19 @@ class Feat_Importance(Params):
 
                 default = 10
 
+        perm_groups : None or 'derived', optional
+            Only used with the 'perm' based feature importances.
+            If 'derived', then columns which were derived from the same
+            input feature, e.g., all of the columns a :class:`Loader`
+            extracts from one Data File, are permuted together, and each
+            assigned the importance of the group as a whole.
+
+            If None, each column is permuted on its own.
+
+            ::
+
+                default = None
+
         inverse_global : bool
             Warning: This feature, along with inverse_local, is still
             expirimental.
@@ -1571,6 +1772,21 @@ class Feat_Importance(Params):
 
                 default = False
 
+        spill_dir : str, Path or None, optional
+            Local feature importances are accumulated
+            across folds and repeats as running averages and variances,
+            which, for very wide runs, e.g., shap with many thousands of
+            features, can still take up a large amount of memory.
+            If passed a directory here, these running values will
+            instead be stored in memory mapped files within
+            this directory.
+
+            If None, keep them in memory.
+
+            ::
+
+                default = None
+
         '''
 
         self.obj = obj
@@ -1585,8 +1801,10 @@ class Feat_Importance(Params):
 
         self.shap_params = shap_params
         self.n_perm = n_perm
+        self.perm_groups = perm_groups
         self.inverse_global = inverse_global
         self.inverse_local = inverse_local
+        self.spill_dir = spill_dir
 
         # For compatibility
         self.params = 0
@@ -2090,6 +2308,7 @@ class Problem_Spec(Params):
                  target=0, scorer='default', weight_scorer=False,
                  scope='all', subjects='all',
                  n_jobs='default',
+                 fold_n_jobs=1,
                  random_state='default'):
         '''Problem Spec is defined as an object of params encapsulating the set of
         parameters shared by modelling class functions
@@ -2223,10 +2442,35 @@ class Problem_Spec(Params):
             param search, n_jobs will be used for each piece individually, though some
             might not support it.
 
+            If `fold_n_jobs` is set above 1, then n_jobs is treated as the
+            total budget, and is split between the fold level and the
+            pipeline level (see `fold_n_jobs`).
+
             ::
 
                 default = 'default'
 
+        fold_n_jobs : int, optional
+            The number of folds (within each repeated fold of Evaluate)
+            to fit and score in parallel, where each fold is run
+            in a seperate process via joblib's loky backend.
+            The results from each fold, i.e., scores, raw predictions,
+            models and feature importances, are gathered back in
+            the same order as if run sequentially.
+
+            When set above 1, the `n_jobs` budget is split between levels,
+            such that each of the `fold_n_jobs` folds are run with
+            n_jobs // fold_n_jobs jobs (with a minimum of 1) passed on
+            to the model pipeline, e.g., to the models or to a
+            :class:`Param_Search`. This avoids over-subscribing
+            the avaliable cores.
+
+            This parameter only has an effect within Evaluate.
+
+            ::
+
+                default = 1
+
         random_state : int, RandomState instance, None or 'default', optional
             Random state, either as int for a specific seed, or if None then
             the random seed is set by np.random.
@@ -2253,6 +2497,7 @@ class Problem_Spec(Params):
         self.scope = scope
         self.subjects = subjects
         self.n_jobs = n_jobs
+        self.fold_n_jobs = fold_n_jobs
         self.random_state = random_state
 
         self._final_subjects = None
@@ -2287,6 +2532,8 @@ class Problem_Spec(Params):
             _print('len(subjects) =', len(self._final_subjects),
                    '(before overlap w/ train/test subjects)')
         _print('n_jobs =', self.n_jobs)
+        if self.fold_n_jobs != 1:
+            _print('fold_n_jobs =', self.fold_n_jobs)
         _print('random_state =', self.random_state)
         _print()
 
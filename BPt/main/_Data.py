@@ -10,7 +10,8 @@ from joblib import wrap_non_picklable_objects
 
 from ..helpers.VARS import is_f2b
 from ..helpers.Data_Scopes import Data_Scopes
-from ..helpers.Data_File import Data_File
+from ..helpers.Data_File import (Data_File, check_mmap_mode,
+                                 pack_data_files)
 from ..helpers.Data_Helpers import (auto_data_type,
                                     process_binary_input,
                                     process_ordinal_input,
@@ -567,7 +568,8 @@ def Load_Data_Files(self, loc=None, df=None, files=None,
                     eventname_col='default', overlap_subjects='default',
                     merge='default',
                     reduce_func=np.mean, filter_outlier_percent=None,
-                    filter_outlier_std=None, clear_existing=False, ext=None):
+                    filter_outlier_std=None, clear_existing=False, ext=None,
+                    mmap_mode=None):
     """Class method for loading in data as file paths, where file paths correspond
     to some sort of raw data which should only be actually loaded / proc'ed
     within the actual modelling. The further assumption made is
@@ -729,9 +731,29 @@ def Load_Data_Files(self, loc=None, df=None, files=None,
         leave as None to ignore this param. Note: applied after
         name mapping.
 
+        (default = None)
+
+    mmap_mode : None, 'r' or 'c', optional
+        If not None, then each Data_File will be loaded as memory-mapped,
+        with this mode passed to `load_func`, as
+        load_func(loc, mmap_mode=mmap_mode). This works with the
+        default np.load, or any custom `load_func` which accepts a
+        mmap_mode argument, otherwise an error is raised.
+
+        Memory-mapped files are only read from disk
+        as they are accessed, and are backed by the page cache rather than
+        copied in to the memory of each process, which is useful for
+        large data files, e.g., time-series, in particular when
+        loading with multiple processes. Either 'r' (read-only)
+        or 'c' (copy-on-write) can be used, as modes which could write
+        to the saved data files are not allowed.
+
         (default = None)
     """
 
+    # Check before loading anything
+    check_mmap_mode(mmap_mode, load_func)
+
     # Clear existing if requested, otherwise append to
     if clear_existing:
         self.Clear_Data()
@@ -775,7 +797,8 @@ def Load_Data_Files(self, loc=None, df=None, files=None,
     for col in data:
         for subject in data.index:
 
-            data_file = Data_File(data.at[subject, col], wrapped_load_func)
+            data_file = Data_File(data.at[subject, col], wrapped_load_func,
+                                  mmap_mode=mmap_mode)
             file_mapping[cnt] = data_file
 
             data.at[subject, col] = cnt
@@ -2136,6 +2159,50 @@ def Filter_Data_Cols(self, filter_outlier_percent=None,
                                  _print=self._print)
 
 
+def Pack_Data_Files(self, loc, mmap_mode=None):
+    '''Consolidate all of the currently loaded Data_Files (See
+    :func:`Load_Data_Files`) into one packed file, s.t., instead of
+    each Data_File opening its own small file, it is
+    loaded as a slice of the single packed file. This can be much
+    faster with many subjects, in particular on network or parallel
+    filesystems.
+
+    Each Data_File is loaded once with its load_func, and the
+    resulting array is written to the packed file, with an
+    index of the offset, shape and dtype of each saved at loc + '.json'.
+    The loaded Data_Files must therefore load as numeric arrays.
+
+    If the same files, checked by location, modification time and size,
+    have already been packed at loc with the same load_func, then the
+    existing packed file is re-used.
+
+    Parameters
+    ----------
+    loc : str or Path
+        The location of the packed file to create or re-use.
+
+    mmap_mode : None, 'r' or 'c', optional
+        If not None, then each packed Data_File is loaded as a memory-mapped
+        slice of the packed file, with this mode.
+        See param `mmap_mode` in :func:`Load_Data_Files`.
+
+        ::
+
+            default = None
+    '''
+
+    check_mmap_mode(mmap_mode)
+
+    if len(self.file_mapping) == 0:
+        self._print('No Data_Files are loaded, nothing to pack.')
+        return
+
+    self._print('Packing', len(self.file_mapping), 'Data_Files to:', loc)
+
+    self.file_mapping = pack_data_files(self.file_mapping, loc,
+                                        mmap_mode=mmap_mode)
+
+
 def Filter_Data_Files_Cols(self, reduce_func=np.mean,
                            filter_outlier_percent=None,
                            filter_outlier_std=None,
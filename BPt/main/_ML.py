@@ -16,6 +16,7 @@ from ..helpers.Data_Helpers import (get_unique_combo_df,
 from ..helpers.ML_Helpers import (compute_micro_macro, conv_to_list,
                                   get_avaliable_run_name)
 from ..pipeline.Evaluator import Evaluator
+from ..helpers.Resources import get_layout
 from ..main.Params_Classes import (CV_Splits, Feat_Importance, Model_Pipeline,
                                    Model, Problem_Spec)
 from ..pipeline.Model_Pipeline import get_pipe
@@ -642,6 +643,14 @@ def Evaluate(self,
     # Pre-proc problem spec, set as copy ps, right before print
     ps = self._preproc_problem_spec(problem_spec)
 
+    # Split the n_jobs budget between the nested levels of parallelism,
+    # s.t., at most as many folds run at once as fit in the budget,
+    # and the pipeline gets the per fold share
+    layout = get_layout(ps.n_jobs, ps.fold_n_jobs,
+                        model_pipeline.param_search is not None)
+    ps.fold_n_jobs = layout['folds']
+    ps.n_jobs = layout['search'] * layout['models']
+
     # Run checks before print
     model_pipeline._proc_checks()
 
@@ -661,6 +670,7 @@ def Evaluate(self,
         self._print('len(train_subjects) =', len(_train_subjects),
                     '(before overlap w/ problem_spec.subjects)')
         self._print('run_name =', run_name)
+        self._print('n_jobs layout =', layout)
         self._print()
 
     # Init the Model_Pipeline object with modeling params
@@ -950,6 +960,12 @@ def Test(self,
     # Pre-proc problem spec, set as copy ps, right before print
     ps = self._preproc_problem_spec(problem_spec)
 
+    # Split the n_jobs budget between the nested levels of parallelism,
+    # where Test runs just one fold
+    layout = get_layout(ps.n_jobs, 1,
+                        model_pipeline.param_search is not None)
+    ps.n_jobs = layout['search'] * layout['models']
+
     # Run checks before print
     model_pipeline._proc_checks()
 
@@ -969,6 +985,7 @@ def Test(self,
                     '(before overlap w/ problem_spec.subjects)')
         self._print('feat_importances =', feat_importances)
         self._print('run_name =', run_name)
+        self._print('n_jobs layout =', layout)
         self._print()
 
     # Init the Model_Pipeline object with modeling params
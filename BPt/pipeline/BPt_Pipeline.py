@@ -1,4 +1,5 @@
 from sklearn.pipeline import Pipeline
+from sklearn.base import clone
 import numpy as np
 from ..helpers.VARS import ORDERED_NAMES
 
@@ -50,8 +51,7 @@ class BPt_Pipeline(Pipeline):
         super()._set_params('steps', **kwargs)
         return self
 
-    def fit(self, X, y=None, mapping=None,
-            train_data_index=None, **fit_params):
+    def _set_defaults(self):
 
         if self.to_map is None:
             self.to_map = []
@@ -60,13 +60,22 @@ class BPt_Pipeline(Pipeline):
         if self.names is None:
             self.names = []
 
-        # Add mapping to fit params, as either passed or new
+    def _get_mapping(self, X, mapping):
+
+        # Mapping as either passed or new
         if mapping is not None:
-            self._mapping = mapping.copy()
+            return mapping.copy()
         elif self.add_mapping:
-            self._mapping = {i: i for i in range(X.shape[1])}
-        else:
-            self._mapping = {}
+            return {i: i for i in range(X.shape[1])}
+        return {}
+
+    def fit(self, X, y=None, mapping=None,
+            train_data_index=None, **fit_params):
+
+        self._set_defaults()
+
+        # Add mapping to fit params, as either passed or new
+        self._mapping = self._get_mapping(X, mapping)
 
         for name in self.to_map:
             fit_params[name + '__mapping'] = self._mapping
@@ -76,6 +85,68 @@ class BPt_Pipeline(Pipeline):
         super().fit(X, y, **fit_params)
         return self
 
+    def get_prefix_len(self, param_names):
+        '''Returns the number of leading steps, not including the
+        final step, which are not touched by any of the passed
+        param names.'''
+
+        step_names = [step[0] for step in self.steps]
+        touched = set(name.split('__')[0] for name in param_names)
+
+        # Any params not set on a specific step could change any step
+        if len(touched - set(step_names)) > 0:
+            return 0
+
+        n_steps = 0
+        for name in step_names[:-1]:
+            if name in touched:
+                break
+            n_steps += 1
+
+        return n_steps
+
+    def fit_prefix(self, n_steps, X, y=None, mapping=None,
+                   train_data_index=None):
+        '''Fit copies of just the first n_steps, returning the fitted
+        steps, the transformed X and the mapping after those steps.
+        The rest of the pipeline can then be fit on the transformed X,
+        see :func:`get_suffix`.'''
+
+        self._set_defaults()
+        mapping = self._get_mapping(X, mapping)
+
+        prefix = []
+        for name, est in self.steps[:n_steps]:
+
+            if est is None or est == 'passthrough':
+                continue
+
+            fit_params = {}
+            if name in self.to_map:
+                fit_params['mapping'] = mapping
+            if name in self.needs_index:
+                fit_params['train_data_index'] = train_data_index
+
+            est = clone(est)
+            X = est.fit_transform(X, y, **fit_params)
+            prefix.append((name, est))
+
+        return prefix, X, mapping
+
+    def get_suffix(self, n_steps):
+        '''Returns a new BPt_Pipeline with all but the first n_steps,
+        to be fit on the output of :func:`fit_prefix`.'''
+
+        self._set_defaults()
+        suffix_names = set(step[0] for step in self.steps[n_steps:])
+
+        return BPt_Pipeline(self.steps[n_steps:], memory=self.memory,
+                            verbose=self.verbose,
+                            to_map=[name for name in self.to_map
+                                    if name in suffix_names],
+                            needs_index=[name for name in self.needs_index
+                                         if name in suffix_names])
+
     def _get_objs_by_name(self):
 
         if self.names is None:
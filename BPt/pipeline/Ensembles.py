@@ -1,5 +1,6 @@
 from ..helpers.ML_Helpers import (replace_with_in_params,
-                                  get_obj_and_params, set_n_jobs)
+                                  get_obj_and_params, set_n_jobs,
+                                  get_possible_init_params)
 
 from deslib.dcs.a_posteriori import APosteriori
 from deslib.dcs.a_priori import APriori
@@ -28,18 +29,191 @@ from deslib.static.single_best import SingleBest
 from deslib.static.stacked import StackedClassifier
 
 from copy import deepcopy
+from collections import OrderedDict
+from functools import partial
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import (BaggingClassifier, BaggingRegressor,
                               AdaBoostRegressor, AdaBoostClassifier)
 from sklearn.ensemble import (StackingRegressor, StackingClassifier,
                               VotingClassifier, VotingRegressor)
 from joblib import Parallel, delayed
-from sklearn.base import clone, is_classifier
-from sklearn.utils import Bunch
-from sklearn.model_selection import check_cv, cross_val_predict
+from joblib import hash as joblib_hash
+from sklearn.base import (BaseEstimator, ClassifierMixin, clone,
+                          is_classifier)
+from sklearn.utils import Bunch, _safe_indexing
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import LabelEncoder
+from sklearn.model_selection import check_cv
 import numpy as np
-from .base import _fit_single_estimator, _get_est_fit_params
+from .base import _fit_single_estimator
 from ..main.Params_Classes import CV_Splits
+from ..helpers.Shared_Data import Shared_Data, load_shared
+from ..helpers.Resources import split_n_jobs
+
+
+# If cache_fits, fitted base estimators and their out of fold predictions,
+# keyed by the base estimator's params, the data and the CV splits, s.t.,
+# stacking ensembles which differ only in their final estimator,
+# e.g., re-running Evaluate with another meta-learner, don't refit
+# their base estimators.
+STACKING_CACHE_SIZE = 32
+_stacking_cache = OrderedDict()
+
+
+def clear_stacking_cache():
+    _stacking_cache.clear()
+
+
+def _is_deterministic(estimator):
+    '''If any random_state within the estimator is None or a
+    RandomState, re-fitting it can give different results, so
+    its fits shouldn't be re-used.'''
+
+    for key, value in estimator.get_params(deep=True).items():
+        if key == 'random_state' or key.endswith('__random_state'):
+            if value is None or isinstance(value, np.random.RandomState):
+                return False
+
+    return True
+
+
+def _cache_get(key):
+
+    if key is None:
+        return None
+
+    if key in _stacking_cache:
+        _stacking_cache.move_to_end(key)
+        return _stacking_cache[key]
+
+    return None
+
+
+def _cache_put(key, value):
+
+    if key is None:
+        return
+
+    _stacking_cache[key] = value
+    while len(_stacking_cache) > STACKING_CACHE_SIZE:
+        _stacking_cache.popitem(last=False)
+
+
+def _align_proba(proba, est_classes, classes):
+    '''Map the predict_proba columns of an estimator fit on only
+    est_classes, onto the columns of all of the classes.'''
+
+    if len(est_classes) == len(classes):
+        return proba
+
+    aligned = np.zeros((len(proba), len(classes)), dtype=proba.dtype)
+    aligned[:, np.searchsorted(classes, est_classes)] = proba
+
+    return aligned
+
+
+class Fold_Averaged_Estimator():
+    '''Predicts with the average over the estimators
+    fit on each CV fold, used by cross fit stacking in place of
+    refitting each base estimator on all of the training data.'''
+
+    def __init__(self, estimators):
+        self.estimators_ = estimators
+
+    @property
+    def classes_(self):
+
+        # Any class seen by any of the folds
+        return np.unique(np.concatenate([est.classes_
+                                         for est in self.estimators_]))
+
+    def _average(self, method, X):
+        return np.mean([getattr(est, method)(X)
+                        for est in self.estimators_], axis=0)
+
+    def predict(self, X):
+
+        if not is_classifier(self.estimators_[0]):
+            return self._average('predict', X)
+
+        # Classifiers predict the class w/ the highest average proba
+        if all(hasattr(est, 'predict_proba') for est in self.estimators_):
+            proba = self.predict_proba(X)
+            return self.classes_[np.argmax(proba, axis=1)]
+
+        # Or if no predict_proba, the majority vote over the folds
+        classes = self.classes_
+        votes = np.zeros((len(X), len(classes)), dtype=int)
+        for est in self.estimators_:
+            preds = np.searchsorted(classes, est.predict(X))
+            votes[np.arange(len(X)), preds] += 1
+
+        return classes[np.argmax(votes, axis=1)]
+
+    def predict_proba(self, X):
+
+        classes = self.classes_
+        return np.mean([_align_proba(est.predict_proba(X), est.classes_,
+                                     classes)
+                        for est in self.estimators_], axis=0)
+
+    def decision_function(self, X):
+
+        if any(len(est.classes_) != len(self.classes_)
+               for est in self.estimators_):
+            raise ValueError('Fold estimators must each be fit on all of '
+                             'the classes to average decision_function.')
+
+        return self._average('decision_function', X)
+
+
+def _fit_fold(estimator, X, y, train, test, method, sample_weight=None,
+              mapping=None, train_data_index=None):
+    '''Fit a clone of estimator on the train fold, then returns it along
+    with its predictions on the test fold, or if test is None, just the
+    estimator fit on all of X.'''
+
+    if train is not None:
+        X_train, y_train = _safe_indexing(X, train), _safe_indexing(y, train)
+
+        if sample_weight is not None:
+            sample_weight = _safe_indexing(sample_weight, train)
+        if train_data_index is not None:
+            train_data_index = train_data_index[train]
+
+    else:
+        X_train, y_train = X, y
+
+    estimator = _fit_single_estimator(clone(estimator), X_train, y_train,
+                                      sample_weight, mapping,
+                                      train_data_index)
+
+    if test is None:
+        return estimator, None
+
+    preds = getattr(estimator, method)(_safe_indexing(X, test))
+
+    # If the train fold was missing any classes, keep the
+    # proba columns the same across folds
+    if method == 'predict_proba':
+        preds = _align_proba(preds, estimator.classes_, np.unique(y))
+
+    return estimator, preds
+
+
+def _join_fold_preds(fold_preds, splits, n_samples):
+
+    test_inds = np.concatenate([test for _, test in splits])
+    if len(test_inds) != n_samples or \
+       len(np.unique(test_inds)) != n_samples:
+        raise ValueError('Stacking requires CV splits which '
+                         'partition the training data.')
+
+    preds = np.concatenate(fold_preds)
+    predictions = np.empty_like(preds)
+    predictions[test_inds] = preds
+
+    return predictions
 
 
 def pass_params_fit(self, X, y, sample_weight=None, mapping=None,
@@ -52,25 +226,6 @@ def pass_params_fit(self, X, y, sample_weight=None, mapping=None,
 
     stack_method = [self.stack_method] * len(all_estimators)
 
-    # Fit the base estimators on the whole training data. Those
-    # base estimators will be used in transform, predict, and
-    # predict_proba. They are exposed publicly.
-    self.estimators_ = Parallel(n_jobs=self.n_jobs)(
-        delayed(_fit_single_estimator)(clone(est), X, y, sample_weight,
-                                       mapping, train_data_index)
-        for est in all_estimators if est != 'drop'
-    )
-
-    self.named_estimators_ = Bunch()
-    est_fitted_idx = 0
-    for name_est, org_est in zip(names, all_estimators):
-        if org_est != 'drop':
-            self.named_estimators_[name_est] = self.estimators_[
-                est_fitted_idx]
-            est_fitted_idx += 1
-        else:
-            self.named_estimators_[name_est] = 'drop'
-
     # To train the meta-classifier using the most data as possible, we use
     # a cross-validation to obtain the output of the stacked estimators.
     if isinstance(self.cv, CV_Splits):
@@ -85,40 +240,109 @@ def pass_params_fit(self, X, y, sample_weight=None, mapping=None,
     if hasattr(cv, 'random_state') and cv.random_state is None:
         cv.random_state = np.random.RandomState()
 
+    # Get the splits once, s.t., each estimator is fit on the same folds
+    splits = list(deepcopy(cv).split(X, y))
+
     self.stack_method_ = [
         self._method_name(name, est, meth)
         for name, est, meth in zip(names, all_estimators, stack_method)
     ]
 
-    # Base fit params for sample weight
-    sample_weight_params = ({"sample_weight": sample_weight}
-                            if sample_weight is not None else None)
-
-    # Get the fit params for each indv estimator
-    all_fit_params = [_get_est_fit_params(est, mapping=mapping,
-                                          train_data_index=train_data_index,
-                                          other_params=sample_weight_params)
-                      for est in all_estimators]
-
-    # Make the cross validated internal predictions to train
-    # the final_estimator
-    predictions = Parallel(n_jobs=self.n_jobs)(
-        delayed(cross_val_predict)(clone(est), X, y, cv=deepcopy(cv),
-                                   method=meth, n_jobs=self.n_jobs,
-                                   fit_params=fit_params,
-                                   verbose=self.verbose)
-        for est, meth, fit_params in zip(all_estimators,
-                                         self.stack_method_,
-                                         all_fit_params) if est != 'drop'
-    )
-
     # Only not None or not 'drop' estimators will be used in transform.
     # Remove the None from the method as well.
+    estimators = [est for est in all_estimators if est != 'drop']
     self.stack_method_ = [
         meth for (meth, est) in zip(self.stack_method_, all_estimators)
         if est != 'drop'
     ]
 
+    # If cache_fits, key each deterministic base estimator's fold models
+    # and out of fold predictions, and full fit if not cross fit,
+    # on its params, the data and splits. A key of None is never cached.
+    oof_keys = [None for _ in estimators]
+    full_keys = [None for _ in estimators]
+
+    if self.cache_fits:
+        data_key = joblib_hash((X, y, sample_weight, mapping,
+                                train_data_index))
+        splits_key = joblib_hash(splits)
+
+        for i, (est, meth) in enumerate(zip(estimators,
+                                            self.stack_method_)):
+            if _is_deterministic(est):
+                est_key = joblib_hash(clone(est))
+                oof_keys[i] = (est_key, meth, data_key, splits_key)
+                full_keys[i] = (est_key, data_key)
+
+    # Only fit what isn't already cached
+    oof_results = [_cache_get(key) for key in oof_keys]
+    full_results = [None if self.cross_fit else _cache_get(key)
+                    for key in full_keys]
+
+    jobs = []
+    for i, est in enumerate(estimators):
+        if oof_results[i] is None:
+            jobs += [(i, train, test) for train, test in splits]
+        if not self.cross_fit and full_results[i] is None:
+            jobs.append((i, None, None))
+
+    # Run every fold and full fit of every base estimator as one flat
+    # set of jobs. Since only fitted estimators and predictions are
+    # returned, X can be safely published once as a memmap.
+    with Shared_Data() as shared:
+
+        if self.n_jobs is not None and self.n_jobs != 1 and len(jobs) > 1:
+            X_s = load_shared(shared.share(X))
+        else:
+            X_s = X
+
+        fitted = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_fold)(estimators[i], X_s, y, train, test,
+                               self.stack_method_[i],
+                               sample_weight=sample_weight,
+                               mapping=mapping,
+                               train_data_index=train_data_index)
+            for i, train, test in jobs)
+
+    # Gather the new results by estimator, then add to the cache
+    new_folds = {}
+    for (i, train, test), (est, preds) in zip(jobs, fitted):
+        if train is None:
+            full_results[i] = est
+            _cache_put(full_keys[i], est)
+        else:
+            new_folds.setdefault(i, []).append((est, preds))
+
+    for i, folds in new_folds.items():
+        fold_models = [est for est, _ in folds]
+        predictions = _join_fold_preds([preds for _, preds in folds],
+                                       splits, len(y))
+
+        oof_results[i] = (fold_models, predictions)
+        _cache_put(oof_keys[i], oof_results[i])
+
+    self.fold_estimators_ = [res[0] for res in oof_results]
+    predictions = [res[1] for res in oof_results]
+
+    # The base estimators used in transform, predict, and predict_proba
+    # are either fit on the whole training data, or if cross fit,
+    # the average of the fold models. They are exposed publicly.
+    if self.cross_fit:
+        self.estimators_ = [Fold_Averaged_Estimator(fold_models)
+                            for fold_models in self.fold_estimators_]
+    else:
+        self.estimators_ = full_results
+
+    self.named_estimators_ = Bunch()
+    est_fitted_idx = 0
+    for name_est, org_est in zip(names, all_estimators):
+        if org_est != 'drop':
+            self.named_estimators_[name_est] = self.estimators_[
+                est_fitted_idx]
+            est_fitted_idx += 1
+        else:
+            self.named_estimators_[name_est] = 'drop'
+
     # Whatever the final estimator is might use train data index,
     # but I don't see why it would need mapping - as the final estimator
     # is being trained on only the predictions from the base models...
@@ -135,19 +359,176 @@ def pass_params_fit(self, X, y, sample_weight=None, mapping=None,
 class BPtStackingRegressor(StackingRegressor):
     needs_mapping = True
     needs_train_data_index = True
+
+    def __init__(self, estimators, final_estimator=None, cv=None,
+                 n_jobs=None, passthrough=False, verbose=0,
+                 cross_fit=False, cache_fits=False):
+
+        super().__init__(estimators=estimators,
+                         final_estimator=final_estimator,
+                         cv=cv, n_jobs=n_jobs, passthrough=passthrough,
+                         verbose=verbose)
+        self.cross_fit = cross_fit
+        self.cache_fits = cache_fits
+
     fit = pass_params_fit
 
 
 class BPtStackingClassifier(StackingClassifier):
     needs_mapping = True
     needs_train_data_index = True
-    fit = pass_params_fit
+
+    def __init__(self, estimators, final_estimator=None, cv=None,
+                 stack_method='auto', n_jobs=None, passthrough=False,
+                 verbose=0, cross_fit=False, cache_fits=False):
+
+        super().__init__(estimators=estimators,
+                         final_estimator=final_estimator,
+                         cv=cv, stack_method=stack_method, n_jobs=n_jobs,
+                         passthrough=passthrough, verbose=verbose)
+        self.cross_fit = cross_fit
+        self.cache_fits = cache_fits
+
+    def fit(self, X, y, sample_weight=None, mapping=None,
+            train_data_index=None, **kwargs):
+
+        # As in StackingClassifier, fit on the encoded labels, which
+        # predict then decodes. Newer versions of sklearn call the
+        # encoder _label_encoder, so set both.
+        self._le = LabelEncoder().fit(y)
+        self._label_encoder = self._le
+        self.classes_ = self._le.classes_
+
+        return pass_params_fit(self, X, self._le.transform(y),
+                               sample_weight=sample_weight, mapping=mapping,
+                               train_data_index=train_data_index, **kwargs)
+
+
+# If cache_fits, fitted DES pools, along with their predictions on the
+# held out ensemble split, and the fitted kNN indices over those splits.
+# Keyed on the base estimators' params, the data and the split, s.t.,
+# comparing different DES methods on the same pool only fits the pool once.
+DES_CACHE_SIZE = 8
+_des_pool_cache = OrderedDict()
+_des_knn_cache = OrderedDict()
+
+
+def clear_des_cache():
+    _des_pool_cache.clear()
+    _des_knn_cache.clear()
+
+
+def _des_cache_get(cache, key):
+
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+
+    return None
+
+
+def _des_cache_put(cache, key, value):
+
+    cache[key] = value
+    while len(cache) > DES_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+class Shared_KNN(KNeighborsClassifier):
+    '''kNN used by the DES methods to find regions of competence,
+    which re-uses the fitted neighbor index if already fit on the same
+    data, e.g., by another DES method over the same ensemble split.'''
+
+    def fit(self, X, y):
+
+        # The index doesn't depend on the number of neighbors
+        params = self.get_params()
+        params.pop('n_neighbors')
+        key = joblib_hash((X, y, params))
+
+        # Only the fitted state is shared, not the params
+        fitted = _des_cache_get(_des_knn_cache, key)
+        if fitted is None:
+            super().fit(X, y)
+
+            init_params = self.get_params()
+            fitted = {attr: value for attr, value in vars(self).items()
+                      if attr not in init_params}
+            _des_cache_put(_des_knn_cache, key, fitted)
+
+        else:
+            for attr, value in fitted.items():
+                setattr(self, attr, value)
+
+        return self
+
+
+class Pool_Member(ClassifierMixin, BaseEstimator):
+    '''A fitted base estimator of a DES pool, along with its
+    predictions on the ensemble split, which are re-used when the
+    DES method asks for predictions on that same data.'''
+
+    def __init__(self, estimator, X_ensemble, preds, proba=None):
+
+        self.estimator = estimator
+        self.X_ensemble = X_ensemble
+        self.preds = preds
+        self.proba = proba
+
+    @property
+    def classes_(self):
+        return self.estimator.classes_
+
+    def __sklearn_is_fitted__(self):
+        return True
+
+    def fit(self, X, y, **fit_params):
+        raise RuntimeError('Pool members are already fit.')
+
+    def _is_ensemble(self, X):
+        return X.shape == self.X_ensemble.shape and \
+            np.array_equal(X, self.X_ensemble)
+
+    def predict(self, X):
+
+        if self._is_ensemble(X):
+            return self.preds
+
+        return self.estimator.predict(X)
+
+
+class Proba_Pool_Member(Pool_Member):
+    '''A :class:`Pool_Member` whose base estimator
+    also supports predict_proba.'''
+
+    def predict_proba(self, X):
+
+        if self._is_ensemble(X):
+            return self.proba
+
+        return self.estimator.predict_proba(X)
+
+
+def _fit_pool_member(estimator, X_train, y_train, X_ensemble,
+                     sample_weight=None):
+
+    estimator = _fit_single_estimator(clone(estimator), X_train, y_train,
+                                      sample_weight)
+
+    preds = estimator.predict(X_ensemble)
+
+    if hasattr(estimator, 'predict_proba'):
+        return Proba_Pool_Member(estimator, X_ensemble, preds,
+                                 estimator.predict_proba(X_ensemble))
+
+    return Pool_Member(estimator, X_ensemble, preds)
 
 
 class DES_Ensemble(VotingClassifier):
 
     def __init__(self, estimators, ensemble, ensemble_name, ensemble_split,
-                 ensemble_params=None, random_state=None, weights=None):
+                 ensemble_params=None, random_state=None, weights=None,
+                 n_jobs=None, cache_fits=False):
 
         self.estimators = estimators
         self.ensemble = ensemble
@@ -160,30 +541,86 @@ class DES_Ensemble(VotingClassifier):
 
         self.random_state = random_state
         self.weights = weights
+        self.n_jobs = n_jobs
+        self.cache_fits = cache_fits
 
-    def fit(self, X, y, sample_weight=None):
-        '''Assume y is multi-class'''
+    def _fit_pool(self, X, y, sample_weight=None):
 
-        X_train, X_ensemble, y_train, y_ensemble =\
-            train_test_split(X, y, test_size=self.ensemble_split,
+        train_inds, ensemble_inds =\
+            train_test_split(np.arange(len(y)),
+                             test_size=self.ensemble_split,
                              random_state=self.random_state,
                              stratify=y)
 
-        # Fit estimators
-        # See Base Ensemble for why this implementation is bad
-        try:
-            self.estimators_ = [estimator[1].fit(X_train, y_train,
-                                sample_weight=sample_weight)
-                                for estimator in self.estimators]
-        except TypeError:
-            self.estimators_ = [estimator[1].fit(X_train, y_train)
-                                for estimator in self.estimators]
-        # super().fit(X_train, y_train, sample_weight)
+        X_train, X_ensemble = X[train_inds], X[ensemble_inds]
+        y_train, y_ensemble = y[train_inds], y[ensemble_inds]
+
+        if sample_weight is not None:
+            sample_weight = sample_weight[train_inds]
+
+        # Fit each base estimator in parallel, along with its predictions
+        # on the ensemble split. Only fitted estimators and predictions are
+        # returned, so X_train can be safely published once as a memmap.
+        with Shared_Data() as shared:
+
+            if self.n_jobs is not None and self.n_jobs != 1:
+                X_train_s = load_shared(shared.share(X_train))
+            else:
+                X_train_s = X_train
+
+            pool = Parallel(n_jobs=self.n_jobs)(
+                delayed(_fit_pool_member)(estimator[1], X_train_s, y_train,
+                                          X_ensemble, sample_weight)
+                for estimator in self.estimators)
+
+        return pool, X_ensemble, y_ensemble
+
+    def fit(self, X, y, sample_weight=None):
+        '''Assume y is multi-class'''
+
+        X, y = np.asarray(X), np.asarray(y)
+        if sample_weight is not None:
+            sample_weight = np.asarray(sample_weight)
+
+        # If cache_fits, fit the pool unless already fit on this data
+        # and split. Only cache if the split and pool are reproducible.
+        key = None
+        if self.cache_fits and \
+           isinstance(self.random_state, (int, np.integer)) and \
+           all(_is_deterministic(estimator[1])
+               for estimator in self.estimators):
+
+            key = joblib_hash(([clone(estimator[1])
+                                for estimator in self.estimators],
+                               X, y, sample_weight, self.ensemble_split,
+                               self.random_state))
+
+        cached = None if key is None else \
+            _des_cache_get(_des_pool_cache, key)
+
+        if cached is None:
+            cached = self._fit_pool(X, y, sample_weight=sample_weight)
+
+            if key is not None:
+                _des_cache_put(_des_pool_cache, key, cached)
+
+        pool, X_ensemble, y_ensemble = cached
+        self.estimators_ = [member.estimator for member in pool]
 
         self.ensemble_ = deepcopy(self.ensemble)
-        self.ensemble_.set_params(pool_classifiers=self.estimators_)
+        self.ensemble_.set_params(pool_classifiers=pool)
         self.ensemble_.set_params(**self.ensemble_params)
 
+        # Share the competence region kNN across DES methods
+        if self.cache_fits and \
+           getattr(self.ensemble_, 'knn_classifier', None) in \
+           [None, 'knn', 'sklearn'] and \
+           getattr(self.ensemble_, 'knn_metric', None) == 'minkowski':
+            self.ensemble_.set_params(
+                knn_classifier=partial(Shared_KNN,
+                                       n_jobs=self.ensemble_.n_jobs,
+                                       algorithm='auto'))
+
         self.ensemble_.fit(X_ensemble, y_ensemble)
 
         return self
@@ -283,7 +720,8 @@ class Ensemble_Wrapper():
             # If DES Ensemble,
             if ensemble_params.is_des:
                 return self._wrap_des(models, ensemble,
-                                      ensemble_params.ensemble_split)
+                                      ensemble_params.des_split,
+                                      ensemble_params.cache_fits)
 
             # If no split and single estimator
             elif ensemble_params.single_estimator:
@@ -298,9 +736,12 @@ class Ensemble_Wrapper():
                                            final_estimator,
                                            final_estimator_params,
                                            ensemble_params.n_jobs_type,
-                                           ensemble_params.cv_splits)
+                                           ensemble_params.cv_splits,
+                                           ensemble_params.cross_fit,
+                                           ensemble_params.cache_fits)
 
-    def _wrap_des(self, models, ensemble_info, ensemble_split):
+    def _wrap_des(self, models, ensemble_info, ensemble_split,
+                  cache_fits=False):
 
         # Unpack ensemble info
         ensemble_name = ensemble_info[0]
@@ -314,10 +755,11 @@ class Ensemble_Wrapper():
         if hasattr(ensemble, 'random_state'):
             setattr(ensemble, 'random_state', self.random_state)
 
-        # Regardless of n_jobs_type, go with models, as
-        # default des doesn't handle multi-proc well.
+        # Regardless of n_jobs_type, split between fitting the pool
+        # and the models, as default des doesn't handle multi-proc well.
+        pool_n_jobs, model_n_jobs = split_n_jobs(self.n_jobs, len(models))
         set_n_jobs(ensemble, 1)
-        set_n_jobs(models, self.n_jobs)
+        set_n_jobs(models, model_n_jobs)
 
         # Create pipeline compatible des ensemble
         new_ensemble =\
@@ -326,7 +768,9 @@ class Ensemble_Wrapper():
                                           ensemble_name,
                                           ensemble_split,
                                           ensemble_extra_params,
-                                          self.random_state))]
+                                          self.random_state,
+                                          n_jobs=pool_n_jobs,
+                                          cache_fits=cache_fits))]
 
         # Update the params
         self._update_model_ensemble_params(ensemble_name)
@@ -389,7 +833,8 @@ class Ensemble_Wrapper():
 
     def _wrap_multiple(self, models, ensemble_info,
                        final_estimator, final_estimator_params,
-                       n_jobs_type, cv_splits):
+                       n_jobs_type, cv_splits, cross_fit=False,
+                       cache_fits=False):
         '''In case of no split/DES ensemble, and not single estimator based.'''
 
         # Unpack ensemble info
@@ -444,6 +889,15 @@ class Ensemble_Wrapper():
         else:
             final_estimator_obj = None
 
+        # Only pass cross_fit and cache_fits to ensembles which support them
+        possible_params = get_possible_init_params(ensemble_obj)
+        if 'cross_fit' in possible_params:
+            ensemble_extra_params = {**ensemble_extra_params,
+                                     'cross_fit': cross_fit}
+        if 'cache_fits' in possible_params:
+            ensemble_extra_params = {**ensemble_extra_params,
+                                     'cache_fits': cache_fits}
+
         # Init the ensemble object
         ensemble = ensemble_obj(estimators=models,
                                 final_estimator=final_estimator_obj,
@@ -5,10 +5,92 @@ import time
 
 from ..helpers.ML_Helpers import conv_to_list
 from .Feat_Importances import get_feat_importances_and_params
-from .Scorers import process_scorers
-from copy import deepcopy
+from .Scorers import process_scorers, Cached_Predictor
+from copy import deepcopy, copy
 from os.path import dirname, abspath, exists
 from sklearn.base import clone
+from joblib import Parallel, delayed, effective_n_jobs
+from .Loaders import Loader_Wrapper
+from ..helpers.Resources import call_with_threads
+from ..helpers.Shared_Data import Shared_Data, load_shared
+
+
+class _Print_Record():
+    '''Picklable stand-in for _print, which records
+    calls s.t. they can be replayed later.'''
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+
+
+class _Raw_Preds_Store():
+    '''Column store for the raw predictions, where each column
+    is allocated once, for all subjects, then filled in place by
+    row position, and only turned into a DataFrame at the end.'''
+
+    def __init__(self, subjects):
+
+        self.index = pd.Index(pd.unique(np.asarray(subjects)))
+        self.columns = {}
+
+    def set(self, subjects, col, vals):
+
+        rows = self.index.get_indexer(subjects)
+        if (rows == -1).any():
+            raise RuntimeError('Raw predictions passed for subjects '
+                               'not in the raw predictions store.')
+
+        vals = np.asarray(vals)
+
+        if col not in self.columns:
+
+            # Numeric columns as float w/ NaN, anything else,
+            # e.g., bool, as object, s.t., not cast to float
+            if vals.dtype.kind in 'iuf':
+                self.columns[col] = np.full(len(self.index), np.nan)
+            else:
+                self.columns[col] = np.full(len(self.index), np.nan,
+                                            dtype='object')
+
+        self.columns[col][rows] = vals
+
+    def to_df(self):
+        return pd.DataFrame(self.columns, index=self.index)
+
+
+def _run_fold(evaluator, data, train_subjects, test_subjects, fold_ind):
+    '''Run a single evaluation fold on a copy of an Evaluator,
+    recording any side effects, s.t. they can be applied back
+    to the original Evaluator in fold order.'''
+
+    start_time = time.time()
+
+    evaluator._print = _Print_Record()
+    evaluator._fold_record = {'raw_preds': [], 'feat_importances': None}
+
+    # Attach to the shared design X and y, if shared
+    evaluator._design = dict(evaluator._design,
+                             X=load_shared(evaluator._design['X']),
+                             y=load_shared(evaluator._design['y']))
+
+    train_scores, scores = evaluator.Test(data, train_subjects,
+                                          test_subjects, fold_ind)
+
+    record = evaluator._fold_record
+    record['train_scores'] = train_scores
+    record['scores'] = scores
+    record['classes'] = evaluator.classes
+
+    # Only send back the fitted model if it will be kept
+    if evaluator.return_models:
+        record['model'] = evaluator.model_
+    record['prints'] = evaluator._print.calls
+    record['time'] = time.time() - start_time
+
+    return record
 
 
 class Evaluator():
@@ -51,6 +133,12 @@ class Evaluator():
         self.flags = {'linear': False,
                       'tree': False}
 
+        # Only set when running a fold as a copy, see _run_fold
+        self._fold_record = None
+
+        # Set w/ _set_design, for the duration of Evaluate or Test
+        self._design = None
+
     def _process_feat_importances(self, feat_importances):
 
         # Grab feat_importance from spec as a list
@@ -85,7 +173,10 @@ class Evaluator():
         results = {}
 
         # If raw_preds off, will just return None
-        results['raw_preds'] = self.raw_preds_df
+        if self.raw_preds_store is None:
+            results['raw_preds'] = None
+        else:
+            results['raw_preds'] = self.raw_preds_store.to_df()
 
         # If no feature importances will just be empty list
         results['FIs'] = self.feat_importances
@@ -123,8 +214,8 @@ class Evaluator():
         # Set train_subjects according to self.ps._final_subjects
         train_subjects = self._get_subjects_overlap(train_subjects)
 
-        # Init raw_preds_df
-        self._init_raw_preds_df(train_subjects)
+        # Init raw preds store
+        self._init_raw_preds(train_subjects)
 
         # Setup the desired eval splits
         subject_splits =\
@@ -150,6 +241,25 @@ class Evaluator():
 
         self.n_test_per_fold = []
 
+        # Build X and y just once, for all of the folds
+        self._set_design(data, train_subjects)
+
+        # If requested, run all of the folds in parallel first,
+        # then apply the outputs below in order
+        parallel_folds = self.ps.fold_n_jobs > 1 and len(subject_splits) > 1
+
+        # Load + transform the data files of any stateless loaders
+        # just once, for all subjects, before the folds. Parallel folds
+        # read these through shared memory, but the workers of a search
+        # run within serial folds couldn't, so skip it then
+        if parallel_folds or not self._search_in_workers():
+            self._materialize_loaders()
+
+        if parallel_folds:
+            fold_outputs = self._run_parallel_folds(data, subject_splits)
+        else:
+            fold_outputs = None
+
         # For each split with the repeated K-fold
         for train_subjects, test_subjects in subject_splits:
 
@@ -170,12 +280,18 @@ class Evaluator():
                 folds_bar.refresh()
 
             # Run actual code for this evaluate fold
-            start_time = time.time()
-            train_scores, scores = self.Test(data, train_subjects,
-                                             test_subjects, fold_ind)
+            if fold_outputs is None:
+                start_time = time.time()
+                train_scores, scores = self.Test(data, train_subjects,
+                                                 test_subjects, fold_ind)
+                elapsed_time = time.time() - start_time
+
+            # Or apply the already computed fold
+            else:
+                train_scores, scores, elapsed_time =\
+                    self._apply_fold_output(fold_outputs[fold_ind], fold_ind)
 
             # Time by fold verbosity
-            elapsed_time = time.time() - start_time
             time_str = time.strftime("%H:%M:%S", time.gmtime(elapsed_time))
             self._print('Time Elapsed:', time_str, level='time')
 
@@ -218,9 +334,84 @@ class Evaluator():
 
         # self.micro_scores = self._compute_micro_scores()
 
+        self._design = None
+        self._clear_loaders()
+
         results = self._get_results()
         return (np.array(all_train_scores), np.array(all_scores), results)
 
+    def _run_parallel_folds(self, data, subject_splits):
+        '''Run each evaluation fold within a seperate process,
+        returning the recorded output from each fold, in fold order.'''
+
+        # Only pass along the needed columns
+        data = data[self.all_keys]
+
+        # Make a copy to send to each fold, w/o any references
+        # to the calling BPt_ML object or previous results
+        worker = copy(self)
+        worker._print = _Print_Record()
+        worker.progress_bar = None
+        worker.models = []
+        worker.raw_preds_store = None
+
+        n_jobs = min(self.ps.fold_n_jobs, len(subject_splits))
+        self._print('Running', len(subject_splits), 'folds w/ fold_n_jobs =',
+                    n_jobs, level='name')
+
+        # Each fold's BLAS threads share the per fold n_jobs,
+        # unless a search, which runs in its own workers
+        if hasattr(self.model, 'param_search'):
+            n_threads = 1
+        else:
+            n_threads = self.ps.n_jobs
+
+        # Publish X and y, and the outputs of any materialized loaders,
+        # s.t., each fold doesn't need its own copy or to re-load files
+        with Shared_Data() as shared:
+            worker._design = dict(self._design,
+                                  X=shared.share(self._design['X']),
+                                  y=shared.share(self._design['y']))
+
+            for loader in self._get_loaders():
+                if loader.trans_store is not None:
+                    loader.trans_store.share(shared)
+
+            try:
+                return Parallel(n_jobs=n_jobs, backend='loky')(
+                    delayed(call_with_threads)(n_threads, _run_fold, worker,
+                                               data, train_subjects,
+                                               test_subjects, fold_ind)
+                    for fold_ind, (train_subjects, test_subjects) in
+                    enumerate(subject_splits))
+
+            finally:
+                for loader in self._get_loaders():
+                    if loader.trans_store is not None:
+                        loader.trans_store.unshare()
+
+    def _apply_fold_output(self, output, fold_ind):
+        '''Apply the recorded output from a fold run with _run_fold,
+        as if the fold had been run directly.'''
+
+        # Replay any verbosity from the fold
+        for args, kwargs in output['prints']:
+            self._print(*args, **kwargs)
+
+        self.classes = output['classes']
+
+        if self.return_models:
+            self.model_ = output['model']
+            self.models.append(self.model_)
+
+        for subjects, col, vals in output['raw_preds']:
+            self._set_raw_preds(subjects, col, vals)
+
+        if output['feat_importances'] is not None:
+            self._add_feat_importances(output['feat_importances'], fold_ind)
+
+        return output['train_scores'], output['scores'], output['time']
+
     def _get_eval_splits(self, train_subjects, splits, n_repeats, splits_vals):
 
         subject_splits = self.cv.get_cv(train_subjects, splits, n_repeats,
@@ -292,24 +483,27 @@ class Evaluator():
         else:
             test_subjects = all_test_subjects
 
-        # Ensure data being used is just the selected col / feats
-        data = data[self.all_keys]
-
-        # Init raw_preds_df
+        # Init raw preds store
         if fold_ind == 'test':
 
-            # For raw preds df, keep NaNs, so use all_test_subjects
+            # For raw preds, keep NaNs, so use all_test_subjects
             if self.compute_train_score:
-                self._init_raw_preds_df(np.concatenate([train_subjects,
-                                                        all_test_subjects]))
+                self._init_raw_preds(np.concatenate([train_subjects,
+                                                     all_test_subjects]))
             else:
-                self._init_raw_preds_df(all_test_subjects)
+                self._init_raw_preds(all_test_subjects)
+
+            # If called directly, build X and y for just this split
+            self._set_design(data, pd.unique(
+                np.concatenate([train_subjects, all_test_subjects])))
 
         # Assume the train_subjects here are final
-        train_data = data.loc[train_subjects]
+        train = self._get_design_rows(train_subjects)
 
-        self._print('Train shape:', train_data.shape, level='size')
-        self._print('Val/Test shape:', data.loc[test_subjects].shape,
+        n_cols = len(self.all_keys)
+        self._print('Train shape:', (len(train_subjects), n_cols),
+                    level='size')
+        self._print('Val/Test shape:', (len(test_subjects), n_cols),
                     level='size')
         if len(test_subjects) != len(all_test_subjects):
             self._print('Making predictions for additional target NaN '
@@ -318,31 +512,92 @@ class Evaluator():
                         level='size')
 
         # Train the model(s)
-        self._train_model(train_data)
+        self._train_model(*train)
 
         # Proc the different feat importances,
         # Pass only test subjects w/o missing targets here
-        self._proc_feat_importance(train_data, data.loc[test_subjects],
-                                   fold_ind)
+        # DataFrames are only needed here, for the feature names
+        if len(self.feat_importances) > 0:
+            self._proc_feat_importance(
+                data.loc[train_subjects, self.all_keys],
+                data.loc[test_subjects, self.all_keys], fold_ind)
 
         # Get the scores
         if self.compute_train_score:
-            train_scores = self._get_scores(train_data, 'train_', fold_ind)
+            train_scores = self._get_scores(*train, 'train_', fold_ind)
         else:
             train_scores = 0
 
         # Pass test_data w/ Nans to get_scores, in order to
         # still record predictions for targets w/ a missing
         # ground truth.
-        scores = self._get_scores(data.loc[all_test_subjects], '', fold_ind)
+        scores = self._get_scores(*self._get_design_rows(all_test_subjects),
+                                  '', fold_ind)
 
         # Return differently based on if test
         if fold_ind == 'test':
+            self._design = None
             results = self._get_results()
             return (train_scores, scores, results)
 
         return train_scores, scores
 
+    def _set_design(self, data, subjects):
+        '''Build X and y as contiguous float arrays once, for all of the
+        passed subjects, s.t., each fold can just take rows by position,
+        rather than re-indexing, dropping and casting a DataFrame.'''
+
+        design_data = data.loc[subjects, self.all_keys]
+        X, y = self._get_X_y(design_data)
+
+        self._design = {'X': np.ascontiguousarray(X), 'y': y,
+                        'index': design_data.index}
+
+    def _get_design_rows(self, subjects):
+        '''Returns X, y and the index for the passed subjects,
+        as positional slices of the design set by _set_design.'''
+
+        inds = self._design['index'].get_indexer(subjects)
+        if (inds == -1).any():
+            raise RuntimeError('Rows requested for subjects '
+                               'not in the design set.')
+
+        return (self._design['X'][inds], self._design['y'][inds],
+                self._design['index'][inds])
+
+    def _get_loaders(self):
+
+        # Grab the base pipeline, if within a search
+        pipeline = getattr(self.model, 'estimator', self.model)
+
+        try:
+            steps = [step for _, step in pipeline.steps]
+        except AttributeError:
+            return []
+
+        return [step for step in steps if isinstance(step, Loader_Wrapper)]
+
+    def _search_in_workers(self):
+        '''If the model is a search, which runs in other processes.'''
+
+        if not hasattr(self.model, 'param_search'):
+            return False
+
+        return effective_n_jobs(self.model.n_jobs) != 1
+
+    def _materialize_loaders(self):
+
+        for loader in self._get_loaders():
+            loader.materialize(self._design['X'])
+
+    def _clear_loaders(self):
+        '''Empty the store of transformed data files shared by
+        each loader, and any fitted copies of it, once done.'''
+
+        for loader in self._get_loaders():
+            if loader.trans_store is not None:
+                loader.trans_store.clear()
+
     def _get_base_fitted_pipeline(self):
 
         if hasattr(self.model_, 'name') and self.model_.name == 'nevergrad':
@@ -382,88 +637,141 @@ class Evaluator():
         else:
             return
 
-        # Process each feat importance
-        for feat_imp in self.feat_importances:
+        # Compute each feat importance, where any shap explainers
+        # are shared between feat importances of this fold
+        explainers = {}
+        fi_records = [self._compute_feat_importance(feat_imp, train_data,
+                                                    test_data, fold_ind,
+                                                    explainers)
+                      for feat_imp in self.feat_importances]
+
+        # If running as a copy, just record
+        if self._fold_record is not None:
+            self._fold_record['feat_importances'] = fi_records
+            return
+
+        self._add_feat_importances(fi_records, fold_ind)
 
-            split = feat_imp.split
+    def _compute_feat_importance(self, feat_imp, train_data,
+                                 test_data, fold_ind, explainers=None):
+        '''Compute a feat importance, along with the data needed to
+        init it, w/o changing any stored feat importance values.'''
 
-            # Init global feature df
-            if fold_ind == 0 or fold_ind == 'test':
+        split = feat_imp.split
+        record = {'global_init': None, 'local_init': None}
 
+        # Init global feature df
+        if fold_ind == 0 or fold_ind == 'test':
+            record['global_init'] = self._proc_X_test(train_data, fs=False)
+
+        # Local init - Test
+        if fold_ind == 'test':
+
+            if split == 'test':
+                X, y = self._proc_X_test(test_data, fs=False)
+
+            elif split == 'train':
                 X, y = self._proc_X_test(train_data, fs=False)
-                feat_imp.init_global(X, y)
 
-            # Local init - Test
-            if fold_ind == 'test':
+            elif split == 'all':
+                X, y =\
+                    self._proc_X_test(pd.concat([train_data, test_data]),
+                                      fs=False)
+
+            # Error if here
+            else:
+                X, y = None, None
+
+            record['local_init'] = (X, y)
 
-                if split == 'test':
-                    X, y = self._proc_X_test(test_data, fs=False)
+        # Local init - Evaluate
+        elif fold_ind % self.n_splits_ == 0:
 
-                elif split == 'train':
-                    X, y = self._proc_X_test(train_data, fs=False)
+            record['local_init'] =\
+                self._proc_X_test(pd.concat([train_data, test_data]),
+                                  fs=False)
 
-                elif split == 'all':
-                    X, y =\
-                        self._proc_X_test(pd.concat([train_data, test_data]),
-                                          fs=False)
+        self._print('Calculate', feat_imp.name, 'feat importances',
+                    level='name')
 
-                # Error if here
-                else:
-                    X, y = None, None
+        # Get base fitted model
+        base_model = self._get_base_fitted_model()
 
-                feat_imp.init_local(X, y, test=True, n_splits=None)
+        # Optionally proc train, though train is always train
+        record['flags'] = self.flags.copy()
+        if feat_imp.get_data_needed_flags(record['flags']):
+            X_train = self._proc_X_train(train_data)
+        else:
+            X_train = None
 
-            # Local init - Evaluate
-            elif fold_ind % self.n_splits_ == 0:
+        # Test depends on scope
+        if split == 'test':
+            test = test_data
+        elif split == 'train':
+            test = train_data
+        elif split == 'all':
+            test = pd.concat([train_data, test_data])
 
-                X, y = self._proc_X_test(pd.concat([train_data, test_data]),
-                                         fs=False)
-                feat_imp.init_local(X, y, n_splits=self.n_splits_)
+        # Always proc test.
+        X_test, y_test = self._proc_X_test(test)
 
-            # Error if reaches here
-            else:
-                X, y = None, None
+        try:
+            fold = fold_ind % self.n_splits_
+        except TypeError:
+            fold = 'test'
 
-            self._print('Calculate', feat_imp.name, 'feat importances',
-                        level='name')
+        # Compute the feature importance, provide all needed
+        mapping = getattr(self._get_base_fitted_pipeline(), '_mapping', None)
+        fis =\
+            feat_imp.compute_importances(base_model, X_test, y_test=y_test,
+                                         X_train=X_train,
+                                         random_state=self.ps.random_state,
+                                         mapping=mapping,
+                                         explainers=explainers)
+
+        # Grab the names of all input features
+        feat_names = list(train_data)
+        feat_names.remove(self.ps.target)
+
+        # Inverse transform FIs back to original feat_space is requested
+        record['inverse'] =\
+            self._inverse_transform_FIs(feat_imp, fis, feat_names)
 
-            # Get base fitted model
-            base_model = self._get_base_fitted_model()
+        record['X_test'] = X_test
+        record['fis'] = fis
+        record['fold'] = fold
 
-            # Optionally proc train, though train is always train
-            if feat_imp.get_data_needed_flags(self.flags):
-                X_train = self._proc_X_train(train_data)
-            else:
-                X_train = None
+        return record
 
-            # Test depends on scope
-            if split == 'test':
-                test = test_data
-            elif split == 'train':
-                test = train_data
-            elif split == 'all':
-                test = pd.concat([train_data, test_data])
+    def _add_feat_importances(self, fi_records, fold_ind):
+        '''Store the computed feat importances from
+        _compute_feat_importance, in fold order.'''
 
-            # Always proc test.
-            X_test, y_test = self._proc_X_test(test)
+        for feat_imp, record in zip(self.feat_importances, fi_records):
 
-            try:
-                fold = fold_ind % self.n_splits_
-            except TypeError:
-                fold = 'test'
+            if record['global_init'] is not None:
+                feat_imp.init_global(*record['global_init'])
 
-            # Process the feature importance, provide all needed
-            fis =\
-                feat_imp.proc_importances(base_model, X_test, y_test=y_test,
-                                          X_train=X_train, fold=fold,
-                                          random_state=self.ps.random_state)
+            if record['local_init'] is not None:
+                if fold_ind == 'test':
+                    feat_imp.init_local(*record['local_init'], test=True,
+                                        n_splits=None)
+                else:
+                    feat_imp.init_local(*record['local_init'],
+                                        n_splits=self.n_splits_)
 
-            # Grab the names of all input features
-            feat_names = list(train_data)
-            feat_names.remove(self.ps.target)
+            # Make sure flags are set, e.g., if computed in a copy
+            feat_imp.get_data_needed_flags(record['flags'])
 
-            # Inverse transform FIs back to original feat_space is requested
-            self._inverse_transform_FIs(feat_imp, fis, feat_names)
+            feat_imp.add_importances(record['X_test'], record['fis'],
+                                     record['fold'])
+
+            inverse_global, inverse_local, warning = record['inverse']
+            if inverse_global is not None:
+                feat_imp.inverse_global_fis.append(inverse_global)
+            if inverse_local is not None:
+                feat_imp.inverse_local_fis.append(inverse_local)
+            feat_imp.warning = warning
 
             # For local, need an intermediate average, move df to dfs
             if isinstance(fold_ind, int):
@@ -473,24 +781,23 @@ class Evaluator():
     def _inverse_transform_FIs(self, feat_imp, fis, feat_names):
 
         global_fi, local_fi = fis
+        inverse_global, inverse_local = None, None
         pipeline = self._get_base_fitted_pipeline()
 
         # Only compute the inverse transform FI's if there
         # are either transformers or loaders in the base pipeline
         if not pipeline.has_transforms():
-            feat_imp.warning = False
-            return
+            return inverse_global, inverse_local, False
 
         if feat_imp.inverse_global and global_fi is not None:
-            feat_imp.inverse_global_fis.append(
-                pipeline.inverse_transform_FIs(global_fi, feat_names))
+            inverse_global =\
+                pipeline.inverse_transform_FIs(global_fi, feat_names)
 
         if feat_imp.inverse_local and local_fi is not None:
-            feat_imp.inverse_local_fis.append(
-                pipeline.inverse_transform_FIs(local_fi, feat_names))
+            inverse_local =\
+                pipeline.inverse_transform_FIs(local_fi, feat_names)
 
-        feat_imp.warning = True
-        return
+        return inverse_global, inverse_local, True
 
     def _get_X_y(self, data, X_as_df=False, copy=False):
         '''Helper method to get X,y data from BPt formatted df.
@@ -533,14 +840,20 @@ class Evaluator():
 
         return X, y
 
-    def _train_model(self, train_data):
+    def _train_model(self, X, y, train_index):
         '''Helper method to train a models given
         a str indicator and training data.
 
         Parameters
         ----------
-        train_data : pandas DataFrame
-            BPt formatted, training data.
+        X : numpy array
+            The training data.
+
+        y : numpy array
+            The training target.
+
+        train_index : pandas Index
+            The subjects of each row in X.
 
         Returns
         ----------
@@ -548,12 +861,9 @@ class Evaluator():
             The trained model.
         '''
 
-        # Data, score split
-        X, y = self._get_X_y(train_data)
-
         # Fit the model
         self.model_ = clone(self.model)
-        self.model_.fit(X, y, train_data_index=train_data.index)
+        self.model_.fit(X, y, train_data_index=train_index)
 
         # If return models, save model
         if self.return_models:
@@ -624,15 +934,21 @@ class Evaluator():
 
         return params, to_show
 
-    def _get_scores(self, test_data, eval_type, fold_ind):
+    def _get_scores(self, X_test, y_test, subjects, eval_type, fold_ind):
         '''Helper method to get the scores of
         the trained model saved in the class on input test data.
         For all metrics/scorers.
 
         Parameters
         ----------
-        test_data : pandas DataFrame
-            BPt formatted test data.
+        X_test : numpy array
+            The test data.
+
+        y_test : numpy array
+            The test target.
+
+        subjects : pandas Index
+            The subjects of each row in X_test.
 
         eval_type : {'train_', ''}
 
@@ -644,24 +960,25 @@ class Evaluator():
             The score of the trained model on the given test data.
         '''
 
-        # Data, score split
-        X_test, y_test = self._get_X_y(test_data)
-
         # For book-keeping set num y classes
         self._set_classes(y_test)
 
-        # Add raw preds to raw_preds_df
-        self._add_raw_preds(X_test, y_test,
-                            test_data.index, eval_type,
+        # Each type of prediction is made just once, then shared
+        # by the raw preds and all of the scorers
+        predictor = Cached_Predictor(self.model_, X_test)
+
+        # Add raw preds to the raw preds store
+        self._add_raw_preds(predictor, y_test, subjects, eval_type,
                             fold_ind)
 
         # Only compute scores on Non-Nan y
         non_nan_mask = ~np.isnan(y_test)
+        if not non_nan_mask.all():
+            predictor = predictor.masked(non_nan_mask)
+            X_test = X_test[non_nan_mask]
 
         # Get the scores
-        scores = [scorer(self.model_,
-                         X_test[non_nan_mask],
-                         y_test[non_nan_mask])
+        scores = [scorer(predictor, X_test, y_test[non_nan_mask])
                   for scorer in self.scorers]
 
         return np.array(scores)
@@ -676,7 +993,8 @@ class Evaluator():
         if len(self.classes) == 1:
             self.classes = np.array([0, 1])
 
-    def _add_raw_preds(self, X_test, y_test, subjects, eval_type, fold_ind):
+    def _add_raw_preds(self, predictor, y_test, subjects, eval_type,
+                       fold_ind):
 
         # If return_raw_preds set to false, skip
         if not self.return_raw_preds:
@@ -690,7 +1008,7 @@ class Evaluator():
             repeat = str((fold_ind // self.n_splits_) + 1)
 
         try:
-            raw_prob_preds = self.model_.predict_proba(X_test)
+            raw_prob_preds = predictor.predict_proba()
             pred_col = eval_type + repeat + '_prob'
 
             if len(np.shape(raw_prob_preds)) == 3:
@@ -698,55 +1016,64 @@ class Evaluator():
                 for i in range(len(raw_prob_preds)):
                     p_col = pred_col + '_class_' + str(self.classes[i])
                     class_preds = [val[1] for val in raw_prob_preds[i]]
-                    self.raw_preds_df.loc[subjects, p_col] = class_preds
+                    self._set_raw_preds(subjects, p_col, class_preds)
 
             elif len(np.shape(raw_prob_preds)) == 2:
 
                 for i in range(np.shape(raw_prob_preds)[1]):
                     p_col = pred_col + '_class_' + str(self.classes[i])
                     class_preds = raw_prob_preds[:, i]
-                    self.raw_preds_df.loc[subjects, p_col] = class_preds
+                    self._set_raw_preds(subjects, p_col, class_preds)
 
             else:
-                self.raw_preds_df.loc[subjects, pred_col] = raw_prob_preds
+                self._set_raw_preds(subjects, pred_col, raw_prob_preds)
 
         except AttributeError:
             pass
 
-        raw_preds = self.model_.predict(X_test)
+        raw_preds = predictor.predict()
         pred_col = eval_type + repeat
 
         if len(np.shape(raw_preds)) == 2:
             for i in range(np.shape(raw_preds)[1]):
                 p_col = pred_col + '_class_' + str(self.classes[i])
                 class_preds = raw_preds[:, i]
-                self.raw_preds_df.loc[subjects, p_col] = class_preds
+                self._set_raw_preds(subjects, p_col, class_preds)
 
         else:
-            self.raw_preds_df.loc[subjects, pred_col] = raw_preds
+            self._set_raw_preds(subjects, pred_col, raw_preds)
 
-        self.raw_preds_df.loc[subjects, pred_col + '_fold'] = fold
+        self._set_raw_preds(subjects, pred_col + '_fold', fold)
 
         # Make copy of true values
         if len(np.shape(y_test)) > 1:
             for i in range(len(self.ps.target)):
-                self.raw_preds_df.loc[subjects, self.ps.target[i]] =\
-                    y_test[:, i]
+                self._set_raw_preds(subjects, self.ps.target[i],
+                                    y_test[:, i])
 
         elif isinstance(self.ps.target, list):
             t_base_key = '_'.join(self.ps.target[0].split('_')[:-1])
-            self.raw_preds_df.loc[subjects, 'multiclass_' + t_base_key] =\
-                y_test
+            self._set_raw_preds(subjects, 'multiclass_' + t_base_key,
+                                y_test)
 
         else:
-            self.raw_preds_df.loc[subjects, self.ps.target] = y_test
+            self._set_raw_preds(subjects, self.ps.target, y_test)
+
+    def _set_raw_preds(self, subjects, col, vals):
+
+        # If running as a copy, just record
+        if self._fold_record is not None:
+            self._fold_record['raw_preds'].append((subjects, col, vals))
+            return
+
+        self.raw_preds_store.set(subjects, col, vals)
 
-    def _init_raw_preds_df(self, subjects):
+    def _init_raw_preds(self, subjects):
 
         if self.return_raw_preds:
-            self.raw_preds_df = pd.DataFrame(index=subjects)
+            self.raw_preds_store = _Raw_Preds_Store(subjects)
         else:
-            self.raw_preds_df = None
+            self.raw_preds_store = None
 
     def _proc_X_test(self, test_data, fs=True):
 
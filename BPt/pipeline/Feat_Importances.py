@@ -1,9 +1,177 @@
+import os
+import tempfile
+import weakref
 import pandas as pd
 import numpy as np
+from collections import OrderedDict
+from joblib import hash as joblib_hash
+from joblib import effective_n_jobs
 
-from .Perm_Feat_Importance import Perm_Feat_Importance
+from .Perm_Feat_Importance import Batched_Perm_Feat_Importance
 from sklearn.inspection import permutation_importance
 from ..helpers.ML_Helpers import get_obj_and_params
+from ..helpers.Worker_Pool import get_executor
+from ..helpers.Resources import call_with_threads
+
+# Cached k-means background summaries for kernel shap,
+# keyed on the training data of each fold and nkmean.
+BACKGROUND_CACHE_SIZE = 32
+_background_cache = OrderedDict()
+
+
+def clear_background_cache():
+    _background_cache.clear()
+
+
+def get_background_summary(X_train, nkmean):
+    '''Returns the shap k-means summary of X_train, only computing
+    it if not already cached for this training data.'''
+
+    import shap
+
+    key = joblib_hash((np.asarray(X_train), nkmean))
+    if key in _background_cache:
+        _background_cache.move_to_end(key)
+        return _background_cache[key]
+
+    summary = shap.kmeans(X_train, nkmean)
+
+    _background_cache[key] = summary
+    while len(_background_cache) > BACKGROUND_CACHE_SIZE:
+        _background_cache.popitem(last=False)
+
+    return summary
+
+
+def _shap_values(explainer, X, **kwargs):
+    return explainer.shap_values(X, **kwargs)
+
+
+def _concat_shap_values(chunks):
+    '''Join the shap values of each chunk of subjects, where
+    each chunk is either an array or a list of arrays, one per class.'''
+
+    if isinstance(chunks[0], list):
+        return [np.concatenate([chunk[i] for chunk in chunks])
+                for i in range(len(chunks[0]))]
+
+    return np.concatenate(chunks)
+
+
+def _remove_files(locs):
+
+    for loc in locs:
+        try:
+            os.remove(loc)
+        except OSError:
+            pass
+
+
+class Local_Stats():
+    '''Streaming per subject and feature mean and variance of local
+    feature importances. Values within a repeat are accumulated as a
+    running sum and count, and at the end of each repeat, that repeat's
+    average is added to a running (Welford) mean and variance across
+    repeats. All values are kept in preallocated float32 arrays,
+    optionally memory mapped to files within spill_dir.'''
+
+    def __init__(self, index, columns, spill_dir=None):
+
+        self.index = index
+        self.columns = list(columns)
+        self.spill_dir = spill_dir
+
+        self._locs = []
+        weakref.finalize(self, _remove_files, self._locs)
+
+        shape = (len(self.index), len(self.columns))
+        self.repeat_sum = self._alloc(shape)
+        self.repeat_count = np.zeros(len(self.index), dtype='int32')
+
+        self.mean = self._alloc(shape)
+        self.m2 = self._alloc(shape)
+        self.count = np.zeros(len(self.index), dtype='int32')
+
+    def _alloc(self, shape):
+
+        if self.spill_dir is None:
+            return np.zeros(shape, dtype='float32')
+
+        os.makedirs(self.spill_dir, exist_ok=True)
+        fd, loc = tempfile.mkstemp(suffix='.npy', dir=self.spill_dir)
+        os.close(fd)
+        self._locs.append(loc)
+
+        return np.lib.format.open_memmap(loc, mode='w+', dtype='float32',
+                                         shape=shape)
+
+    def add(self, index, vals):
+        '''Add the values for the subjects in index
+        to the current repeat.'''
+
+        rows = self.index.get_indexer(index)
+        if (rows == -1).any():
+            raise RuntimeError('Local feature importances passed for '
+                               'subjects not in the local stats.')
+
+        self.repeat_sum[rows] += np.asarray(vals, dtype='float32')
+        self.repeat_count[rows] += 1
+
+    def _add_repeat(self, mean, m2, count):
+        '''Add the average of the current repeat, for any subjects
+        with values, to the passed running stats, in place.'''
+
+        rows = np.flatnonzero(self.repeat_count)
+        if len(rows) == 0:
+            return rows
+
+        vals = self.repeat_sum[rows] / self.repeat_count[rows, None]
+
+        count[rows] += 1
+        delta = vals - mean[rows]
+        mean[rows] += delta / count[rows, None]
+        m2[rows] += delta * (vals - mean[rows])
+
+        return rows
+
+    def end_repeat(self):
+        '''Add the average of the current repeat,
+        for any subjects with values, to the running stats.'''
+
+        rows = self._add_repeat(self.mean, self.m2, self.count)
+
+        self.repeat_sum[rows] = 0
+        self.repeat_count[rows] = 0
+
+    def _get_stats(self):
+        '''Returns copies of the running stats, including any
+        values from the current repeat, w/o ending the repeat.'''
+
+        mean, m2, count = np.array(self.mean), np.array(self.m2),\
+            self.count.copy()
+        self._add_repeat(mean, m2, count)
+
+        return mean, m2, count
+
+    def _to_df(self, vals, count, min_count):
+
+        vals[count < min_count] = np.nan
+        return pd.DataFrame(vals, index=self.index, columns=self.columns)
+
+    def get_mean(self):
+        '''Returns the mean across repeats as a DataFrame,
+        with NaN for subjects w/o any values.'''
+
+        mean, _, count = self._get_stats()
+        return self._to_df(mean, count, 1)
+
+    def get_var(self):
+        '''Returns the sample variance across repeats as a DataFrame,
+        with NaN for subjects w/ less than two values.'''
+
+        _, m2, count = self._get_stats()
+        counts = np.maximum(count - 1, 1)[:, None]
+        return self._to_df(m2 / counts, count, 2)
 
 
 class Feat_Importances():
@@ -17,9 +185,11 @@ class Feat_Importances():
         # Unpack params
         self.shap_params = params.shap_params
         self.n_perm = params.n_perm
+        self.perm_groups = params.perm_groups
 
         self.inverse_global = params.inverse_global
         self.inverse_local = params.inverse_local
+        self.spill_dir = getattr(params, 'spill_dir', None)
 
         self.valid = True
         self.test = False
@@ -28,8 +198,7 @@ class Feat_Importances():
         self.scorer = scorer
 
         self.global_df = None
-        self.local_df = None
-        self.local_dfs = []
+        self.local_stats = None
 
         self.inverse_global_fis = []
         self.inverse_local_fis = []
@@ -81,42 +250,43 @@ class Feat_Importances():
         if test:
             self.test = True
 
+        # Init once, as each repeat is over the same subjects
         if 'local' in self.scopes:
+            if self.local_stats is None or test:
+                self.local_stats = [Local_Stats(X.index, list(X),
+                                                spill_dir=self.spill_dir)
+                                    for _ in range(self._get_n_local(y))]
 
-            # If test or, split as test,
-            if self.split == 'test' or self.test:
-
-                self.local_df = X.copy()
-                for col in self.local_df.columns:
-                    self.local_df[col].values[:] = 0
-
-            # Train or both
-            else:
-
-                self.local_df = []
-                for i in range(n_splits):
+    def _get_n_local(self, y):
+        return 1
 
-                    df = X.copy()
-                    for col in df.columns:
-                        df[col].values[:] = 0
+    def _from_local(self, vals):
+        '''Returns one value per class from a per class list.'''
+        return vals[0]
 
-                    self.local_df.append(df)
+    def _to_local(self, vals):
+        return [vals]
 
-    def get_avg(self, dfs):
+    @property
+    def local_df(self):
+        '''The local feature importances averaged over
+        repeats, made as a DataFrame only when requested.'''
 
-        if isinstance(dfs, list):
+        if self.local_stats is None:
+            return None
 
-            df = dfs[0].copy()
+        return self._from_local([stats.get_mean()
+                                 for stats in self.local_stats])
 
-            df_arrays = [np.array(df) for df in dfs]
-            mean_array = np.nanmean(df_arrays, axis=0)
+    def get_local_var(self):
+        '''Returns the variance of the local feature
+        importances across repeats.'''
 
-            # Set to average
-            df[list(df)] = mean_array
-            return df
+        if self.local_stats is None:
+            return None
 
-        else:
-            return dfs
+        return self._from_local([stats.get_var()
+                                 for stats in self.local_stats])
 
     def add_to_global(self, feat_names, feat_imps):
 
@@ -126,59 +296,58 @@ class Feat_Importances():
                                                ignore_index=True)
         self.global_df = self.global_df.fillna(0)
 
-    def _add_to_local(self, X_test, vals, fold, class_df):
-
-        val_df = X_test.copy()
-        val_df[list(X_test)] = vals
-
-        if self.split == 'test':
-            class_df.update(val_df)
-
-        elif self.split == 'train':
-            class_df[fold].update(val_df)
-
-            # Replace any rows with all zeros as NaN instead of 0
-            ind_df = self.local_df[fold]
-            to_nan = ind_df[ind_df.sum(axis=1) == 0].index
-            class_df[fold].loc[to_nan] = np.nan
-
-        elif self.split == 'all':
-            class_df[fold].update(val_df)
-
     def add_to_local(self, X_test, vals, fold):
-        self._add_to_local(X_test, vals, fold, self.local_df)
+
+        for stats, class_vals in zip(self.local_stats, self._to_local(vals)):
+            stats.add(X_test.index, class_vals)
 
     def proc_local(self):
 
         if not self.valid:
             return
 
+        # End of a repeat, add its average to the running stats
         if 'local' in self.scopes:
-
-            # Get avg then save in self.local_dfs
-            df = self.get_avg(self.local_df)
-            self.local_dfs.append(df)
-
-            # Reset to None once added
-            self.local_df = None
+            for stats in self.local_stats:
+                stats.end_repeat()
 
     def proc_importances(self, base_model, X_test, y_test=None,
-                         X_train=None, fold=0, random_state=None):
+                         X_train=None, fold=0, random_state=None,
+                         mapping=None):
         '''X_test should be a df, and X_train either None or as np array.'''
 
+        fis = self.compute_importances(base_model, X_test, y_test=y_test,
+                                       X_train=X_train,
+                                       random_state=random_state,
+                                       mapping=mapping)
+        self.add_importances(X_test, fis, fold)
+
+        return fis
+
+    def compute_importances(self, base_model, X_test, y_test=None,
+                            X_train=None, random_state=None,
+                            mapping=None, explainers=None):
+        '''Compute, but don't store, the global and local feature
+        importances. X_test should be a df, and X_train either None
+        or as np array. mapping, if passed, is the fitted pipeline's
+        mapping from input features to the columns of X_test.
+        explainers, if passed, is a dict in which shap explainers
+        are kept, s.t., they can be re-used by other feat importances
+        for the same fitted model.'''
+
         if not self.valid:
             return None, None
 
         if self.name == 'base':
             feat_imps = self.get_base_feat_importances(base_model)
-            self.add_to_global(list(X_test), feat_imps)
             return feat_imps, None
 
         elif self.name == 'perm':
             feat_imps = self.get_perm_feat_importances(base_model,
                                                        np.array(X_test),
-                                                       y_test)
-            self.add_to_global(list(X_test), feat_imps)
+                                                       y_test,
+                                                       random_state,
+                                                       mapping)
             return feat_imps, None
 
         elif self.name == 'sklearn perm':
@@ -186,20 +355,31 @@ class Feat_Importances():
                                                         np.array(X_test),
                                                         y_test,
                                                         random_state)
-            self.add_to_global(list(X_test), feat_imps)
             return feat_imps, None
 
         elif self.name == 'shap':
             shap_vals = self.get_shap_feature_importance(base_model, X_test,
-                                                         X_train)
+                                                         X_train,
+                                                         explainers)
             global_shap_vals = self.global_from_local(shap_vals)
+            return global_shap_vals, shap_vals
 
-            # Add to local
-            self.add_to_local(X_test, shap_vals, fold)
+        return None, None
 
-            # Add to global
-            self.add_to_global(list(X_test), global_shap_vals)
-            return global_shap_vals, shap_vals
+    def add_importances(self, X_test, fis, fold):
+        '''Store already computed global and local feature importances,
+        as returned by compute_importances.'''
+
+        if not self.valid:
+            return
+
+        global_fis, local_fis = fis
+
+        if local_fis is not None:
+            self.add_to_local(X_test, local_fis, fold)
+
+        if global_fis is not None:
+            self.add_to_global(list(X_test), global_fis)
 
     def global_from_local(self, vals):
         return self.col_abs_mean(vals)
@@ -223,13 +403,33 @@ class Feat_Importances():
 
         return feat_imps
 
+    def get_perm_groups(self, mapping, n_features):
+        '''Get groups of columns derived from the same input feature,
+        or None if not grouping.'''
+
+        if self.perm_groups is None or mapping is None:
+            return None
+
+        groups = []
+        for val in mapping.values():
+            if isinstance(val, list):
+                group = [v for v in val if v is not None and v < n_features]
+                if len(group) > 1:
+                    groups.append(group)
+
+        return groups
+
     def get_perm_feat_importances(self, base_model, X_test,
-                                  y_test):
+                                  y_test, random_state=None, mapping=None):
 
-        perm_import = Perm_Feat_Importance(n_perm=self.n_perm,
-                                           n_jobs=self.n_jobs)
+        perm_import =\
+            Batched_Perm_Feat_Importance(n_perm=self.n_perm,
+                                         n_jobs=self.n_jobs,
+                                         random_state=random_state)
+
+        groups = self.get_perm_groups(mapping, X_test.shape[1])
         feat_imps = perm_import.compute(base_model, self.scorer,
-                                        X_test, y_test)
+                                        X_test, y_test, groups=groups)
         return feat_imps
 
     def get_perm_feat_importances2(self, base_model, X_test, y_test,
@@ -242,64 +442,100 @@ class Feat_Importances():
                                          random_state=random_state)
         return results.importances_mean
 
-    def get_shap_feature_importance(self, base_model, X_test, X_train):
+    def get_shap_feature_importance(self, base_model, X_test, X_train,
+                                    explainers=None):
 
         try:
             import shap
         except ImportError:
             raise ImportError('You must have shap installed to use shap')
 
+        if explainers is None:
+            explainers = {}
+
         if self.flags['tree'] or self.flags['linear']:
 
             if self.flags['linear']:
 
                 fp = self.shap_params.linear_feature_perturbation
                 n = self.shap_params.linear_nsamples
-                explainer = shap.LinearExplainer(base_model, X_train,
-                                                 nsamples=n,
-                                                 feature_perturbation=fp)
 
-                shap_values = explainer.shap_values(X_test)
+                key = ('linear', fp, n)
+                if key not in explainers:
+                    explainers[key] =\
+                        shap.LinearExplainer(base_model, X_train,
+                                             nsamples=n,
+                                             feature_perturbation=fp)
+
+                shap_values = explainers[key].shap_values(X_test)
 
             elif self.flags['tree']:
 
                 tmo = self.shap_params.tree_model_output
                 tfp = self.shap_params.tree_feature_perturbation
-                explainer =\
-                    shap.TreeExplainer(
-                        base_model, X_train,
-                        model_output=tmo,
-                        feature_perturbation=tfp)
+
+                key = ('tree', tmo, tfp)
+                if key not in explainers:
+                    explainers[key] =\
+                        shap.TreeExplainer(
+                            base_model, X_train,
+                            model_output=tmo,
+                            feature_perturbation=tfp)
 
                 ttl = self.shap_params.tree_tree_limit
                 shap_values =\
-                    explainer.shap_values(X_test,
-                                          tree_limit=ttl)
+                    explainers[key].shap_values(X_test,
+                                                tree_limit=ttl)
 
         # Kernel
         else:
 
             nkmean = self.shap_params.kernel_nkmean
+            link = self.shap_params.kernel_link
 
-            if nkmean is not None:
-                X_train_summary = shap.kmeans(X_train, nkmean)
-            else:
-                X_train_summary = X_train
+            # Re-use the explainer if already made for this model
+            key = ('kernel', nkmean, link)
+            explainer = explainers.get(key)
 
-            explainer =\
-                self.get_kernel_explainer(base_model, X_train_summary,
-                                          self.shap_params.kernel_link)
+            if explainer is None:
+
+                if nkmean is not None:
+                    X_train_summary = get_background_summary(X_train, nkmean)
+                else:
+                    X_train_summary = X_train
+
+                explainer =\
+                    self.get_kernel_explainer(base_model, X_train_summary,
+                                              link)
+                explainers[key] = explainer
 
             klr = self.shap_params.kernel_l1_reg
             kns = self.shap_params.kernel_nsamples
 
             shap_values =\
-                explainer.shap_values(np.array(X_test),
-                                      l1_reg=klr,
-                                      n_samples=kns)
+                self.get_kernel_shap_values(explainer, np.array(X_test),
+                                            l1_reg=klr,
+                                            n_samples=kns)
 
         return self.proc_shap_vals(shap_values)
 
+    def get_kernel_shap_values(self, explainer, X_test, **kwargs):
+        '''Compute kernel shap values in chunks of subjects
+        across the worker pool, as each subject is explained
+        independently.'''
+
+        n_jobs = min(effective_n_jobs(self.n_jobs), len(X_test))
+        if n_jobs <= 1:
+            return _shap_values(explainer, X_test, **kwargs)
+
+        # Each worker gets a chunk, and one BLAS thread
+        executor = get_executor(n_jobs)
+        jobs = [executor.submit(call_with_threads, 1, _shap_values,
+                                explainer, chunk, **kwargs)
+                for chunk in np.array_split(X_test, n_jobs)]
+
+        return _concat_shap_values([job.result() for job in jobs])
+
     def proc_shap_vals(self, shap_values):
         return shap_values
 
@@ -320,12 +556,14 @@ class Feat_Importances():
 
     def set_final_local(self):
 
-        if 'local' in self.scopes:
-
-            df = self.get_avg(self.local_dfs)
-            self.local_df = df
+        if not self.valid:
+            return
 
-        self.local_dfs = None  # Save memory
+        # Add any remaining values, the DataFrame is only made when
+        # local_df is accessed
+        if 'local' in self.scopes and self.local_stats is not None:
+            for stats in self.local_stats:
+                stats.end_repeat()
 
     def get_global_label(self):
 
@@ -432,46 +670,16 @@ class Cat_Feat_Importances(Feat_Importances):
             for j in range(self.n_classes):
                 self.global_df.append(pd.DataFrame(columns=feat_names))
 
-    def init_local(self, X, y=None, test=False, n_splits=None):
-
-        if not self.valid:
-            return
-
-        if test:
-            self.test = True
+    def _get_n_local(self, y):
 
-        if 'local' in self.scopes:
-
-            self.local_df = []
-            self.n_classes = len(np.unique(y))
+        self.n_classes = len(np.unique(y))
+        return self.n_classes
 
-            # If test or, split as test,
-            if self.split == 'test' or self.test:
+    def _from_local(self, vals):
+        return vals
 
-                for j in range(self.n_classes):
-
-                    df = X.copy()
-
-                    for col in df.columns:
-                        df[col].values[:] = 0
-
-                    self.local_df.append(df)
-
-            # Train or both
-            else:
-
-                for j in range(self.n_classes):
-                    dfs = []
-
-                    for i in range(n_splits):
-
-                        df = X.copy()
-                        for col in df.columns:
-                            df[col].values[:] = 0
-
-                        dfs.append(df)
-
-                    self.local_df.append(dfs)
+    def _to_local(self, vals):
+        return vals
 
     def add_to_global(self, feat_names, feat_imps):
 
@@ -489,58 +697,15 @@ class Cat_Feat_Importances(Feat_Importances):
                                                          ignore_index=True)
             self.global_df[j] = self.global_df[j].fillna(0)
 
-    def add_to_local(self, X_test, vals, fold):
-
-        for j in range(self.n_classes):
-            self._add_to_local(X_test, vals[j], fold, self.local_df[j])
-
     def global_from_local(self, vals):
 
         global_vals = []
 
-        for j in range(self.n_classes):
+        for j in range(len(vals)):
             global_vals.append(self.col_abs_mean(vals[j]))
 
         return global_vals
 
-    def proc_local(self):
-
-        if not self.valid:
-            return
-
-        if 'local' in self.scopes:
-
-            dfs = []
-            for j in range(self.n_classes):
-                dfs.append(self.get_avg(self.local_df[j]))
-
-            self.local_dfs.append(dfs)
-
-            # Reset to None once added
-            self.local_df = None
-
-    def set_final_local(self):
-
-        if not self.valid:
-            return
-
-        if 'local' in self.scopes:
-
-            if len(self.local_dfs) > 0:
-
-                dfs = []
-
-                for j in range(self.n_classes):
-                    class_dfs = [d[j] for d in self.local_dfs]
-                    dfs.append(self.get_avg(class_dfs))
-
-                self.local_df = dfs
-
-            else:
-                self.local_df = self.local_dfs[0]
-
-        self.local_dfs = None  # Save memory
-
 
 IMPORTANCES = {
     'base': ({'name': 'base',
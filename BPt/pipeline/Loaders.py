@@ -5,38 +5,148 @@ from .Transformers import Transformer_Wrapper
 from ..extensions.Loaders import Identity, SurfLabels
 from joblib import Parallel, delayed
 import warnings
-from sklearn.utils.validation import check_memory
 from sklearn.base import clone
+from sklearn.pipeline import Pipeline
+from joblib import hash as joblib_hash
+from ..helpers.Loader_Cache import (Loader_Cache, get_file_key,
+                                    DEFAULT_MAX_SIZE)
+from ..helpers.Data_File import iter_loaded
+from ..helpers.Shared_Data import load_shared
 
 
-def load_and_trans(transformer, load_func, loc):
-    '''This function is designed to be able to be wrapped in a cache
-    check_memory.'''
+def get_trans_chunk(transformer, data_files):
+    '''This function is designed to be used for multi-processing.
+    The next files are read in the background while
+    the current one is being transformed.'''
 
-    data = load_func(loc)
-    trans_data = np.squeeze(transformer.fit_transform(data))
-    return trans_data
+    X_trans_chunk = []
+    for data in iter_loaded(data_files):
+        trans_data = np.squeeze(clone(transformer).fit_transform(data))
+        X_trans_chunk.append(trans_data)
 
+    return X_trans_chunk
 
-def get_trans_chunk(transformer, data_files, func):
-    '''This function is designed to be used for multi-processing'''
 
-    X_trans_chunk = []
-    for data_file in data_files:
-        loc = data_file.loc
-        load_func = data_file.load_func
-        trans_data = func(clone(transformer), load_func, loc)
-        X_trans_chunk.append(trans_data)
+def get_trans_chunk_batched(transformer, data_files, batch_size):
+    '''For loaders with a transform_batch method, fit one copy of the
+    loader on the first file, then transform batch_size files per call.
+    This function is also designed to be used for multi-processing'''
+
+    transformer = clone(transformer)
+
+    X_trans_chunk, batch = [], []
+    for data in iter_loaded(data_files):
+
+        if len(X_trans_chunk) == 0 and len(batch) == 0:
+            transformer.fit(data)
+
+        batch.append(data)
+        if len(batch) == batch_size:
+            X_trans_chunk += [np.squeeze(trans_data) for trans_data
+                              in transformer.transform_batch(batch)]
+            batch = []
+
+    if len(batch) > 0:
+        X_trans_chunk += [np.squeeze(trans_data) for trans_data
+                          in transformer.transform_batch(batch)]
 
     return X_trans_chunk
 
 
+def is_stateless(loader):
+    '''A loader is stateless if its output for a file depends only on
+    that file and the loader's params, as marked by a _stateless
+    attribute. A Pipeline is stateless if all of its steps are.'''
+
+    if isinstance(loader, Pipeline):
+        return all(is_stateless(step) for _, step in loader.steps)
+
+    return getattr(loader, '_stateless', False)
+
+
+class Loader_Store(dict):
+    '''In memory store of already transformed data files, keyed by
+    loader and file mapping key. Copies of this object are just
+    references to the same store, s.t., it is shared between clones
+    of a Loader_Wrapper, e.g., across folds and repeats. The store is
+    local to each process, and pickles as empty, s.t., pipelines sent to
+    workers, returned from them, hashed or saved, don't carry it.
+
+    The exception is any outputs published with :func:`share`, which
+    pickle as cheap references to the shared arrays, s.t., workers
+    can read them without re-loading the data files.'''
+
+    def __init__(self, shared=None):
+
+        super().__init__()
+
+        if shared is None:
+            shared = {}
+        self.shared = shared
+        self._loaded = {}
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (Loader_Store, (self.shared,))
+
+    def get(self, key, default=None):
+
+        if key in self:
+            return self[key]
+
+        if key in self.shared:
+            block, ind = self.shared[key]
+            if block.loc not in self._loaded:
+                self._loaded[block.loc] = load_shared(block)
+            return self._loaded[block.loc][ind]
+
+        return default
+
+    def share(self, shared):
+        '''Publish the stored outputs with the passed
+        :class:`Shared_Data<BPt.helpers.Shared_Data.Shared_Data>`,
+        stacked into one array per loader and output shape.'''
+
+        groups = {}
+        for key, value in self.items():
+            value = np.asarray(value)
+            groups.setdefault((key[0], value.shape, value.dtype),
+                              []).append(key)
+
+        for keys in groups.values():
+            block = shared.share(np.stack([self[key] for key in keys]),
+                                 force=True)
+            for ind, key in enumerate(keys):
+                self.shared[key] = (block, ind)
+
+    def unshare(self):
+        '''Drop the references to any shared outputs, e.g., once
+        the :class:`Shared_Data` they were published with is closed.'''
+
+        self.shared.clear()
+        self._loaded.clear()
+
+    def clear(self):
+
+        super().clear()
+        self.unshare()
+
+
 class Loader_Wrapper(Transformer_Wrapper):
 
+    # Max number of files passed at once to a batched loader
+    batch_size = 100
+
     def __init__(self, wrapper_transformer,
                  wrapper_inds, file_mapping,
                  wrapper_n_jobs=1, cache_loc=None,
-                 **params):
+                 cache_max_size=DEFAULT_MAX_SIZE, stateless='auto',
+                 trans_store=None, **params):
 
         super().__init__(wrapper_transformer=wrapper_transformer,
                          wrapper_inds=wrapper_inds, cache_loc=cache_loc,
@@ -44,6 +154,19 @@ class Loader_Wrapper(Transformer_Wrapper):
 
         self.file_mapping = file_mapping
         self.wrapper_n_jobs = wrapper_n_jobs
+        self.cache_max_size = cache_max_size
+        self.stateless = stateless
+        self.trans_store = trans_store
+
+    def _use_store(self):
+
+        if self.trans_store is None:
+            return False
+
+        if self.stateless == 'auto':
+            return is_stateless(self.wrapper_transformer)
+
+        return self.stateless
 
     def _fit(self, X, y=None):
 
@@ -102,38 +225,101 @@ class Loader_Wrapper(Transformer_Wrapper):
         chunks[-1] += list(range(last+1, len(data_files)))
         return [[data_files[i] for i in c] for c in chunks]
 
+    def materialize(self, X):
+        '''If stateless, load and transform every data file in X
+        up front, filling the shared trans_store.'''
+
+        if not self._use_store():
+            return
+
+        for col in self.wrapper_inds:
+            self._get_trans_col(np.unique(X[:, col]))
+
     def _get_trans_col(self, fm_keys):
 
-        # Grab the right data files from the file mapping (casting to int!)
-        data_files = [self.file_mapping[int(fm_key)] for fm_key in fm_keys]
+        # Cast to int!
+        fm_keys = [int(fm_key) for fm_key in fm_keys]
 
         # Clone the base loader transformer
         cloned_transformer = clone(self.wrapper_transformer)
 
-        # If a caching location is passed, create new load_cand_trans_c func
-        if self.cache_loc is not None:
-            memory = check_memory(self.cache_loc)
-            load_and_trans_c = memory.cache(load_and_trans)
-        else:
-            load_and_trans_c = load_and_trans
+        if not self._use_store():
+            return self._get_trans_cols(cloned_transformer, fm_keys)
+
+        # If stateless, only compute outputs not already in the store
+        loader_key = joblib_hash(cloned_transformer)
+        X_trans_cols = [self.trans_store.get((loader_key, fm_key))
+                        for fm_key in fm_keys]
+
+        missing = [i for i in range(len(X_trans_cols))
+                   if X_trans_cols[i] is None]
+
+        if len(missing) > 0:
+            missing_cols =\
+                self._get_trans_cols(cloned_transformer,
+                                     [fm_keys[i] for i in missing])
 
-        if self.wrapper_n_jobs == 1:
-            X_trans_cols = get_trans_chunk(cloned_transformer,
-                                           data_files, load_and_trans_c)
+            for i, col in zip(missing, missing_cols):
+                self.trans_store[(loader_key, fm_keys[i])] = col
+                X_trans_cols[i] = col
+
+        return X_trans_cols
+
+    def _get_trans_cols(self, cloned_transformer, fm_keys):
+
+        # Grab the right data files from the file mapping
+        data_files = [self.file_mapping[fm_key] for fm_key in fm_keys]
+
+        # If no cache, load and transform all
+        if self.cache_loc is None:
+            return self._load_and_trans(cloned_transformer, data_files)
+
+        # Otherwise, only load and transform what is not already cached
+        cache = Loader_Cache(self.cache_loc, max_size=self.cache_max_size)
+        loader_key = cache.get_loader_key(cloned_transformer)
+        file_keys = [get_file_key(data_file) for data_file in data_files]
+
+        X_trans_cols = cache.get(loader_key, file_keys)
+        missing = [i for i in range(len(X_trans_cols))
+                   if X_trans_cols[i] is None]
+
+        if len(missing) > 0:
+            missing_cols =\
+                self._load_and_trans(cloned_transformer,
+                                     [data_files[i] for i in missing])
+            cache.put(loader_key, [file_keys[i] for i in missing],
+                      missing_cols)
+
+            for i, col in zip(missing, missing_cols):
+                X_trans_cols[i] = col
+
+        return X_trans_cols
+
+    def _load_and_trans(self, cloned_transformer, data_files):
+
+        # Use the batched loader protocol if avaliable
+        if hasattr(cloned_transformer, 'transform_batch'):
+            chunk_func = get_trans_chunk_batched
+            chunk_params = {'batch_size': self.batch_size}
         else:
-            chunks = self.get_chunks(data_files)
+            chunk_func = get_trans_chunk
+            chunk_params = {}
+
+        if self.wrapper_n_jobs == 1 or len(data_files) < self.wrapper_n_jobs:
+            return chunk_func(cloned_transformer, data_files, **chunk_params)
 
-            X_trans_chunks =\
-                Parallel(n_jobs=self.wrapper_n_jobs)(
-                    delayed(get_trans_chunk)(
-                        transformer=cloned_transformer,
-                        data_files=chunk,
-                        func=load_and_trans_c)
-                    for chunk in chunks)
+        chunks = self.get_chunks(data_files)
 
-            X_trans_cols = []
-            for chunk in X_trans_chunks:
-                X_trans_cols += chunk
+        X_trans_chunks =\
+            Parallel(n_jobs=self.wrapper_n_jobs)(
+                delayed(chunk_func)(
+                    transformer=cloned_transformer,
+                    data_files=chunk, **chunk_params)
+                for chunk in chunks)
+
+        X_trans_cols = []
+        for chunk in X_trans_chunks:
+            X_trans_cols += chunk
 
         return X_trans_cols
 
@@ -268,6 +454,12 @@ class Loader_Wrapper(Transformer_Wrapper):
             self.file_mapping = params.pop('file_mapping')
         if 'wrapper_n_jobs' in params:
             self.wrapper_n_jobs = params.pop('wrapper_n_jobs')
+        if 'cache_max_size' in params:
+            self.cache_max_size = params.pop('cache_max_size')
+        if 'stateless' in params:
+            self.stateless = params.pop('stateless')
+        if 'trans_store' in params:
+            self.trans_store = params.pop('trans_store')
 
         return super().set_params(**params)
 
@@ -278,6 +470,11 @@ class Loader_Wrapper(Transformer_Wrapper):
         # Passing file_mapping as just a reference *should* be okay
         params['file_mapping'] = self.file_mapping
         params['wrapper_n_jobs'] = self.wrapper_n_jobs
+        params['cache_max_size'] = self.cache_max_size
+        params['stateless'] = self.stateless
+
+        # The store is shared by reference, see Loader_Store
+        params['trans_store'] = self.trans_store
 
         return params
 
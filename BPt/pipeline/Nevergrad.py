@@ -1,23 +1,34 @@
 import numpy as np
 from numpy.random import RandomState
 import nevergrad as ng
+from nevergrad.optimization import utils as ng_utils
 
 from concurrent import futures
 import multiprocessing as mp
+import time
+import uuid
+from collections import OrderedDict
 
 from sklearn.base import clone
 from copy import deepcopy
+from joblib import effective_n_jobs
 
 from .base import _get_est_fit_params
 from ..helpers.CV import CV
+from ..helpers.Shared_Data import Shared_Data, load_shared
+from ..helpers.Trial_Store import Trial_Store, get_params_key
+from ..helpers.Worker_Pool import get_executor
+from ..helpers.Resources import call_with_threads
+from functools import partial
 from os.path import dirname, abspath, exists
 from sklearn.base import BaseEstimator
 import warnings
 
-try:
-    from loky import get_reusable_executor
-except ImportError:
-    pass
+# Max number of candidate jobs to keep in _score_memo
+SCORE_MEMO_SIZE = 10000
+
+# The submitted job for each candidate, keyed by search key and params
+_score_memo = OrderedDict()
 
 
 class ProgressLogger():
@@ -35,38 +46,315 @@ class ProgressLogger():
             f.write('params,')
 
 
-def ng_cv_score(X, y, estimator, scoring, weight_scorer,
-                cv_inds, cv_subjects, mapping, fit_params, **kwargs):
+class _Finished_Job():
+    '''Job-like holder of just a computed score.'''
 
-    cv_scores = []
-    for i in range(len(cv_inds)):
-        tr_inds, test_inds = cv_inds[i]
+    def __init__(self, value):
+        self.value = value
 
-        # Clone estimator & set search params
-        estimator = clone(estimator)
-        estimator.set_params(**kwargs)
+    def done(self):
+        return True
 
-        # Adds mapping / train data index if needed
-        f_params = _get_est_fit_params(
-            estimator,
-            mapping=mapping,
-            train_data_index=cv_subjects[i][0],
-            other_params=fit_params)
+    def result(self):
+        return self.value
 
-        # Fit estimator on train
-        estimator.fit(X[tr_inds], y[tr_inds], **deepcopy(f_params))
 
-        # Get the score, but scoring return high values as better,
-        # so flip sign
-        score = -scoring(estimator, X[test_inds], y[test_inds])
-        cv_scores.append(score)
+class Memo_Executor():
+    '''Wraps an executor, s.t., a candidate with the same params as an
+    already submitted candidate, within this search or an earlier
+    search with the same search key, e.g., from another outer fold
+    with the same inner splits, is answered from the earlier job.
+    The optimizer is still told about every candidate.'''
+
+    def __init__(self, executor, search_key, keep=True):
+
+        self.executor = executor
+        self.search_key = search_key
+        self.keep = keep
+
+    def submit(self, fn, *args, **kwargs):
+
+        key = (self.search_key, get_params_key(kwargs))
+
+        if key in _score_memo:
+            job = _score_memo[key]
+            if not getattr(job, 'cancelled', lambda: False)():
+                _score_memo.move_to_end(key)
+                return job
+
+        job = self.executor.submit(fn, *args, **kwargs)
+
+        _score_memo[key] = job
+        while len(_score_memo) > SCORE_MEMO_SIZE:
+            _score_memo.popitem(last=False)
+
+        return job
+
+    def get(self, params):
+        '''Returns the memoized score for these params,
+        if already finished, otherwise None.'''
+
+        job = _score_memo.get((self.search_key, get_params_key(params)))
+        if isinstance(job, _Finished_Job):
+            return job.result()
+
+        return None
+
+    def put(self, params, value):
+
+        _score_memo[(self.search_key, get_params_key(params))] =\
+            _Finished_Job(value)
+
+    def finalize(self, completed=True):
+        '''Keep just the scores of this search's finished jobs, s.t.,
+        the memo doesn't hold on to any data passed to the jobs.
+        If not keeping them for later searches, or the search
+        failed, remove them instead.'''
+
+        for key in list(_score_memo):
+            if key[0] != self.search_key:
+                continue
+
+            if not self.keep or not completed:
+                del _score_memo[key]
+                continue
+
+            job = _score_memo[key]
+            if isinstance(job, _Finished_Job):
+                continue
+
+            try:
+                _score_memo[key] = _Finished_Job(job.result())
+            except Exception:
+                del _score_memo[key]
+
+
+class Fold_Pruner():
+    '''Median stopping rule for the inner CV folds of a search.
+    After each fold, a candidate is abandoned if its mean score so far
+    is worse than the median of the mean scores of the previously
+    evaluated candidates over the same folds.
+
+    Parameters
+    ----------
+    warmup : int
+        The number of candidates which must have been evaluated
+        on a fold before any candidate is pruned there.
+
+    history : list-like or None, optional
+        Where the fold scores of each evaluated candidate are stored.
+        When evaluating candidates in seperate processes, this
+        should be a shared list, e.g., from multiprocessing.Manager.
+
+        (default = None)
+    '''
+
+    def __init__(self, warmup, history=None):
+
+        self.warmup = warmup
+
+        if history is None:
+            history = []
+        self.history = history
+
+    def should_prune(self, cv_scores):
+
+        # Scores are flipped, s.t., lower is better
+        n = len(cv_scores)
+        partials = [np.mean(scores[:n]) for scores in list(self.history)
+                    if len(scores) >= n]
+
+        if len(partials) < self.warmup:
+            return False
+
+        return np.mean(cv_scores) > np.median(partials)
+
+    def add(self, cv_scores):
+        self.history.append(list(cv_scores))
+
+
+# Max number of fitted pipeline prefixes to keep in _prefix_cache
+PREFIX_CACHE_SIZE = 32
+
+# The transformed fold data from fitted pipeline prefixes, keyed
+# by search, fold and number of prefix steps, see _get_prefix_data.
+# Each process, including persistent workers, only keeps those from
+# the search it is currently running.
+_prefix_cache = OrderedDict()
+
+
+def _get_prefix_data(key, estimator, n_steps, X, y, tr_inds, test_inds,
+                     f_params):
+    '''Fit the first n_steps of a pipeline on the train fold, returning
+    the transformed train and test fold and the mapping after the steps,
+    or just return them if already cached under this key.'''
+
+    if key in _prefix_cache:
+        _prefix_cache.move_to_end(key)
+        return _prefix_cache[key]
+
+    # Drop any left over from previous searches
+    for old_key in list(_prefix_cache):
+        if old_key[0] != key[0]:
+            del _prefix_cache[old_key]
+
+    prefix, X_tr, mapping =\
+        estimator.fit_prefix(n_steps, X[tr_inds], y[tr_inds],
+                             **deepcopy(f_params))
+
+    X_test = X[test_inds]
+    for _, step in prefix:
+        X_test = step.transform(X_test)
+
+    _prefix_cache[key] = (X_tr, X_test, mapping)
+    while len(_prefix_cache) > PREFIX_CACHE_SIZE:
+        _prefix_cache.popitem(last=False)
+
+    return _prefix_cache[key]
+
+
+def clear_prefix_cache(search_key):
+    '''Remove any cached prefixes from this search.'''
+
+    for key in list(_prefix_cache):
+        if key[0] == search_key:
+            del _prefix_cache[key]
+
+
+def clear_worker_prefix_caches(executor, n_jobs, search_key):
+    '''Remove any cached prefixes from this search in the workers
+    of the executor. Any worker missed here still drops them once it
+    caches a prefix from another search.'''
+
+    jobs = [executor.submit(clear_prefix_cache, search_key)
+            for _ in range(n_jobs)]
+    futures.wait(jobs)
+
+
+def _get_n_prefix(estimator, param_names, f_params):
+
+    # Only pipelines, where no other fit params need routing
+    if not hasattr(estimator, 'fit_prefix'):
+        return 0
+    if len(set(f_params) - {'mapping', 'train_data_index'}) > 0:
+        return 0
+
+    return estimator.get_prefix_len(param_names)
+
+
+def _fit_score_fold(i, X, y, estimator, scoring, cv_inds, cv_subjects,
+                    mapping, fit_params, prefix_key, kwargs):
+    '''Fit a candidate on the i-th inner train fold, returning
+    its flipped score on the i-th validation fold.'''
+
+    tr_inds, test_inds = cv_inds[i]
+
+    # Clone estimator & set search params
+    estimator = clone(estimator)
+    estimator.set_params(**kwargs)
+
+    # Adds mapping / train data index if needed
+    f_params = _get_est_fit_params(
+        estimator,
+        mapping=mapping,
+        train_data_index=cv_subjects[i][0],
+        other_params=fit_params)
+
+    # If caching prefixes, find the leading steps of the
+    # pipeline which no search params touch
+    n_prefix = 0
+    if prefix_key is not None:
+        n_prefix = _get_n_prefix(estimator, kwargs, f_params)
+
+    # Fit just the rest of the pipeline on the cached
+    # output of the already fitted prefix steps
+    if n_prefix > 0:
+        X_tr, X_test, p_mapping =\
+            _get_prefix_data((prefix_key, i, n_prefix), estimator,
+                             n_prefix, X, y, tr_inds, test_inds,
+                             f_params)
 
+        fold_est = estimator.get_suffix(n_prefix)
+        fold_est.fit(X_tr, y[tr_inds], mapping=p_mapping,
+                     train_data_index=f_params.get('train_data_index'))
+
+    # Otherwise, fit estimator on train
+    else:
+        fold_est = estimator
+        fold_est.fit(X[tr_inds], y[tr_inds], **deepcopy(f_params))
+        X_test = X[test_inds]
+
+    # Get the score, but scoring return high values as better,
+    # so flip sign
+    return -scoring(fold_est, X_test, y[test_inds])
+
+
+def _combine_scores(cv_scores, cv_inds, weight_scorer):
+
+    # Score from just the evaluated folds
     if weight_scorer:
         weights = [len(cv_inds[i][1]) for i
-                   in range(len(cv_inds))]
+                   in range(len(cv_scores))]
         return np.average(cv_scores, weights=weights)
-    else:
-        return np.mean(cv_scores)
+
+    return np.mean(cv_scores)
+
+
+def ng_cv_score(X, y, estimator, scoring, weight_scorer,
+                cv_inds, cv_subjects, mapping, fit_params,
+                pruner=None, prefix_key=None, trial_store=None, **kwargs):
+
+    # If already evaluated, e.g., in an interrupted search, skip
+    if trial_store is not None:
+        value = trial_store.get(kwargs)
+        if value is not None:
+            return value
+
+    # Attach to any shared X, y and cv inds
+    X, y, cv_inds = load_shared(X), load_shared(y), load_shared(cv_inds)
+
+    cv_scores, cv_times = [], []
+    for i in range(len(cv_inds)):
+        start_time = time.time()
+
+        score = _fit_score_fold(i, X, y, estimator, scoring, cv_inds,
+                                cv_subjects, mapping, fit_params,
+                                prefix_key, kwargs)
+        cv_scores.append(score)
+        cv_times.append(time.time() - start_time)
+
+        # If pruning, stop early if this candidate looks hopeless
+        if pruner is not None and i < len(cv_inds) - 1:
+            if pruner.should_prune(cv_scores):
+                break
+
+    if pruner is not None:
+        pruner.add(cv_scores)
+
+    value = _combine_scores(cv_scores, cv_inds, weight_scorer)
+
+    if trial_store is not None:
+        trial_store.put(kwargs, cv_scores, cv_times, value)
+
+    return value
+
+
+def ng_fold_score(i, X, y, estimator, scoring, weight_scorer,
+                  cv_inds, cv_subjects, mapping, fit_params,
+                  pruner=None, prefix_key=None, trial_store=None, **kwargs):
+    '''Score a candidate on just the i-th inner fold, returning the
+    score and time taken, see :func:`NevergradSearchCV.run_fold_tasks`.'''
+
+    start_time = time.time()
+
+    # Attach to any shared X, y and cv inds
+    X, y, cv_inds = load_shared(X), load_shared(y), load_shared(cv_inds)
+
+    score = _fit_score_fold(i, X, y, estimator, scoring, cv_inds,
+                            cv_subjects, mapping, fit_params,
+                            prefix_key, kwargs)
+
+    return score, time.time() - start_time
 
 
 class NevergradSearchCV(BaseEstimator):
@@ -137,16 +425,28 @@ class NevergradSearchCV(BaseEstimator):
                                          self.param_search._random_state,
                                          return_index='both')
 
-    def get_instrumentation(self, X, y, mapping, fit_params, client):
+    def get_instrumentation(self, X, y, mapping, fit_params, client,
+                            shared=None, pruner=None, prefix_key=None,
+                            trial_store=None):
 
         if client is None:
+
+            # If running in multiple processes, pass just
+            # references to the shared versions of the big memory params
+            cv_inds = self.cv_inds
+            if shared is not None:
+                X, y = shared.share(X), shared.share(y)
+                cv_inds = shared.share_splits(cv_inds)
+
             instrumentation =\
                 ng.p.Instrumentation(X, y, self.estimator,
                                      self.param_search._scorer,
                                      self.param_search.weight_scorer,
-                                     self.cv_inds,
+                                     cv_inds,
                                      self.cv_subjects, mapping,
-                                     fit_params, **self.param_distributions)
+                                     fit_params, pruner, prefix_key,
+                                     trial_store,
+                                     **self.param_distributions)
 
         # If using dask client, pre-scatter some big memory fixed params
         else:
@@ -161,10 +461,75 @@ class NevergradSearchCV(BaseEstimator):
                                      self.param_search.weight_scorer,
                                      cv_inds_s,
                                      cv_subjects_s, mapping,
-                                     fit_params, **self.param_distributions)
+                                     fit_params, pruner, prefix_key,
+                                     trial_store,
+                                     **self.param_distributions)
 
         return instrumentation
 
+    def _use_search_key(self):
+        '''If scores are shared with other searches, either
+        through the memo or a trial store.'''
+
+        return self.param_search.memoize or \
+            self.param_search.trial_loc is not None
+
+    def _set_search_key(self, X, y, mapping, fit_params):
+        '''Set search_key_, a fingerprint of everything which
+        can change the score of a candidate. If not sharing scores
+        with other searches, just a unique key for this search.'''
+
+        if not self._use_search_key():
+            self.search_key_ = uuid.uuid4().hex
+            return
+
+        # Use the names of the distributions, as their random
+        # states and current values change as they are sampled
+        dists = {key: getattr(dist, 'name', repr(dist))
+                 for key, dist in self.param_distributions.items()}
+
+        # Pruned candidates are scored on only some of the folds,
+        # so aren't comparable with those from other prune settings
+        prune = False
+        if self.param_search.prune:
+            prune = (True, self.param_search.prune_warmup)
+
+        self.search_key_ =\
+            Trial_Store.get_search_key(self.estimator, dists,
+                                       self.param_search._scorer,
+                                       self.param_search.weight_scorer,
+                                       X, y, self.cv_inds, mapping,
+                                       fit_params, prune)
+
+    def get_trial_store(self):
+        '''If a trial_loc is set, returns a Trial_Store
+        for this search.'''
+
+        if self.param_search.trial_loc is None:
+            return None
+
+        return Trial_Store(self.param_search.trial_loc, self.search_key_)
+
+    def warm_start(self, optimizer, trial_store):
+        '''Tell the optimizer about any already evaluated candidates.'''
+
+        n_told = 0
+        for params, value in trial_store.load():
+
+            candidate = optimizer.parametrization.spawn_child()
+            try:
+                for key in params:
+                    candidate[1][key].value = params[key]
+                optimizer.tell(candidate, value)
+                n_told += 1
+
+            # If no longer valid, or optimizer doesn't support, skip
+            except (KeyError, ValueError, NotImplementedError):
+                continue
+
+        if self.verbose:
+            print('Warm started search from', n_told, 'stored candidates')
+
     def get_optimizer(self, instrumentation):
 
         try:
@@ -177,7 +542,7 @@ class NevergradSearchCV(BaseEstimator):
 
         optimizer = opt(parametrization=instrumentation,
                         budget=self.param_search.n_iter,
-                        num_workers=self.n_jobs)
+                        num_workers=self.n_jobs_)
 
         # Set random state is defined
         if isinstance(self.random_state, int):
@@ -194,45 +559,62 @@ class NevergradSearchCV(BaseEstimator):
 
         return optimizer
 
-    def run_search(self, optimizer, client):
+    def run_search(self, optimizer, client, prefix_key=None):
 
-        # n_jobs 1, always local
-        if self.n_jobs == 1:
-            recommendation = optimizer.minimize(ng_cv_score,
-                                                batch_mode=False)
-
-        # If generated client
-        elif client is not None:
+        # If generated client, not memoized
+        if client is not None:
             recommendation = optimizer.minimize(ng_cv_score,
                                                 executor=client,
                                                 batch_mode=False)
 
-        # Otherwise use futures pool executor
+        # n_jobs 1, always local
+        elif self.n_jobs_ == 1:
+            executor = Memo_Executor(ng_utils.SequentialExecutor(),
+                                     self.search_key_,
+                                     keep=self.param_search.memoize)
+            completed = False
+            try:
+                recommendation = optimizer.minimize(ng_cv_score,
+                                                    executor=executor,
+                                                    batch_mode=False)
+                completed = True
+            finally:
+                executor.finalize(completed)
+
+        # Otherwise use the persistent worker pool
         else:
 
-            if self.param_search.mp_context == 'loky':
+            executor = Memo_Executor(
+                get_executor(self.n_jobs_, self.param_search.mp_context),
+                self.search_key_, keep=self.param_search.memoize)
 
-                try:
-                    executor = get_reusable_executor(
-                        max_workers=self.n_jobs, timeout=120)
+            completed = False
+            try:
 
-                    recommendation = optimizer.minimize(ng_cv_score,
-                                                        executor=executor,
-                                                        batch_mode=False)
-                except NameError:
-                    raise(ImportError('Make sure loky is installed'))
+                # Either schedule each fold of each candidate seperately
+                if self.param_search.fold_tasks:
+                    recommendation = self.run_fold_tasks(optimizer,
+                                                         executor)
 
-            try:
-                with futures.ProcessPoolExecutor(
-                  max_workers=self.n_jobs,
-                  mp_context=mp.get_context(self.param_search.mp_context)) as ex:
+                # Or each candidate w/ all its folds as one job,
+                # where each worker gets one core, so one BLAS thread
+                else:
+                    recommendation = optimizer.minimize(
+                        partial(call_with_threads, 1, ng_cv_score),
+                        executor=executor, batch_mode=False)
+                completed = True
 
-                    recommendation = optimizer.minimize(ng_cv_score,
-                                                        executor=ex,
-                                                        batch_mode=False)
             except RuntimeError:
                 raise(RuntimeError('Try changing the mp_context'))
 
+            finally:
+                executor.finalize(completed)
+
+            # The workers outlive the search, so clear their prefixes
+            if prefix_key is not None:
+                clear_worker_prefix_caches(executor.executor, self.n_jobs_,
+                                           prefix_key)
+
         # Save best search search score
         # "optimistic", "pessimistic", "average"
         # and best params
@@ -241,6 +623,80 @@ class NevergradSearchCV(BaseEstimator):
 
         return recommendation
 
+    def run_fold_tasks(self, optimizer, executor):
+        '''Run the search with each inner fold of each candidate as a
+        seperate task, asking for a new candidate whenever a worker
+        would otherwise be idle, and telling the optimizer about each
+        candidate once all of its folds are done.'''
+
+        n_folds = len(self.cv_inds)
+        trial_store = self.get_trial_store()
+
+        queue, running, cands = [], {}, {}
+        while optimizer.num_ask < optimizer.budget or len(running) > 0:
+
+            # Fill any idle workers
+            while len(running) < self.n_jobs_:
+
+                # Ask for a new candidate, only if no folds waiting
+                if len(queue) == 0:
+                    if optimizer.num_ask >= optimizer.budget:
+                        break
+
+                    candidate = optimizer.ask()
+
+                    # If already evaluated, tell right away
+                    value = executor.get(candidate.kwargs)
+                    if value is None and trial_store is not None:
+                        value = trial_store.get(candidate.kwargs)
+                    if value is not None:
+                        optimizer.tell(candidate, value)
+                        continue
+
+                    c_ind = optimizer.num_ask
+                    cands[c_ind] = {'candidate': candidate,
+                                    'scores': [None] * n_folds,
+                                    'times': [None] * n_folds,
+                                    'left': n_folds}
+                    queue += [(c_ind, i) for i in range(n_folds)]
+
+                c_ind, i = queue.pop(0)
+                candidate = cands[c_ind]['candidate']
+                job = executor.executor.submit(call_with_threads, 1,
+                                               ng_fold_score, i,
+                                               *candidate.args,
+                                               **candidate.kwargs)
+                running[job] = (c_ind, i)
+
+            if len(running) == 0:
+                continue
+
+            # Wait for any fold to finish
+            done, _ = futures.wait(list(running),
+                                   return_when=futures.FIRST_COMPLETED)
+
+            for job in done:
+                c_ind, i = running.pop(job)
+                cand = cands[c_ind]
+                cand['scores'][i], cand['times'][i] = job.result()
+                cand['left'] -= 1
+
+                # Once all folds are done, tell
+                if cand['left'] == 0:
+                    candidate = cand['candidate']
+                    value = _combine_scores(cand['scores'], self.cv_inds,
+                                            self.param_search.weight_scorer)
+
+                    executor.put(candidate.kwargs, value)
+                    if trial_store is not None:
+                        trial_store.put(candidate.kwargs, cand['scores'],
+                                        cand['times'], value)
+
+                    optimizer.tell(candidate, value)
+                    del cands[c_ind]
+
+        return optimizer.provide_recommendation()
+
     def fit(self, X, y=None, mapping=None,
             train_data_index=None, **fit_params):
 
@@ -257,25 +713,70 @@ class NevergradSearchCV(BaseEstimator):
         # Set the search cv passed on passed train_data_index
         self._set_cv(train_data_index)
 
+        # The actual number of jobs, e.g., if passed n_jobs = -1
+        self.n_jobs_ = effective_n_jobs(self.n_jobs)
+
         # Check if need to make dask client
-        # Criteria is greater than 1 job, and passed as dask_ip of non-None
-        if self.n_jobs > 1 and self.param_search.dask_ip is not None:
+        # Criteria is more than 1 job, and passed as dask_ip of non-None
+        if self.n_jobs_ > 1 and self.param_search.dask_ip is not None:
             from dask.distributed import Client
             client = Client(self.param_search.dask_ip)
         else:
             client = None
 
-        # Get the instrumentation
-        instrumentation =\
-            self.get_instrumentation(X, y, mapping=mapping,
-                                     fit_params=fit_params,
-                                     client=client)
+        # If running locally w/ more than one process, publish
+        # the big memory fixed params once for all of the workers
+        if self.n_jobs_ > 1 and client is None:
+            shared = Shared_Data()
+        else:
+            shared = None
+
+        # If pruning, share the fold scores between local processes
+        pruner, manager = None, None
+        if self.param_search.prune:
+            pruner = Fold_Pruner(self.param_search.prune_warmup)
+
+            if shared is not None:
+                manager = mp.Manager()
+                pruner.history = manager.list()
 
-        # Get the optimizer
-        optimizer = self.get_optimizer(instrumentation)
+        # If caching fitted pipeline prefixes, a unique key for this search
+        prefix_key = None
+        if self.param_search.cache_prefix:
+            prefix_key = uuid.uuid4().hex
 
-        # Run the search
-        recommendation = self.run_search(optimizer, client)
+        # Fingerprint this search, then if storing trials,
+        # get the store for this search
+        self._set_search_key(X, y, mapping, fit_params)
+        trial_store = self.get_trial_store()
+
+        try:
+
+            # Get the instrumentation
+            instrumentation =\
+                self.get_instrumentation(X, y, mapping=mapping,
+                                         fit_params=fit_params,
+                                         client=client, shared=shared,
+                                         pruner=pruner,
+                                         prefix_key=prefix_key,
+                                         trial_store=trial_store)
+
+            # Get the optimizer, and warm start if any stored trials
+            optimizer = self.get_optimizer(instrumentation)
+            if trial_store is not None:
+                self.warm_start(optimizer, trial_store)
+
+            # Run the search
+            recommendation = self.run_search(optimizer, client,
+                                             prefix_key=prefix_key)
+
+        finally:
+            if shared is not None:
+                shared.close()
+            if manager is not None:
+                manager.shutdown()
+            if prefix_key is not None:
+                clear_prefix_cache(prefix_key)
 
         # Fit best est, w/ best params
         self.fit_best_estimator(recommendation, X, y, mapping,
@@ -2,14 +2,22 @@ from joblib import dump, load, Parallel, delayed
 import os
 import copy
 import numpy as np
+from ..helpers.Shared_Data import Shared_Data, Shared_Array, load_shared
+from .Scorers import Cached_Predictor
 
 
 def get_feat_importances(model_loc, scorer, inds, X, y, n_perm):
 
     results = {}
     model = load(model_loc)
+    y = load_shared(y)
 
-    X_copy = X.copy()
+    # If shared, attach copy-on-write, s.t. only
+    # the pages touched by permuting are copied
+    if isinstance(X, Shared_Array):
+        X_copy = X.load(mmap_mode='c')
+    else:
+        X_copy = X.copy()
 
     for ind in inds:
 
@@ -75,18 +83,17 @@ class Perm_Feat_Importance():
 
             scorers = [scorer for i in range(self.n_jobs)]
             inds = self.get_chunks()
-            Xs = [X for i in range(self.n_jobs)]
-            ys = [y for i in range(self.n_jobs)]
             n_perms = [self.n_perm for i in range(self.n_jobs)]
 
-            imp_dicts =\
-                Parallel(n_jobs=self.n_jobs)(delayed(get_feat_importances)
-                                                    (ml, s, i, x, y, n) for
-                                             ml, s, i, x, y, n in zip(
-                                                 model_locs,
-                                                 scorers,
-                                                 inds, Xs, ys,
-                                                 n_perms))
+            # Publish X and y once, to be shared by every worker
+            with Shared_Data(self.temp_dr) as shared:
+                X_s, y_s = shared.share(X, force=True), shared.share(y)
+
+                imp_dicts =\
+                    Parallel(n_jobs=self.n_jobs)(
+                        delayed(get_feat_importances)(ml, s, i, X_s, y_s, n)
+                        for ml, s, i, n in zip(model_locs, scorers,
+                                               inds, n_perms))
 
             scores = [0 for i in range(X.shape[1])]
             for imp_dict in imp_dicts:
@@ -113,3 +120,209 @@ class Perm_Feat_Importance():
             importances.append(scorer(model, X_copy, self.y))
 
         return np.mean(importances)
+
+
+# Upper limit on the size of the stacked buffer used for batched prediction
+MAX_BATCH_NBYTES = 2.5e8
+
+
+def get_batched_feat_importances(model, scorer, groups, seeds,
+                                 X, y, n_perm, batch_size):
+    '''Return the mean permuted score for each group of column
+    indices in groups, where each group is permuted w/ its own
+    seeded Generator. model can be passed as the saved location.'''
+
+    if isinstance(model, str):
+        model = load(model)
+
+    X, y = load_shared(X), load_shared(y)
+    n_rows = X.shape[0]
+
+    # Reusable buffer of stacked copies of X
+    X_buf = np.tile(X, (batch_size, 1))
+
+    results = []
+    for group, seed in zip(groups, seeds):
+
+        rng = np.random.default_rng(seed)
+        original = np.asarray(X[:, group])
+
+        scores, remaining = [], n_perm
+        while remaining > 0:
+            n_batch = min(batch_size, remaining)
+            remaining -= n_batch
+
+            # Permute the rows of the whole block of columns in each copy
+            for b in range(n_batch):
+                X_buf[b*n_rows:(b+1)*n_rows, group] =\
+                    original[rng.permutation(n_rows)]
+
+            # Predict all copies at once, then score each
+            predictor = Cached_Predictor(model, X_buf[:n_batch*n_rows])
+            for b in range(n_batch):
+                rows = slice(b*n_rows, (b+1)*n_rows)
+                scores.append(scorer(predictor.masked(rows), X_buf[rows], y))
+
+        # Restore in place
+        X_buf[:, group] = np.tile(original, (batch_size, 1))
+
+        results.append(np.mean(scores))
+
+    return results
+
+
+class Batched_Perm_Feat_Importance(Perm_Feat_Importance):
+    '''Permutation feature importance, computed by permuting blocks of
+    columns in a reusable buffer, and predicting multiple permuted
+    copies with one call. Returns the same output as
+    :class:`Perm_Feat_Importance`, but reproducible given random_state.
+
+    Parameters
+    ----------
+    n_perm : int, optional
+        The number of permutations per feature / group.
+
+        (default = 1)
+
+    n_jobs : int, optional
+        The number of processes to split the groups across.
+
+        (default = 1)
+
+    temp_dr : str, optional
+        Where to save temporary files, if n_jobs > 1.
+
+        (default = '')
+
+    random_state : int, RandomState or None, optional
+        Used to spawn one seeded Generator per feature / group,
+        s.t., results do not depend on n_jobs or batch_size.
+
+        (default = None)
+
+    batch_size : int or None, optional
+        The number of permuted copies of X to predict at once.
+        If None, as many as n_perm, within MAX_BATCH_NBYTES.
+
+        (default = None)
+    '''
+
+    def __init__(self, n_perm=1, n_jobs=1, temp_dr='',
+                 random_state=None, batch_size=None):
+
+        super().__init__(n_perm=n_perm, n_jobs=n_jobs, temp_dr=temp_dr)
+
+        self.random_state = random_state
+        self.batch_size = batch_size
+
+    def get_seed(self):
+        '''Returns random_state as a valid SeedSequence entropy,
+        drawing an int seed if passed a RandomState.'''
+
+        if isinstance(self.random_state, np.random.RandomState):
+            return int(self.random_state.randint(np.iinfo(np.int32).max))
+
+        return self.random_state
+
+    def get_groups(self, n_features, groups=None):
+        '''Any columns not in a passed group, are their own group.
+        Columns are only kept in the first group they appear in.'''
+
+        if groups is None:
+            groups = []
+
+        proc_groups, grouped = [], set()
+        for group in groups:
+
+            group = sorted(set(group) - grouped)
+            if len(group) > 0:
+                proc_groups.append(group)
+                grouped.update(group)
+
+        return proc_groups +\
+            [[i] for i in range(n_features) if i not in grouped]
+
+    def get_batch_size(self, X):
+
+        if self.batch_size is not None:
+            return max(1, min(self.batch_size, self.n_perm))
+
+        max_copies = int(MAX_BATCH_NBYTES // max(X.nbytes, 1))
+        return max(1, min(self.n_perm, max_copies))
+
+    def compute(self, model, scorer, X, y, groups=None):
+        '''Compute the drop in score when permuting each feature, or
+        each group of features. groups, if passed, should be a
+        list of lists of column indices to permute together, where
+        every column in a group is assigned the group's importance.'''
+
+        self.X = X
+        self.y = y
+
+        baseline_score = scorer(model, X, y)
+
+        groups = self.get_groups(X.shape[1], groups)
+        seeds = np.random.SeedSequence(
+            self.get_seed()).spawn(len(groups))
+        batch_size = self.get_batch_size(X)
+
+        n_jobs = max(1, min(self.n_jobs, len(groups)))
+        chunks = [list(range(len(groups)))[i::n_jobs] for i in range(n_jobs)]
+
+        if n_jobs == 1:
+            chunk_scores = [get_batched_feat_importances(
+                model, scorer, groups, seeds, X, y, self.n_perm, batch_size)]
+
+        else:
+            chunk_scores = self._compute_parallel(model, scorer, X, y,
+                                                  groups, seeds, chunks,
+                                                  batch_size)
+
+        scores = np.zeros(X.shape[1])
+        for chunk, c_scores in zip(chunks, chunk_scores):
+            for g, score in zip(chunk, c_scores):
+                scores[groups[g]] = score
+
+        difs = baseline_score - scores
+        return difs
+
+    def _compute_parallel(self, model, scorer, X, y, groups,
+                          seeds, chunks, batch_size):
+
+        changed = None
+
+        # Ensure models n_jobs set to 1
+        try:
+            original = model.n_jobs
+            model.n_jobs = 1
+            changed = original
+
+        except AttributeError:
+            pass
+
+        rn = str(np.random.random())
+        model_loc = os.path.join(self.temp_dr, 'temp' + rn + '.joblib')
+        dump(model, model_loc)
+
+        try:
+
+            # Publish X and y once, to be shared by every worker
+            with Shared_Data(self.temp_dr) as shared:
+                X_s, y_s = shared.share(X), shared.share(y)
+
+                chunk_scores =\
+                    Parallel(n_jobs=len(chunks))(
+                        delayed(get_batched_feat_importances)(
+                            model_loc, scorer,
+                            [groups[g] for g in chunk],
+                            [seeds[g] for g in chunk],
+                            X_s, y_s, self.n_perm, batch_size)
+                        for chunk in chunks)
+
+        finally:
+            os.remove(model_loc)
+
+            if changed is not None:
+                model.n_jobs = changed
+
+        return chunk_scores
@@ -575,7 +575,7 @@ class Loaders(Pieces):
 
     def _process(self, params):
 
-        from .Loaders import Loader_Wrapper
+        from .Loaders import Loader_Wrapper, Loader_Store
 
         # Extract scopes + cache loc
         passed_loader_scopes = [p.scope for p in params]
@@ -597,6 +597,13 @@ class Loaders(Pieces):
                                      passed_loader_scopes,
                                      **pass_params)
 
+        # Set the max size of any caches, and give each loader a store
+        # to share transformed data files in, if stateless
+        for (_, loader), p in zip(passed_loaders, params):
+            loader.cache_max_size = p.cache_max_size
+            loader.stateless = p.stateless
+            loader.trans_store = Loader_Store()
+
         return passed_loaders, passed_loader_params
 
 
@@ -78,6 +78,92 @@ SCORERS.update({
 })
 
 
+class Cached_Predictor():
+    '''Stand in for a fitted model, which calls each of predict,
+    predict_proba and decision_function on X at most once, s.t.,
+    all of the scorers, as well as the raw predictions, can share
+    the same predictions. Any sklearn style scorer can be
+    used as is, i.e., scorer(predictor, X, y).
+
+    Parameters
+    ----------
+    model : sklearn estimator
+        The fitted model.
+
+    X : numpy array
+        The data to make predictions on. Any X
+        passed to the predict methods is ignored.
+
+    mask : numpy array, slice or None, optional
+        If passed, only return the predictions for
+        these rows, see :func:`masked`.
+
+        (default = None)
+    '''
+
+    def __init__(self, model, X, mask=None, _cache=None):
+
+        self.model = model
+        self.X = X
+        self.mask = mask
+
+        if _cache is None:
+            _cache = {}
+        self._cache = _cache
+
+        # Needed by the scorers to decide how to score
+        self._estimator_type = getattr(model, '_estimator_type', None)
+        if hasattr(model, 'classes_'):
+            self.classes_ = model.classes_
+
+    def masked(self, mask):
+        '''Return a Cached_Predictor serving just the masked rows,
+        which shares this predictor's cached predictions.'''
+
+        return Cached_Predictor(self.model, self.X, mask=mask,
+                                _cache=self._cache)
+
+    def _get(self, method):
+
+        # Raises AttributeError if the model doesn't have the method,
+        # which the scorers rely on
+        if method not in self._cache:
+            try:
+                self._cache[method] = getattr(self.model, method)(self.X)
+            except (AttributeError, NotImplementedError) as e:
+                self._cache[method] = e
+
+        preds = self._cache[method]
+        if isinstance(preds, Exception):
+            raise preds
+
+        if self.mask is None:
+            return preds
+
+        # Multi-output predict_proba returns a list
+        if isinstance(preds, list):
+            return [p[self.mask] for p in preds]
+
+        return preds[self.mask]
+
+    def predict(self, X=None):
+        return self._get('predict')
+
+    def predict_proba(self, X=None):
+        return self._get('predict_proba')
+
+    def decision_function(self, X=None):
+        return self._get('decision_function')
+
+    def __getattr__(self, name):
+
+        # Let custom scorers access any other fitted attributes
+        if name in ('model', 'X', 'mask', '_cache'):
+            raise AttributeError(name)
+
+        return getattr(self.model, name)
+
+
 def get_scorer_from_str(scorer_str):
 
     return SCORERS[scorer_str]
@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from BPt.helpers.CV import CV, clear_split_cache, _split_cache
+
+
+class Test_CV(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_CV, self).__init__(*args, **kwargs)
+
+        self.subjects = pd.Index(['s' + str(i) for i in range(20)])
+        self.groups = pd.Series(np.arange(20) % 5, index=self.subjects)
+
+    def test_both_match(self):
+
+        for cv in [CV(), CV(groups=self.groups)]:
+            for splits in [3, .25]:
+
+                names, inds = cv.get_cv(self.subjects, splits, 2,
+                                        random_state=None,
+                                        return_index='both')
+
+                self.assertEqual(len(names), len(inds))
+                for (tr_n, te_n), (tr_i, te_i) in zip(names, inds):
+                    self.assertTrue(np.array_equal(self.subjects[tr_i], tr_n))
+                    self.assertTrue(np.array_equal(self.subjects[te_i], te_n))
+
+    def test_split_cache(self):
+
+        clear_split_cache()
+        cv = CV()
+
+        names = cv.get_cv(self.subjects, 3, 2, random_state=1)
+        self.assertEqual(len(_split_cache), 1)
+
+        _, inds = cv.get_cv(self.subjects, 3, 2, random_state=1,
+                            return_index='both')
+        self.assertEqual(len(_split_cache), 1)
+        for (tr_n, _), (tr_i, _) in zip(names, inds):
+            self.assertTrue(np.array_equal(self.subjects[tr_i], tr_n))
+
+        # Different params or subjects, new splits
+        cv.get_cv(self.subjects, 3, 2, random_state=2)
+        cv.get_cv(self.subjects[1:], 3, 2, random_state=1)
+        CV(groups=self.groups).get_cv(self.subjects, 3, 2, random_state=1)
+        self.assertEqual(len(_split_cache), 4)
+
+        # Not cached w/o a fixed random state
+        cv.get_cv(self.subjects, 3, 2, random_state=None)
+        self.assertEqual(len(_split_cache), 4)
+
+        clear_split_cache()
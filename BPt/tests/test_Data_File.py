@@ -0,0 +1,234 @@
+from unittest import TestCase
+
+import os
+import time
+import tempfile
+import threading
+import numpy as np
+from BPt import BPt_ML
+from BPt.helpers.Data_File import (Data_File, Packed_Data_File,
+                                   check_mmap_mode, pack_data_files,
+                                   iter_loaded)
+
+
+def load_no_mmap(loc):
+    return np.load(loc)
+
+
+def load_doubled(loc):
+    return np.load(loc) * 2
+
+
+class Counting_Load():
+
+    n_loads = 0
+
+    def __call__(self, loc):
+        Counting_Load.n_loads += 1
+        return np.load(loc)
+
+
+def file_to_subject(loc):
+    return os.path.basename(loc).replace('.npy', '')
+
+
+class Test_Mmap_Mode(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_Mmap_Mode, self).__init__(*args, **kwargs)
+
+        self.dr = tempfile.mkdtemp()
+        self.files = []
+        for i in range(3):
+            loc = os.path.join(self.dr, 's' + str(i) + '.npy')
+            np.save(loc, np.arange(5) + i)
+            self.files.append(loc)
+
+    def load_data_files(self, **kwargs):
+
+        ML = BPt_ML(log_dr=None, verbose=False)
+        ML.Load_Data_Files(files={'f': self.files},
+                           file_to_subject=file_to_subject, **kwargs)
+        return ML
+
+    def test_check_mmap_mode(self):
+
+        for mmap_mode in [None, 'r', 'c']:
+            check_mmap_mode(mmap_mode, np.load)
+
+        # Modes which could write to the saved files
+        for mmap_mode in ['r+', 'w+', 'x']:
+            with self.assertRaises(ValueError):
+                check_mmap_mode(mmap_mode)
+
+        # Or which the load_func would ignore
+        check_mmap_mode(None, load_no_mmap)
+        with self.assertRaises(ValueError):
+            check_mmap_mode('r', load_no_mmap)
+
+    def test_load(self):
+
+        data_file = Data_File(self.files[1], np.load, mmap_mode='c')
+        data = data_file.load()
+        self.assertIsInstance(data, np.memmap)
+
+        # Copy-on-write never changes the saved file
+        data[0] = 100
+        self.assertTrue(np.array_equal(np.load(self.files[1]),
+                                       np.arange(5) + 1))
+
+    def test_load_data_files(self):
+
+        ML = self.load_data_files(mmap_mode='r')
+        for data_file in ML.file_mapping.values():
+            self.assertIsInstance(data_file.load(), np.memmap)
+
+        with self.assertRaises(ValueError):
+            self.load_data_files(mmap_mode='w+')
+
+        with self.assertRaises(ValueError):
+            self.load_data_files(mmap_mode='r', load_func=load_no_mmap)
+
+        # The saved files are untouched
+        for i, loc in enumerate(self.files):
+            self.assertTrue(np.array_equal(np.load(loc), np.arange(5) + i))
+
+        # And w/o mmap_mode, loaded as regular arrays
+        ML = self.load_data_files()
+        data = ML.file_mapping[0].load()
+        self.assertNotIsInstance(data, np.memmap)
+
+
+class Test_Pack_Data_Files(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_Pack_Data_Files, self).__init__(*args, **kwargs)
+
+        self.dr = tempfile.mkdtemp()
+        self.file_mapping = {}
+        for i in range(4):
+            loc = os.path.join(self.dr, 's' + str(i) + '.npy')
+            np.save(loc, np.arange(6).reshape(2, 3) + i)
+            self.file_mapping[i] = Data_File(loc, np.load)
+
+        self.loc = os.path.join(self.dr, 'packed.bin')
+
+    def get_mapping(self, load_func):
+        return {key: Data_File(df.loc, load_func)
+                for key, df in self.file_mapping.items()}
+
+    def test_round_trip(self):
+
+        packed = pack_data_files(self.file_mapping, self.loc)
+        self.assertEqual(set(packed), set(self.file_mapping))
+
+        for key, data_file in packed.items():
+            self.assertIsInstance(data_file, Packed_Data_File)
+            self.assertTrue(np.array_equal(data_file.load(),
+                                           self.file_mapping[key].load()))
+
+        # Memory mapped slices of the same packed file
+        packed = pack_data_files(self.file_mapping, self.loc, mmap_mode='r')
+        data = packed[3].load()
+        self.assertIsInstance(data, np.memmap)
+        self.assertTrue(np.array_equal(data, self.file_mapping[3].load()))
+
+        # Re-packing packed files, indexes the original files
+        repacked = pack_data_files(packed, self.loc)
+        self.assertEqual(repacked[0].orig_loc, self.file_mapping[0].loc)
+
+    def test_reuse(self):
+
+        load_func = Counting_Load()
+        Counting_Load.n_loads = 0
+
+        pack_data_files(self.get_mapping(load_func), self.loc)
+        self.assertEqual(Counting_Load.n_loads, 4)
+
+        # Same files and load_func, so re-used
+        packed = pack_data_files(self.get_mapping(load_func), self.loc)
+        self.assertEqual(Counting_Load.n_loads, 4)
+        self.assertTrue(np.array_equal(packed[1].load(),
+                                       self.file_mapping[1].load()))
+
+        # A changed load_func re-packs
+        packed = pack_data_files(self.get_mapping(load_doubled), self.loc)
+        self.assertTrue(np.array_equal(packed[1].load(),
+                                       self.file_mapping[1].load() * 2))
+
+        # As does a changed file
+        np.save(self.file_mapping[1].loc, np.zeros((2, 3)))
+        packed = pack_data_files(self.get_mapping(load_func), self.loc)
+        self.assertEqual(Counting_Load.n_loads, 8)
+        self.assertTrue(np.array_equal(packed[1].load(), np.zeros((2, 3))))
+
+
+class Tracked_File():
+    '''Records how many files have been loaded, but not yet
+    consumed, when each load starts.'''
+
+    def __init__(self, i, state):
+        self.i = i
+        self.state = state
+
+    def load(self):
+
+        with self.state['lock']:
+            self.state['started'] += 1
+            self.state['max_held'] = max(self.state['max_held'],
+                                         self.state['started'] -
+                                         self.state['consumed'])
+
+        if self.i == self.state.get('fail_on'):
+            raise ValueError('Failed to load ' + str(self.i))
+
+        return self.i
+
+
+class Test_Iter_Loaded(TestCase):
+
+    def get_files(self, n, fail_on=None):
+
+        state = {'lock': threading.Lock(), 'started': 0,
+                 'consumed': 0, 'max_held': 0, 'fail_on': fail_on}
+        return [Tracked_File(i, state) for i in range(n)], state
+
+    def consume(self, files, state, n_prefetch):
+
+        out = []
+        for data in iter_loaded(files, n_prefetch=n_prefetch):
+
+            # Give the background loads time to run ahead
+            time.sleep(.01)
+            out.append(data)
+
+            with state['lock']:
+                state['consumed'] += 1
+
+        return out
+
+    def test_order(self):
+
+        for n_prefetch in [None, 1, 3, 20]:
+            files, state = self.get_files(10)
+            self.assertEqual(self.consume(files, state, n_prefetch),
+                             list(range(10)))
+
+    def test_prefetch_bound(self):
+
+        for n_prefetch in [1, 2, 4]:
+            files, state = self.get_files(12)
+            self.consume(files, state, n_prefetch)
+            self.assertEqual(state['max_held'], n_prefetch)
+
+    def test_error(self):
+
+        files, state = self.get_files(6, fail_on=3)
+
+        out = []
+        with self.assertRaises(ValueError):
+            for data in iter_loaded(files, n_prefetch=2):
+                out.append(data)
+
+        # Files before the failed one are still yielded
+        self.assertEqual(out, [0, 1, 2])
@@ -0,0 +1,207 @@
+from unittest import TestCase
+
+import numpy as np
+from sklearn.linear_model import LinearRegression, LogisticRegression, Ridge
+from sklearn.svm import LinearSVC
+from sklearn.tree import DecisionTreeRegressor, DecisionTreeClassifier
+from deslib.des.knora_e import KNORAE
+from deslib.des.knora_u import KNORAU
+from BPt.pipeline.Ensembles import (BPtStackingRegressor,
+                                    BPtStackingClassifier, DES_Ensemble,
+                                    Fold_Averaged_Estimator,
+                                    clear_stacking_cache, _stacking_cache,
+                                    clear_des_cache, _des_knn_cache)
+
+
+class Counting_Ridge(Ridge):
+
+    n_fits = 0
+
+    def fit(self, X, y, sample_weight=None):
+        Counting_Ridge.n_fits += 1
+        return super().fit(X, y, sample_weight=sample_weight)
+
+
+class Test_Stacking(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_Stacking, self).__init__(*args, **kwargs)
+
+        rng = np.random.RandomState(1)
+        self.X = rng.rand(40, 3)
+        self.y = self.X.sum(axis=1) + rng.rand(40)
+
+    def get_stacking(self, final_estimator, cross_fit=False,
+                     cache_fits=False, tree_random_state=1):
+
+        estimators = [('ridge', Counting_Ridge(random_state=1)),
+                      ('tree', DecisionTreeRegressor(
+                          random_state=tree_random_state))]
+
+        return BPtStackingRegressor(estimators,
+                                    final_estimator=final_estimator,
+                                    cv=3, cross_fit=cross_fit,
+                                    cache_fits=cache_fits)
+
+    def test_reuse_base_models(self):
+
+        clear_stacking_cache()
+        Counting_Ridge.n_fits = 0
+
+        # 3 folds + 1 full fit
+        self.get_stacking(LinearRegression(),
+                          cache_fits=True).fit(self.X, self.y)
+        self.assertEqual(Counting_Ridge.n_fits, 4)
+
+        # Changing just the final estimator shouldn't re-fit
+        stack = self.get_stacking(Ridge(),
+                                  cache_fits=True).fit(self.X, self.y)
+        self.assertEqual(Counting_Ridge.n_fits, 4)
+        self.assertEqual(len(stack.fold_estimators_[0]), 3)
+        self.assertEqual(len(stack.predict(self.X)), 40)
+
+        clear_stacking_cache()
+
+    def test_no_cache(self):
+
+        clear_stacking_cache()
+        Counting_Ridge.n_fits = 0
+
+        # Off by default
+        self.get_stacking(LinearRegression()).fit(self.X, self.y)
+        self.get_stacking(Ridge()).fit(self.X, self.y)
+        self.assertEqual(Counting_Ridge.n_fits, 8)
+        self.assertEqual(len(_stacking_cache), 0)
+
+        # Non-deterministic base models are never cached,
+        # so only the ridge's fold and full fits are
+        self.get_stacking(LinearRegression(), cache_fits=True,
+                          tree_random_state=None).fit(self.X, self.y)
+        self.assertEqual(len(_stacking_cache), 2)
+
+        clear_stacking_cache()
+
+    def test_cross_fit(self):
+
+        clear_stacking_cache()
+        Counting_Ridge.n_fits = 0
+
+        stack = self.get_stacking(LinearRegression(), cross_fit=True)
+        stack.fit(self.X, self.y)
+
+        # Just the fold models
+        self.assertEqual(Counting_Ridge.n_fits, 3)
+        self.assertIsInstance(stack.estimators_[0], Fold_Averaged_Estimator)
+
+        avg = np.mean([est.predict(self.X)
+                       for est in stack.fold_estimators_[0]], axis=0)
+        self.assertTrue(np.allclose(stack.estimators_[0].predict(self.X),
+                                    avg))
+
+        clear_stacking_cache()
+        self.assertEqual(len(_stacking_cache), 0)
+
+
+class Test_Stacking_Classifier(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_Stacking_Classifier, self).__init__(*args, **kwargs)
+
+        rng = np.random.RandomState(1)
+        self.X = rng.rand(30, 3)
+        self.y = np.array([0, 1] * 14 + [2, 2])
+
+    def test_cross_fit_no_proba(self):
+
+        stack = BPtStackingClassifier([('svc', LinearSVC(random_state=1))],
+                                      final_estimator=LogisticRegression(),
+                                      cv=3, cross_fit=True)
+        stack.fit(self.X, self.y)
+
+        # Majority vote over the fold models
+        svc = stack.estimators_[0]
+        votes = np.array([est.predict(self.X)
+                          for est in svc.estimators_])
+        majority = [np.bincount(v, minlength=3).argmax() for v in votes.T]
+        self.assertTrue(np.array_equal(svc.predict(self.X), majority))
+        self.assertEqual(len(stack.predict(self.X)), 30)
+
+    def test_cross_fit_missing_class(self):
+
+        # Class 2 only in the last test fold
+        splits = [(np.arange(10, 30), np.arange(10)),
+                  (np.concatenate([np.arange(10), np.arange(20, 30)]),
+                   np.arange(10, 20)),
+                  (np.arange(20), np.arange(20, 30))]
+
+        tree = DecisionTreeClassifier(random_state=1)
+        stack = BPtStackingClassifier([('tree', tree)],
+                                      final_estimator=LogisticRegression(),
+                                      cv=splits, cross_fit=True)
+        stack.fit(self.X, self.y)
+
+        avg = stack.estimators_[0]
+        self.assertTrue(np.array_equal(avg.classes_, [0, 1, 2]))
+
+        # The fold w/o class 2 gives it no proba
+        proba = avg.predict_proba(self.X)
+        self.assertEqual(proba.shape, (30, 3))
+        self.assertTrue(np.allclose(proba.sum(axis=1), 1))
+
+        expected = np.mean([est.predict_proba(self.X)[:, -1]
+                            if len(est.classes_) == 3 else np.zeros(30)
+                            for est in avg.estimators_], axis=0)
+        self.assertTrue(np.allclose(proba[:, 2], expected))
+        self.assertEqual(len(stack.predict(self.X)), 30)
+
+
+class Counting_Tree(DecisionTreeClassifier):
+
+    n_fits = 0
+
+    def fit(self, X, y, sample_weight=None):
+        Counting_Tree.n_fits += 1
+        return super().fit(X, y, sample_weight=sample_weight)
+
+
+class Test_DES_Ensemble(TestCase):
+
+    def test_shared_pool(self):
+
+        clear_des_cache()
+        Counting_Tree.n_fits = 0
+
+        rng = np.random.RandomState(2)
+        X = rng.rand(80, 3)
+        y = (X[:, 0] + X[:, 1] > 1).astype(int)
+
+        estimators = [('tree' + str(i),
+                       Counting_Tree(max_depth=2, random_state=i))
+                      for i in range(3)]
+
+        preds = {}
+        for name, ensemble in [('knorae', KNORAE()), ('knorau', KNORAU())]:
+            des = DES_Ensemble(estimators, ensemble, name, .25,
+                               random_state=1, cache_fits=True)
+            des.fit(X, y)
+            self.assertEqual(len(des.predict(X)), 80)
+            preds[name] = des.predict(X)
+
+            # Each method keeps its own kNN params
+            knn = des.ensemble_.roc_algorithm_
+            self.assertEqual(knn.n_neighbors, des.ensemble_.k_)
+
+        # One pool fit shared by both methods
+        self.assertEqual(Counting_Tree.n_fits, 3)
+        self.assertEqual(len(_des_knn_cache), 1)
+
+        # Same predictions without the cache
+        clear_des_cache()
+        for name, ensemble in [('knorae', KNORAE()), ('knorau', KNORAU())]:
+            des = DES_Ensemble(estimators, ensemble, name, .25,
+                               random_state=1)
+            des.fit(X, y)
+            self.assertTrue(np.array_equal(des.predict(X), preds[name]))
+
+        self.assertEqual(Counting_Tree.n_fits, 9)
+        self.assertEqual(len(_des_knn_cache), 0)
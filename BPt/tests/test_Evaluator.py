@@ -0,0 +1,205 @@
+from unittest import TestCase
+
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from BPt import BPt_ML, Model_Pipeline, Model, Problem_Spec, Loader
+from BPt.pipeline.Evaluator import _Raw_Preds_Store
+
+
+class Test_Raw_Preds_Store(TestCase):
+
+    def test_set(self):
+
+        store = _Raw_Preds_Store(['a', 'b', 'c'])
+        store.set(['c', 'a'], 'preds', np.array([1.5, 2.5]))
+        store.set(['b'], 'correct', np.array([True]))
+
+        df = store.to_df()
+        self.assertEqual(list(df.index), ['a', 'b', 'c'])
+        self.assertEqual(df.loc['a', 'preds'], 2.5)
+        self.assertTrue(pd.isna(df.loc['b', 'preds']))
+
+        # Bool predictions stay bool
+        self.assertIs(df.loc['b', 'correct'], True)
+
+        # Unknown subjects are an error, not a silent overwrite
+        with self.assertRaises(RuntimeError):
+            store.set(['d'], 'preds', np.array([1.0]))
+
+
+class Test_Parallel_Folds(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_Parallel_Folds, self).__init__(*args, **kwargs)
+
+        rng = np.random.RandomState(1)
+        df = pd.DataFrame(rng.rand(50, 4), columns=['a', 'b', 'c', 't'])
+        df.index.name = 'src_subject_id'
+
+        self.ML = BPt_ML(log_dr=None, verbose=False)
+        self.ML.Set_Default_ML_Verbosity(progress_bar=False)
+        self.ML.Load_Data(df=df[['a', 'b', 'c']])
+        self.ML.Load_Targets(df=df[['t']], col_name='t', data_type='f')
+        self.ML.Train_Test_Split(test_size=0)
+
+    def evaluate(self, fold_n_jobs, return_models=False):
+
+        return self.ML.Evaluate(Model_Pipeline(model=Model('ridge')),
+                                Problem_Spec(n_jobs=2,
+                                             fold_n_jobs=fold_n_jobs),
+                                splits=3, n_repeats=1,
+                                return_raw_preds=True,
+                                return_models=return_models)
+
+    def test_matches_serial(self):
+
+        serial = self.evaluate(1)
+        parallel = self.evaluate(2)
+
+        self.assertTrue(np.allclose(serial['raw_scores'],
+                                    parallel['raw_scores']))
+        pd.testing.assert_frame_equal(serial['raw_preds'],
+                                      parallel['raw_preds'])
+
+        # Fitted models only sent back if requested
+        self.assertEqual(len(parallel['models']), 0)
+        self.assertEqual(len(self.evaluate(2, return_models=True)['models']),
+                         3)
+
+    def test_fold_n_jobs_capped(self):
+
+        # Only 2 folds at once, each w/ 1 job, within n_jobs = 2
+        self.ML.Evaluate(Model_Pipeline(model=Model('ridge')),
+                         Problem_Spec(n_jobs=2, fold_n_jobs=4),
+                         splits=3, n_repeats=1)
+
+        self.assertEqual(self.ML.evaluator.ps.fold_n_jobs, 2)
+        self.assertEqual(self.ML.evaluator.ps.n_jobs, 1)
+
+    def test_shared_design(self):
+
+        # Large enough, s.t., X is shared w/ the folds through a memmap
+        rng = np.random.RandomState(2)
+        df = pd.DataFrame(rng.rand(2500, 60),
+                          columns=['f' + str(i) for i in range(60)])
+        df['t'] = df.sum(axis=1) + rng.rand(2500)
+        df.index.name = 'src_subject_id'
+
+        ML = BPt_ML(log_dr=None, verbose=False)
+        ML.Set_Default_ML_Verbosity(progress_bar=False)
+        ML.Load_Data(df=df.drop(columns='t'))
+        ML.Load_Targets(df=df[['t']], col_name='t', data_type='f')
+        ML.Train_Test_Split(test_size=0)
+
+        def evaluate(fold_n_jobs):
+            return ML.Evaluate(Model_Pipeline(model=Model('ridge')),
+                               Problem_Spec(n_jobs=-1,
+                                            fold_n_jobs=fold_n_jobs),
+                               splits=3, n_repeats=1,
+                               return_raw_preds=True)
+
+        serial, parallel = evaluate(1), evaluate(2)
+        self.assertTrue(np.allclose(serial['raw_scores'],
+                                    parallel['raw_scores']))
+        pd.testing.assert_frame_equal(serial['raw_preds'],
+                                      parallel['raw_preds'])
+
+    def test_design_rows(self):
+
+        self.evaluate(1)
+        evaluator = self.ML.evaluator
+
+        subjects = self.ML.all_data.index[:10]
+        evaluator._set_design(self.ML.all_data, subjects)
+
+        X, y, index = evaluator._get_design_rows(subjects[[4, 1]])
+        self.assertEqual(list(index), list(subjects[[4, 1]]))
+        self.assertTrue(np.array_equal(y, self.ML.all_data.loc[index, 't']))
+        self.assertEqual(X.shape, (2, 3))
+
+        # Subjects outside of the design are an error
+        with self.assertRaises(RuntimeError):
+            evaluator._get_design_rows(self.ML.all_data.index[8:12])
+
+
+class Counting_Load():
+    '''Picklable load function, which logs each load to a file,
+    s.t., loads within worker processes are counted too.'''
+
+    def __init__(self, log_loc):
+        self.log_loc = log_loc
+
+    def __call__(self, loc):
+
+        with open(self.log_loc, 'a') as f:
+            f.write('load\n')
+
+        return np.load(loc)
+
+    def n_loads(self):
+
+        if not os.path.exists(self.log_loc):
+            return 0
+
+        with open(self.log_loc, 'r') as f:
+            return len(f.readlines())
+
+
+def file_to_subject(loc):
+    return os.path.basename(loc).replace('.npy', '')
+
+
+class Test_Loader_Files(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_Loader_Files, self).__init__(*args, **kwargs)
+
+        rng = np.random.RandomState(1)
+        self.dr = tempfile.mkdtemp()
+
+        files = []
+        for i in range(30):
+            loc = os.path.join(self.dr, 's' + str(i) + '.npy')
+            np.save(loc, rng.rand(5))
+            files.append(loc)
+
+        self.load_func = Counting_Load(os.path.join(self.dr, 'log.txt'))
+
+        targets = pd.DataFrame({'t': rng.rand(30)},
+                               index=pd.Index([file_to_subject(f)
+                                               for f in files],
+                                              name='src_subject_id'))
+
+        self.ML = BPt_ML(log_dr=None, verbose=False)
+        self.ML.Set_Default_ML_Verbosity(progress_bar=False)
+        self.ML.Load_Data_Files(files={'f': files},
+                                file_to_subject=file_to_subject,
+                                load_func=self.load_func)
+        self.ML.Load_Targets(df=targets, col_name='t', data_type='f')
+        self.ML.Train_Test_Split(test_size=0)
+
+    def evaluate(self, fold_n_jobs):
+
+        start = self.load_func.n_loads()
+        results = self.ML.Evaluate(Model_Pipeline(loaders=Loader('identity'),
+                                                  model=Model('ridge')),
+                                   Problem_Spec(n_jobs=2,
+                                                fold_n_jobs=fold_n_jobs),
+                                   splits=3, n_repeats=1)
+
+        return results, self.load_func.n_loads() - start
+
+    def test_parallel_folds_share_loaded(self):
+
+        serial, serial_loads = self.evaluate(1)
+        parallel, parallel_loads = self.evaluate(2)
+
+        self.assertTrue(np.allclose(serial['raw_scores'],
+                                    parallel['raw_scores']))
+
+        # Each file loaded once up front, plus one to fit each fold's
+        # loader, rather than re-loaded within each parallel fold
+        self.assertEqual(serial_loads, 30 + 3)
+        self.assertEqual(parallel_loads, serial_loads)
@@ -0,0 +1,221 @@
+from unittest import TestCase, skipIf
+import tempfile
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from BPt.pipeline.Feat_Importances import (Local_Stats,
+                                           Regression_Feat_Importances,
+                                           Cat_Feat_Importances,
+                                           IMPORTANCES,
+                                           get_background_summary,
+                                           clear_background_cache,
+                                           _background_cache)
+
+try:
+    import shap
+except ImportError:
+    shap = None
+
+
+class Test_Local_Stats(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_Local_Stats, self).__init__(*args, **kwargs)
+
+        self.index = pd.Index(['s' + str(i) for i in range(6)])
+        self.columns = ['a', 'b']
+
+        rng = np.random.RandomState(3)
+        self.repeats = [rng.rand(6, 2) for _ in range(4)]
+
+    def fill(self, stats):
+
+        for vals in self.repeats:
+
+            # Two folds per repeat, last subject never tested
+            stats.add(self.index[:3], vals[:3])
+            stats.add(self.index[3:5], vals[3:5])
+            stats.end_repeat()
+
+    def test_mean_var(self):
+
+        for spill_dir in [None, tempfile.mkdtemp()]:
+
+            stats = Local_Stats(self.index, self.columns, spill_dir=spill_dir)
+            self.fill(stats)
+
+            mean, var = stats.get_mean(), stats.get_var()
+            self.assertEqual(list(mean), self.columns)
+
+            self.assertTrue(np.allclose(mean.iloc[:5],
+                                        np.mean(self.repeats, axis=0)[:5]))
+            self.assertTrue(np.allclose(var.iloc[:5],
+                                        np.var(self.repeats, axis=0,
+                                               ddof=1)[:5]))
+
+            self.assertTrue(mean.iloc[5].isna().all())
+            self.assertTrue(var.iloc[5].isna().all())
+
+    def test_get_mean_current_repeat(self):
+
+        stats = Local_Stats(self.index, self.columns)
+        stats.add(self.index[:3], self.repeats[0][:3])
+
+        # Includes the current repeat, w/o ending it
+        mean = stats.get_mean()
+        self.assertTrue(np.allclose(mean.iloc[:3], self.repeats[0][:3]))
+        self.assertTrue(mean.iloc[3:].isna().all().all())
+        self.assertEqual(stats.count.sum(), 0)
+
+        # So further values in this repeat are still averaged
+        stats.add(self.index[:3], self.repeats[1][:3])
+        self.assertTrue(np.allclose(stats.get_mean().iloc[:3],
+                                    np.mean(self.repeats[:2], axis=0)[:3]))
+
+        stats.end_repeat()
+        self.assertTrue(np.array_equal(stats.count[:3], [1, 1, 1]))
+        self.assertTrue(stats.get_var().iloc[:3].isna().all().all())
+
+    def test_unknown_subject(self):
+
+        stats = Local_Stats(self.index, self.columns)
+        with self.assertRaises(RuntimeError):
+            stats.add(pd.Index(['s0', 'nope']), self.repeats[0][:2])
+
+
+class Row_Explainer():
+    '''Explains each subject independently, as kernel shap does,
+    with either one set of values or one per class.'''
+
+    def __init__(self, n_classes=None):
+        self.n_classes = n_classes
+
+    def shap_values(self, X, **kwargs):
+
+        vals = np.asarray(X) * 2 + kwargs['l1_reg']
+        if self.n_classes is None:
+            return vals
+
+        return [vals + j for j in range(self.n_classes)]
+
+
+class Linear_Model():
+
+    def predict(self, X):
+        return np.asarray(X) @ np.array([1, -2, 3])
+
+
+def get_shap_fi(name, FI, n_jobs=1, nkmean=None):
+
+    shap_params = SimpleNamespace(avg_abs=False, kernel_nkmean=nkmean,
+                                  kernel_link='default',
+                                  kernel_l1_reg=1,
+                                  kernel_nsamples='auto',
+                                  tree_feature_perturbation='interventional')
+    params = SimpleNamespace(shap_params=shap_params, n_perm=10,
+                             perm_groups=None, inverse_global=False,
+                             inverse_local=False)
+
+    fi = FI(IMPORTANCES[name][0], params, n_jobs, None)
+    fi.get_data_needed_flags({'linear': False, 'tree': False})
+    return fi
+
+
+class Counting_Feat_Importances(Regression_Feat_Importances):
+
+    n_explainers = 0
+
+    def get_kernel_explainer(self, model, X_train_summary, link):
+
+        Counting_Feat_Importances.n_explainers += 1
+        return Row_Explainer()
+
+
+class Test_Kernel_Shap(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_Kernel_Shap, self).__init__(*args, **kwargs)
+
+        rng = np.random.RandomState(1)
+        self.X_train = rng.rand(20, 3)
+        self.X_test = pd.DataFrame(rng.rand(7, 3), columns=['a', 'b', 'c'])
+
+    def test_chunked_values(self):
+
+        X_test = np.array(self.X_test)
+        for FI, n_classes in [(Regression_Feat_Importances, None),
+                              (Cat_Feat_Importances, 3)]:
+
+            explainer = Row_Explainer(n_classes)
+            serial = get_shap_fi('shap', FI, n_jobs=1)
+            chunked = get_shap_fi('shap', FI, n_jobs=2)
+
+            vals = serial.get_kernel_shap_values(explainer, X_test,
+                                                 l1_reg=1)
+            chunked_vals = chunked.get_kernel_shap_values(explainer, X_test,
+                                                          l1_reg=1)
+
+            if n_classes is None:
+                self.assertTrue(np.array_equal(vals, chunked_vals))
+            else:
+                self.assertEqual(len(chunked_vals), n_classes)
+                for v, cv in zip(vals, chunked_vals):
+                    self.assertTrue(np.array_equal(v, cv))
+
+    @skipIf(shap is None, 'shap is not installed')
+    def test_shared_explainer(self):
+
+        # shap and shap all within one fold use the same explainer
+        explainers = {}
+        Counting_Feat_Importances.n_explainers = 0
+
+        for name in ['shap', 'shap all']:
+            fi = get_shap_fi(name, Counting_Feat_Importances)
+            global_vals, local_vals =\
+                fi.compute_importances(None, self.X_test,
+                                       X_train=self.X_train,
+                                       explainers=explainers)
+            self.assertTrue(np.array_equal(local_vals,
+                                           np.array(self.X_test) * 2 + 1))
+
+        self.assertEqual(Counting_Feat_Importances.n_explainers, 1)
+        self.assertEqual(len(explainers), 1)
+
+        # A new fold gets a new explainer
+        fi.compute_importances(None, self.X_test, X_train=self.X_train,
+                               explainers={})
+        self.assertEqual(Counting_Feat_Importances.n_explainers, 2)
+
+    @skipIf(shap is None, 'shap is not installed')
+    def test_background_cache(self):
+
+        clear_background_cache()
+
+        summary = get_background_summary(self.X_train, 5)
+        self.assertEqual(len(_background_cache), 1)
+
+        # Same training data is a hit, and returns the same summary
+        self.assertIs(get_background_summary(self.X_train.copy(), 5),
+                      summary)
+        self.assertEqual(len(_background_cache), 1)
+
+        # Different training data or nkmean is a miss
+        get_background_summary(self.X_train[1:], 5)
+        get_background_summary(self.X_train, 4)
+        self.assertEqual(len(_background_cache), 3)
+
+    @skipIf(shap is None, 'shap is not installed')
+    def test_chunked_kernel_explainer(self):
+
+        explainer = shap.KernelExplainer(Linear_Model().predict,
+                                         self.X_train[:5])
+
+        X_test = np.array(self.X_test)
+        vals = explainer.shap_values(X_test, l1_reg=0)
+
+        fi = get_shap_fi('shap', Regression_Feat_Importances, n_jobs=2)
+        chunked_vals = fi.get_kernel_shap_values(explainer, X_test,
+                                                 l1_reg=0)
+
+        self.assertTrue(np.allclose(vals, chunked_vals))
@@ -0,0 +1,97 @@
+from unittest import TestCase
+
+import os
+import tempfile
+import numpy as np
+from BPt.helpers.Data_File import Data_File, Packed_Data_File
+from BPt.helpers.Loader_Cache import Loader_Cache, get_file_key
+
+
+class Test_Loader_Cache(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_Loader_Cache, self).__init__(*args, **kwargs)
+
+        self.dr = tempfile.mkdtemp()
+        self.data_files = []
+        for i in range(3):
+            loc = os.path.join(self.dr, 's' + str(i) + '.npy')
+            np.save(loc, np.arange(4) + i)
+            self.data_files.append(Data_File(loc, np.load))
+
+    def get_cache(self, max_size=None):
+        return Loader_Cache(tempfile.mkdtemp(), max_size=max_size)
+
+    def get_blocks(self, cache):
+
+        with cache._connect() as con:
+            return [loc for loc, in
+                    con.execute('SELECT loc FROM blocks').fetchall()]
+
+    def test_get_put(self):
+
+        cache = self.get_cache()
+        keys = [get_file_key(df) for df in self.data_files]
+
+        # Miss
+        self.assertEqual(cache.get('loader', keys), [None, None, None])
+
+        cache.put('loader', keys[:2], [np.ones(2), np.zeros(2)])
+        out = cache.get('loader', keys)
+        self.assertTrue(np.array_equal(out[0], np.ones(2)))
+        self.assertTrue(np.array_equal(out[1], np.zeros(2)))
+        self.assertIsNone(out[2])
+
+        # Other loaders don't share outputs
+        self.assertEqual(cache.get('other', keys[:1]), [None])
+
+    def test_file_key(self):
+
+        data_file = self.data_files[0]
+        key = get_file_key(data_file)
+        self.assertEqual(key, get_file_key(Data_File(data_file.loc,
+                                                     np.load)))
+
+        # Changed files get a new key
+        np.save(data_file.loc, np.arange(8))
+        self.assertNotEqual(key, get_file_key(data_file))
+
+        # So do different slices of the same packed file
+        first = Packed_Data_File(data_file.loc, 0, (2,), 'int64', np.load)
+        second = Packed_Data_File(data_file.loc, 16, (2,), 'int64', np.load)
+        self.assertNotEqual(get_file_key(first), get_file_key(second))
+
+    def test_replace(self):
+
+        cache = self.get_cache()
+        key = get_file_key(self.data_files[0])
+
+        cache.put('loader', [key], [np.ones(2)])
+        old_blocks = self.get_blocks(cache)
+
+        cache.put('loader', [key], [np.zeros(2)])
+        self.assertTrue(np.array_equal(cache.get('loader', [key])[0],
+                                       np.zeros(2)))
+
+        # The replaced block is removed from disk and the index
+        self.assertEqual(len(self.get_blocks(cache)), 1)
+        self.assertFalse(os.path.exists(old_blocks[0]))
+
+    def test_evict(self):
+
+        # Room for 2 blocks of 8 bytes each
+        cache = self.get_cache(max_size=16)
+        keys = [get_file_key(df) for df in self.data_files]
+
+        cache.put('loader', keys[:1], [np.ones(1)])
+        cache.put('loader', keys[1:2], [np.ones(1)])
+
+        # Use the first, s.t., the second is least recently used
+        cache.get('loader', keys[:1])
+        cache.put('loader', keys[2:], [np.ones(1)])
+
+        out = cache.get('loader', keys)
+        self.assertIsNotNone(out[0])
+        self.assertIsNone(out[1])
+        self.assertIsNotNone(out[2])
+        self.assertEqual(len(self.get_blocks(cache)), 2)
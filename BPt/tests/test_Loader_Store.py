@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+import copy
+import pickle
+import numpy as np
+from joblib import hash as joblib_hash
+from BPt.helpers.Shared_Data import Shared_Data
+from BPt.pipeline.Loaders import Loader_Store
+
+
+class Test_Loader_Store(TestCase):
+
+    def test_shared_not_pickled(self):
+
+        store = Loader_Store()
+        store[('loader', 0)] = [1, 2, 3]
+
+        # Copies share the store
+        self.assertIs(copy.copy(store), store)
+        self.assertIs(copy.deepcopy(store), store)
+
+        # But it is never sent to workers, saved or hashed
+        loaded = pickle.loads(pickle.dumps(store))
+        self.assertIsInstance(loaded, Loader_Store)
+        self.assertEqual(len(loaded), 0)
+        self.assertEqual(joblib_hash(store), joblib_hash(Loader_Store()))
+
+    def test_share(self):
+
+        store = Loader_Store()
+        store[('loader', 0)] = np.array([1., 2.])
+        store[('loader', 1)] = np.array([3., 4.])
+
+        with Shared_Data() as shared:
+            store.share(shared)
+
+            # Pickled copies read the shared outputs
+            loaded = pickle.loads(pickle.dumps(store))
+            self.assertEqual(len(loaded), 0)
+            self.assertTrue(np.array_equal(loaded.get(('loader', 1)),
+                                           [3., 4.]))
+            self.assertIsNone(loaded.get(('loader', 2)))
+
+            store.unshare()
+
+        # Once unshared, pickles as empty again
+        loaded = pickle.loads(pickle.dumps(store))
+        self.assertIsNone(loaded.get(('loader', 1)))
+        self.assertEqual(len(store), 2)
@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+import os
+import tempfile
+import numpy as np
+from BPt.helpers.Data_File import Data_File
+from BPt.extensions.Loaders import SurfLabels
+from BPt.pipeline.Loaders import Loader_Wrapper, get_trans_chunk
+
+
+class Test_Loader_Wrapper(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_Loader_Wrapper, self).__init__(*args, **kwargs)
+
+        rng = np.random.RandomState(2)
+        self.labels = rng.randint(0, 5, size=50)
+
+        dr = tempfile.mkdtemp()
+        self.file_mapping = {}
+        for i in range(7):
+            loc = os.path.join(dr, str(i) + '.npy')
+            np.save(loc, rng.rand(50))
+            self.file_mapping[i] = Data_File(loc, np.load)
+
+        self.X = np.arange(7, dtype='float')[:, None]
+
+    def test_transform_batch(self):
+
+        loader = SurfLabels(labels=self.labels)
+        data_files = [self.file_mapping[i] for i in range(7)]
+
+        # The per file path
+        per_file = np.stack(get_trans_chunk(loader, data_files))
+
+        # Leaves a partial last batch
+        for wrapper_n_jobs in [1, 2]:
+            wrapper = Loader_Wrapper(loader, [0], self.file_mapping,
+                                     wrapper_n_jobs=wrapper_n_jobs)
+            wrapper.batch_size = 3
+
+            X_trans = wrapper.fit_transform(self.X, mapping={0: 0})
+            self.assertTrue(np.allclose(X_trans, per_file))
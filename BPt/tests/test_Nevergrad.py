@@ -0,0 +1,177 @@
+from unittest import TestCase
+
+import tempfile
+import numpy as np
+import pandas as pd
+import nevergrad as ng
+from joblib import effective_n_jobs
+from sklearn.linear_model import Ridge
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import get_scorer
+from BPt.main.Params_Classes import Param_Search
+from BPt.pipeline.BPt_Pipeline import BPt_Pipeline
+from BPt.pipeline.Nevergrad import (NevergradSearchCV, Fold_Pruner,
+                                    _score_memo, _prefix_cache,
+                                    _get_prefix_data, clear_prefix_cache)
+
+
+class Counting_Ridge(Ridge):
+
+    n_fits = 0
+
+    def fit(self, X, y, sample_weight=None):
+        Counting_Ridge.n_fits += 1
+        return super().fit(X, y, sample_weight=sample_weight)
+
+
+class Test_NevergradSearchCV(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_NevergradSearchCV, self).__init__(*args, **kwargs)
+
+        rng = np.random.RandomState(1)
+        self.X = rng.rand(60, 3)
+        self.y = self.X.sum(axis=1) + rng.rand(60)
+
+    def run_search(self, dist, n_iter, n_jobs=1, **params):
+
+        param_search = Param_Search(n_iter=n_iter, _random_state=1, **params)
+        param_search._scorer = get_scorer('r2')
+        param_search._n_jobs = n_jobs
+
+        search = NevergradSearchCV(estimator=Counting_Ridge(),
+                                   param_search=param_search,
+                                   param_distributions={'alpha': dist},
+                                   random_state=1)
+
+        Counting_Ridge.n_fits = 0
+        search.fit(self.X, self.y, train_data_index=pd.Index(range(60)))
+
+        return search
+
+    def test_memo(self):
+
+        choice = ng.p.Choice([.1, 1, 10])
+
+        # Each of the 3 choices on 3 folds, then the best on all
+        search = self.run_search(choice, 12)
+        self.assertLessEqual(Counting_Ridge.n_fits, 10)
+
+        # Not kept after the search by default
+        self.assertFalse(any(key[0] == search.search_key_
+                             for key in _score_memo))
+
+        # Unless memoize, then a repeated search only fits the best
+        first = self.run_search(choice, 12, memoize=True)
+        second = self.run_search(choice, 12, memoize=True)
+        self.assertEqual(first.search_key_, second.search_key_)
+        self.assertEqual(Counting_Ridge.n_fits, 1)
+        self.assertEqual(first.best_params_, second.best_params_)
+
+    def test_warm_start(self):
+
+        trial_loc = tempfile.mkdtemp()
+        dist = ng.p.Log(lower=1e-3, upper=1e3)
+
+        first = self.run_search(dist, 5, trial_loc=trial_loc)
+        self.assertEqual(Counting_Ridge.n_fits, 5 * 3 + 1)
+
+        # Every candidate already stored
+        second = self.run_search(dist, 5, trial_loc=trial_loc)
+        self.assertEqual(Counting_Ridge.n_fits, 1)
+        self.assertEqual(first.best_params_, second.best_params_)
+
+        # Candidates stored w/ pruning, may be scored on only some
+        # folds, so are not re-used by a search w/o pruning
+        pruned_loc = tempfile.mkdtemp()
+        pruned = self.run_search(dist, 5, trial_loc=pruned_loc, prune=True,
+                                 prune_warmup=1)
+        self.assertNotEqual(pruned.search_key_, first.search_key_)
+
+        self.run_search(dist, 5, trial_loc=pruned_loc)
+        self.assertEqual(Counting_Ridge.n_fits, 5 * 3 + 1)
+
+    def test_prefix_cache(self):
+
+        pipe = BPt_Pipeline([('scaler', StandardScaler()),
+                             ('ridge', Ridge())])
+        tr_inds, test_inds = np.arange(40), np.arange(40, 60)
+
+        # e.g., left in a worker by a previous search
+        _prefix_cache[('old', 0, 1)] = None
+
+        X_tr, X_test, _ = _get_prefix_data(('new', 0, 1), pipe, 1,
+                                           self.X, self.y, tr_inds,
+                                           test_inds, {})
+        self.assertEqual(list(_prefix_cache), [('new', 0, 1)])
+        self.assertEqual(X_tr.shape, (40, 3))
+        self.assertEqual(X_test.shape, (20, 3))
+
+        clear_prefix_cache('new')
+        self.assertEqual(len(_prefix_cache), 0)
+
+    def test_prune(self):
+
+        dist = ng.p.Log(lower=1e-3, upper=1e3)
+
+        # Nothing pruned w/ a warmup longer than the search
+        self.run_search(dist, 8, prune=True, prune_warmup=8)
+        self.assertEqual(Counting_Ridge.n_fits, 8 * 3 + 1)
+
+        # Otherwise worse candidates stop early
+        self.run_search(dist, 8, prune=True, prune_warmup=1)
+        self.assertLess(Counting_Ridge.n_fits, 8 * 3 + 1)
+
+    def test_fold_tasks(self):
+
+        choice = ng.p.Choice([.1, 1, 10])
+
+        by_cand = self.run_search(choice, 12, n_jobs=2)
+        by_fold = self.run_search(choice, 12, n_jobs=2, fold_tasks=True)
+
+        self.assertEqual(by_cand.best_params_, by_fold.best_params_)
+        self.assertAlmostEqual(by_cand.best_search_score,
+                               by_fold.best_search_score)
+        self.assertTrue(np.allclose(by_cand.predict(self.X),
+                                    by_fold.predict(self.X)))
+
+    def test_all_jobs(self):
+
+        # n_jobs = -1 runs w/ all workers, over shared data
+        search = self.run_search(ng.p.Choice([.1, 1, 10]), 6, n_jobs=-1)
+        self.assertEqual(search.n_jobs_, effective_n_jobs(-1))
+        self.assertIn(search.best_params_['alpha'], [.1, 1, 10])
+
+
+class Test_Fold_Pruner(TestCase):
+
+    def test_warmup(self):
+
+        # Scores are flipped, s.t., lower is better
+        pruner = Fold_Pruner(warmup=2)
+        pruner.add([1, 1, 1])
+
+        # Not pruned w/ fewer than warmup candidates on a fold
+        self.assertFalse(pruner.should_prune([10]))
+
+        pruner.add([2, 2])
+        self.assertTrue(pruner.should_prune([10]))
+        self.assertFalse(pruner.should_prune([1]))
+
+        # Compared only to candidates evaluated on as many folds
+        self.assertFalse(pruner.should_prune([1, 10, 1]))
+        pruner.add([3, 3, 3])
+        self.assertTrue(pruner.should_prune([1, 10, 1]))
+        self.assertFalse(pruner.should_prune([1, 2, 1]))
+
+    def test_partial_means(self):
+
+        pruner = Fold_Pruner(warmup=1)
+        pruner.add([1, 5])
+
+        # Median of the mean over the first fold only is 1
+        self.assertTrue(pruner.should_prune([2]))
+
+        # And over both is 3
+        self.assertFalse(pruner.should_prune([2, 3]))
+        self.assertTrue(pruner.should_prune([2, 5]))
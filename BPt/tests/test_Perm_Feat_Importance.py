@@ -0,0 +1,69 @@
+from unittest import TestCase
+
+import numpy as np
+from sklearn.linear_model import Ridge, LogisticRegression
+from sklearn.metrics import get_scorer
+from BPt.pipeline.Perm_Feat_Importance import Batched_Perm_Feat_Importance
+
+
+class Test_Batched_Perm_Feat_Importance(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_Batched_Perm_Feat_Importance, self).__init__(*args,
+                                                                **kwargs)
+
+        rng = np.random.RandomState(1)
+        self.X = rng.rand(60, 6)
+        self.y = self.X @ np.arange(6)
+        self.model = Ridge().fit(self.X, self.y)
+        self.scorer = get_scorer('r2')
+
+    def test_reproducible(self):
+
+        base = Batched_Perm_Feat_Importance(n_perm=4, random_state=0)
+        fis = base.compute(self.model, self.scorer, self.X, self.y)
+
+        self.assertEqual(fis.shape, (6,))
+
+        # Same result regardless of batching or n_jobs
+        for params in [{'batch_size': 1}, {'n_jobs': 2}]:
+            other = Batched_Perm_Feat_Importance(n_perm=4, random_state=0,
+                                                 **params)
+            other_fis = other.compute(self.model, self.scorer,
+                                      self.X, self.y)
+            self.assertTrue(np.allclose(fis, other_fis))
+
+        # Least and most important features
+        self.assertEqual(np.argmin(fis), 0)
+        self.assertEqual(np.argmax(fis), 5)
+
+    def test_random_state_instance(self):
+
+        fis = [Batched_Perm_Feat_Importance(
+                   n_perm=2, random_state=np.random.RandomState(0)).compute(
+                   self.model, self.scorer, self.X, self.y)
+               for _ in range(2)]
+
+        # Same seeded RandomState, same results
+        self.assertEqual(fis[0].shape, (6,))
+        self.assertTrue(np.allclose(fis[0], fis[1]))
+
+    def test_groups(self):
+
+        base = Batched_Perm_Feat_Importance(n_perm=2, random_state=0)
+        fis = base.compute(self.model, self.scorer, self.X, self.y,
+                           groups=[[1, 2], [2, 3]])
+
+        # Columns shared across groups stay in the first
+        self.assertEqual(fis[1], fis[2])
+        self.assertNotEqual(fis[2], fis[3])
+
+    def test_classifier(self):
+
+        y = (self.y > np.median(self.y)).astype(int)
+        model = LogisticRegression().fit(self.X, y)
+
+        for scorer in ['roc_auc', 'neg_log_loss', 'accuracy']:
+            base = Batched_Perm_Feat_Importance(n_perm=2, random_state=0)
+            fis = base.compute(model, get_scorer(scorer), self.X, y)
+            self.assertGreater(fis[5], fis[0])
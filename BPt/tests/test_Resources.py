@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+from joblib import cpu_count
+from threadpoolctl import threadpool_info
+from BPt.helpers.Resources import (split_n_jobs, get_layout,
+                                   call_with_threads)
+
+
+def get_max_threads():
+    return max([pool['num_threads'] for pool in threadpool_info()] + [1])
+
+
+class Test_Resources(TestCase):
+
+    def test_split_n_jobs(self):
+
+        self.assertEqual(split_n_jobs(8, 3), (3, 2))
+        self.assertEqual(split_n_jobs(8, 16), (8, 1))
+        self.assertEqual(split_n_jobs(2, 1), (1, 2))
+        self.assertEqual(split_n_jobs(None, 4), (1, 1))
+
+        # -1 is resolved to the number of cpus
+        outer, inner = split_n_jobs(-1, 1)
+        self.assertEqual((outer, inner), (1, cpu_count()))
+
+    def test_get_layout(self):
+
+        layout = get_layout(8, fold_n_jobs=2)
+        self.assertEqual(layout, {'folds': 2, 'search': 1, 'models': 4,
+                                  'blas_threads': 4})
+
+        # If a search, the per fold budget goes to the search
+        layout = get_layout(8, fold_n_jobs=2, has_search=True)
+        self.assertEqual(layout, {'folds': 2, 'search': 4, 'models': 1,
+                                  'blas_threads': 1})
+
+        # Never less than 1 each
+        layout = get_layout(2, fold_n_jobs=4, has_search=True)
+        self.assertEqual(layout, {'folds': 2, 'search': 1, 'models': 1,
+                                  'blas_threads': 1})
+
+    def test_call_with_threads(self):
+
+        before = get_max_threads()
+        self.assertEqual(call_with_threads(1, get_max_threads), 1)
+        self.assertEqual(get_max_threads(), before)
+
+        # None doesn't change anything
+        self.assertEqual(call_with_threads(None, get_max_threads), before)
@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from BPt.pipeline.Scorers import Cached_Predictor, process_scorers
+
+
+class Counting_Model(LogisticRegression):
+
+    def predict_proba(self, X):
+        self.n_calls = getattr(self, 'n_calls', 0) + 1
+        return super().predict_proba(X)
+
+
+class Test_Cached_Predictor(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_Cached_Predictor, self).__init__(*args, **kwargs)
+
+        rng = np.random.RandomState(0)
+        self.X = rng.rand(40, 3)
+        self.y = (self.X[:, 0] > .5).astype(float)
+        self.model = Counting_Model().fit(self.X, self.y)
+
+    def test_same_scores(self):
+
+        _, scorers, _ = process_scorers(['roc_auc', 'neg_log_loss',
+                                         'accuracy', 'neg_brier_score'],
+                                        'binary')
+
+        predictor = Cached_Predictor(self.model, self.X)
+        for scorer in scorers:
+            self.assertEqual(scorer(predictor, self.X, self.y),
+                             scorer(self.model, self.X, self.y))
+
+    def test_predict_once(self):
+
+        _, scorers, _ = process_scorers(['neg_log_loss', 'neg_brier_score'],
+                                        'binary')
+
+        self.model.n_calls = 0
+        predictor = Cached_Predictor(self.model, self.X)
+        mask = np.arange(len(self.X)) % 2 == 0
+        masked = predictor.masked(mask)
+
+        for scorer in scorers:
+            scorer(predictor, self.X, self.y)
+            self.assertEqual(scorer(masked, self.X[mask], self.y[mask]),
+                             scorer(self.model, self.X[mask], self.y[mask]))
+
+        self.assertEqual(self.model.n_calls, 1 + len(scorers))
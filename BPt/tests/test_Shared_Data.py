@@ -0,0 +1,60 @@
+from unittest import TestCase
+
+import os
+import numpy as np
+from joblib import Parallel, delayed
+from BPt.helpers.Shared_Data import (Shared_Data, Shared_Array,
+                                     Shared_Splits, load_shared)
+
+
+def sum_shared(X):
+    return load_shared(X).sum()
+
+
+class Test_Shared_Data(TestCase):
+
+    def test_share(self):
+
+        X = np.arange(12, dtype=float).reshape(4, 3)
+
+        with Shared_Data() as shared:
+
+            # Small arrays are passed along as is
+            self.assertIs(shared.share(X), X)
+            self.assertIsNone(shared.dr)
+
+            X_s = shared.share(X, force=True)
+            self.assertIsInstance(X_s, Shared_Array)
+            self.assertTrue(np.array_equal(load_shared(X_s), X))
+
+            # Workers attach to the same file
+            sums = Parallel(n_jobs=2)(delayed(sum_shared)(X_s)
+                                      for _ in range(2))
+            self.assertEqual(sums, [X.sum(), X.sum()])
+
+            splits = [(np.array([0, 1]), np.array([2, 3])),
+                      (np.array([2, 3]), np.array([0, 1]))]
+            splits_s = shared.share_splits(splits)
+            self.assertIsInstance(splits_s, Shared_Splits)
+
+            for (tr, te), (tr_s, te_s) in zip(splits,
+                                              load_shared(splits_s)):
+                self.assertTrue(np.array_equal(tr, tr_s))
+                self.assertTrue(np.array_equal(te, te_s))
+
+            dr = shared.dr
+            self.assertTrue(os.path.isdir(dr))
+
+        # Everything removed on exit
+        self.assertFalse(os.path.exists(dr))
+        self.assertIsNone(shared.dr)
+
+    def test_close_on_error(self):
+
+        with self.assertRaises(ValueError):
+            with Shared_Data() as shared:
+                shared.share(np.ones(10), force=True)
+                dr = shared.dr
+                raise ValueError()
+
+        self.assertFalse(os.path.exists(dr))
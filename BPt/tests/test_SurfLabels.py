@@ -0,0 +1,63 @@
+from unittest import TestCase
+
+import numpy as np
+from BPt.extensions.Loaders import SurfLabels
+
+
+class Test_SurfLabels(TestCase):
+
+    def __init__(self, *args, **kwargs):
+        super(Test_SurfLabels, self).__init__(*args, **kwargs)
+
+        rng = np.random.RandomState(0)
+        self.labels = rng.randint(0, 6, size=200)
+        self.X = rng.random(size=200)
+        self.X_time = rng.random(size=(4, 200))
+
+    def get_by_mask(self, X, strategy, axis=0):
+
+        rois = [i for i in np.unique(self.labels) if i != 0]
+        if axis == 0:
+            return np.array([strategy(X[self.labels == i]) for i in rois])
+
+        return np.stack([strategy(X[:, self.labels == i], axis=1)
+                         for i in rois], axis=1).flatten()
+
+    def test_strategies(self):
+
+        for strategy, func in [('mean', np.mean), ('sum', np.sum),
+                               ('min', np.min), ('max', np.max),
+                               ('std', np.std), ('var', np.var),
+                               ('median', np.median)]:
+
+            sl = SurfLabels(labels=self.labels, strategy=strategy)
+
+            X_trans = sl.fit_transform(self.X)
+            self.assertTrue(np.allclose(X_trans,
+                                        self.get_by_mask(self.X, func)))
+
+            X_trans = sl.fit_transform(self.X_time)
+            self.assertTrue(np.allclose(X_trans,
+                                        self.get_by_mask(self.X_time, func,
+                                                         axis=1)))
+
+    def test_inverse_transform(self):
+
+        sl = SurfLabels(labels=self.labels)
+        X_trans = sl.fit_transform(self.X)
+        X_inv = sl.inverse_transform(X_trans)
+
+        self.assertEqual(X_inv.shape, self.X.shape)
+        self.assertTrue(np.all(X_inv[self.labels == 0] == 0))
+
+        for i, roi in enumerate(sl.non_bkg_unique_):
+            self.assertTrue(np.all(X_inv[self.labels == roi] == X_trans[i]))
+
+    def test_transform_batch(self):
+
+        sl = SurfLabels(labels=self.labels).fit(self.X)
+        Xs = [self.X, self.X * 2, self.X + 1]
+
+        batch = sl.transform_batch(Xs)
+        for X, X_trans in zip(Xs, batch):
+            self.assertTrue(np.allclose(X_trans, sl.transform(X)))